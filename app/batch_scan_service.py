@@ -39,7 +39,7 @@ class FileNameParser:
         # page-001.jpg
         (r'page[\-_]?(\d+)', 'page_only'),
         # 扫描件_001.jpg
-        (r'.*[\-_](\d+)\.(jpg|png|jpeg|bmp|pdf)$', 'page_only'),
+        (r'.*[\-_](\d+)\.(jpg|png|jpeg|bmp|pdf|tif|tiff)$', 'page_only'),
     ]
 
     @staticmethod
@@ -82,8 +82,8 @@ class BatchScanService:
     ) -> List[str]:
         """扫描目录，获取所有匹配的文件"""
         if patterns is None:
-            patterns = ["*.jpg", "*.jpeg", "*.png", "*.bmp", "*.pdf",
-                       "*.JPG", "*.JPEG", "*.PNG", "*.BMP", "*.PDF"]
+            patterns = ["*.jpg", "*.jpeg", "*.png", "*.bmp", "*.pdf", "*.tif", "*.tiff",
+                       "*.JPG", "*.JPEG", "*.PNG", "*.BMP", "*.PDF", "*.TIF", "*.TIFF"]
 
         files = []
         dir_path = Path(directory)
@@ -122,7 +122,8 @@ class BatchScanService:
                     "text_layout": request.text_layout or "horizontal",
                     "output_format": request.output_format or "line_by_line",
                     "recursive": request.recursive,
-                    "file_patterns": request.file_patterns or ["*.jpg", "*.png"]
+                    "file_patterns": request.file_patterns or ["*.jpg", "*.png"],
+                    "ocr_options": request.ocr_options()
                 }
             )
 
@@ -161,6 +162,7 @@ class BatchScanService:
                 output_format=request.output_format or "line_by_line",
                 recursives=1 if request.recursive else 0,
                 file_patterns=request.file_patterns,
+                ocr_options=request.ocr_options() or None,
                 status="pending",
                 total_files=len(files),
                 task_hash=task_hash,
@@ -223,7 +225,8 @@ class BatchScanService:
                     task.output_format,
                     bool(task.recursives),
                     task.file_patterns,
-                    task.priority
+                    task.priority,
+                    task.ocr_options
                 ],
                 priority=task.priority
             )
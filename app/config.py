@@ -57,6 +57,44 @@ class Settings(BaseSettings):
     OCR_LANG: str = "ch"
     OCR_USE_GPU: bool = False
     OCR_USE_ANGLE_CLS: bool = True
+    OCR_MAX_ENGINES: int = 3  # Max resident engines (one per lang/use_angle_cls)
+    OCR_MAX_ENGINES_RSS_MB: int = 0  # Evict LRU engines above this RSS (0 = unlimited)
+    OCR_ENGINE_REPLICAS: int = 1  # Engine replicas per lang/use_angle_cls for concurrent inference
+    OCR_ENGINE_CHECKOUT_TIMEOUT: float = 30.0  # Seconds to wait for a free replica
+    OCR_CPU_THREADS: int = 0  # CPU threads per engine replica (0 = PaddleOCR default)
+    OCR_BACKEND: str = "thread"  # thread: infer in the calling thread; process: in a process pool
+    OCR_PROCESS_WORKERS: int = 2  # Worker processes for the process backend
+    OCR_PROCESS_TIMEOUT: float = 300.0  # Seconds to wait for a worker process result
+    OCR_ASYNC_WORKERS: int = 0  # Threads running API inference (0 = engine replicas / process workers)
+    OCR_MAX_QUEUE_DEPTH: int = 16  # Requests allowed to wait for a worker before answering 429
+    OCR_RETRY_AFTER: int = 0  # Retry-After seconds on 429 (0 = estimate from service time)
+    OCR_MICRO_BATCH_ENABLED: bool = False  # Batch concurrent requests with the same options
+    OCR_MICRO_BATCH_WINDOW_MS: float = 5.0  # How long to collect requests for one batch
+    OCR_MICRO_BATCH_MAX_SIZE: int = 8  # Maximum images per batch
+    OCR_DECODE_IN_MEMORY: bool = True  # Decode uploads from memory; False falls back to temp files
+    OCR_RESULT_CACHE_SIZE: int = 256  # Results cached in memory by image content + options (0 = off)
+    OCR_RESULT_CACHE_DIR: str = ""  # Directory for the on-disk result cache ("" = off; relative to BASE_DIR)
+    OCR_RESULT_CACHE_TTL: int = 604800  # Seconds a disk cache entry stays valid (0 = forever)
+    OCR_RESULT_CACHE_DISK_MB: int = 1024  # Disk cache quota in MB (0 = unlimited)
+    OCR_WARMUP_ENABLED: bool = True  # Preload and warm up engines at start-up; readiness waits for it
+    OCR_PRELOAD_ENGINES: str = ""  # Engines to preload, e.g. "ch,en:false" ("" = OCR_LANG with OCR_USE_ANGLE_CLS)
+    OCR_WARMUP_RUNS: int = 1  # Warmup inferences per engine replica (0 = load only)
+    OCR_MAX_SIDE_LEN: int = 0  # Default longest image side before inference (0 = full resolution)
+    OCR_REFINE_THRESHOLD: float = 0.0  # Two-pass mode: re-read lines scoring below this at full resolution (0 = off)
+    OCR_REFINE_SIDE_LEN: int = 1600  # Longest image side of the fast first pass in two-pass mode
+    OCR_TILE_SIZE: int = 2048  # Tile side in pixels for tiled inference
+    OCR_TILE_OVERLAP: int = 256  # Pixels shared by neighbouring tiles (should exceed the longest text line)
+    OCR_TILE_AUTO_PIXELS: int = 0  # Tile images with more pixels than this (0 = only when requested)
+    OCR_ANGLE_MODE: str = "line"  # line: classify every text line; page: check a sample once per page
+    OCR_PAGE_ORIENTATION_SAMPLES: int = 8  # Lines classified to decide a page's orientation
+    OCR_PAGE_ORIENTATION_CONFIRM: int = 2  # Agreeing pages before a task/book's orientation is reused
+    OCR_MAX_REGIONS: int = 500  # Max polygons per /api/ocr/recognize-regions request
+    PDF_RENDER_DPI: int = 200  # Resolution PDF pages are rasterised at (one page in memory at a time)
+    OCR_ROUND_BOXES: bool = False  # Round box coordinates to integers in API responses
+    OCR_PROFILE_SAMPLE_RATE: int = 0  # Profile 1 in N recognitions / batch pages (0 = off)
+    OCR_PROFILE_SLOW_MS: float = 0.0  # Keep profiles of recognitions slower than this (0 = off)
+    OCR_PROFILE_INTERVAL_MS: float = 5.0  # Stack sampling interval while profiling
+    OCR_PROFILE_MAX_FILES: int = 200  # Profiles kept in logs/profiles (oldest removed first)
 
     # Task Configuration
     TASK_DEFAULT_PRIORITY: int = 5
@@ -78,7 +116,8 @@ class Settings(BaseSettings):
     # API Configuration
     API_PREFIX: str = "/api/ocr"
     MAX_UPLOAD_SIZE: int = 100 * 1024 * 1024  # 100MB
-    MAX_BATCH_FILES: int = 10
+    MAX_BATCH_FILES: int = 10  # Max files per /api/ocr/recognize-batch request
+    OCR_BATCH_PARALLELISM: int = 0  # Files of one recognize-batch request recognised at once (0 = inference capacity)
 
     class Config:
         env_file = ".env"
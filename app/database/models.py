@@ -48,6 +48,7 @@ class BatchTask(Base):
     output_format = Column(String(30), default="line_by_line", comment='Output format')
     recursives = Column(Integer, default=1, comment='Recursive scan')
     file_patterns = Column(JSON, comment='File patterns')
+    ocr_options = Column(JSON, comment='Extra OCR options (e.g. max_side_len, source_dpi, target_dpi)')
 
     # Status
     status = Column(Enum("pending", "queued", "processing", "completed", "failed", "cancelled", "retrying", name="batchtask_status"),
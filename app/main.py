@@ -1,23 +1,36 @@
 """FastAPI 主应用"""
 import os
+import time
+import asyncio
+import io
 import uuid
-import shutil
+import threading
 import json
 import logging
+import shutil
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from typing import AsyncIterator, BinaryIO, List, Literal, Optional, Tuple
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse
+from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.utils import get_openapi
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
 
 from .schemas import (
-    OcrResponse, HealthResponse, StatusResponse, OcrOptions, TextBox,
+    OcrResponse, DetectResponse, HealthResponse, ReadinessResponse, StatusResponse, OcrOptions, TextBox,
     BatchScanRequest, BatchScanResponse, TaskStatusResponse, ExportRequest, ExportResponse
 )
-from .ocr_service import ocr_service
+from .config import settings
+from .ocr_service import ocr_service, QueueFullError
 from .batch_scan_service import batch_scan_service
+from .services import metrics
+from .utils.pdf_pages import is_pdf, iter_pdf_pages, pdf_supported
+from .utils.response_json import dumps as dumps_json, encode_boxes, lines_content
+from .utils.tiff_pages import is_tiff, iter_tiff_frames
 
 # 配置日志
 LOG_DIR = Path(__file__).parent.parent / "logs"
@@ -50,8 +63,9 @@ def custom_openapi():
 ### ✨ 主要功能
 
 - **单图识别**：上传单张图片进行文字识别
-- **批量识别**：一次上传最多10张图片
+- **批量识别**：一次上传多张图片并发识别（数量上限为 MAX_BATCH_FILES，默认 10 张）
 - **竖排文字**：支持古书、族谱等从右到左的竖排文字
+- **校对辅助**：只检测文字框（`/api/ocr/detect`），或只识别指定的文字框（`/api/ocr/recognize-regions`）
 - **批量扫描**：指定目录自动扫描所有文件，适合族谱数字化
 - **多种格式**：支持导出 JSON、CSV 格式
 
@@ -133,6 +147,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    记录请求耗时指标，并通过 Server-Timing 响应头返回各阶段耗时
+
+    各阶段（读取上传、解码、检测、方向分类、识别、排版、序列化）耗时按请求累加；
+    并发执行的分块/批量图片各自计入，因此阶段耗时之和可能超过 total。
+    流式响应（NDJSON/SSE，没有 Content-Length）发出响应头时正文尚未生成，不返回 Server-Timing，
+    请求耗时在正文输出结束后记录
+    """
+    timings = metrics.start_request_timings()
+    start_time = time.perf_counter()
+    response = await call_next(request)
+
+    if "content-length" not in response.headers:
+        body = response.body_iterator
+
+        async def observed_body():
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                _observe_request(request, response.status_code, time.perf_counter() - start_time)
+
+        response.body_iterator = observed_body()
+        return response
+
+    elapsed = time.perf_counter() - start_time
+    timings.add("total", elapsed)
+    response.headers["Server-Timing"] = timings.header()
+    _observe_request(request, response.status_code, elapsed)
+    return response
+
+
+def _observe_request(request: Request, status_code: int, elapsed: float) -> None:
+    # 按路由模板（而不是实际路径）统计，避免任务 ID 等路径参数造成标签爆炸
+    route = request.scope.get("route")
+    metrics.observe_http_request(request.method, getattr(route, "path", "unmatched"), status_code, elapsed)
+    ocr_service.update_metrics()
+
+
 # 项目路径
 BASE_DIR = Path(__file__).resolve().parent.parent
 UPLOAD_DIR = BASE_DIR / "uploads"
@@ -148,6 +203,24 @@ STATIC_DIR.mkdir(exist_ok=True)
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
+@app.on_event("startup")
+async def start_ocr_backend():
+    """
+    启动推理后端并预热模型
+
+    预热在后台线程中进行，不阻塞服务启动：存活探针 /api/ocr/health 立即可用，
+    就绪探针 /api/ocr/ready 在模型预热完成后才返回 200
+    """
+    threading.Thread(target=ocr_service.start_backend, name="ocr-warmup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def stop_ocr_backend():
+    """停止推理后端"""
+    ocr_service.shutdown()
+    metrics.mark_process_dead()
+
+
 @app.get("/", tags=["根路径"])
 async def root():
     """根路径 - 重定向到识别工具页面"""
@@ -176,13 +249,85 @@ async def batch_page():
 
 @app.get("/api/ocr/health", response_model=HealthResponse, tags=["系统"])
 async def health_check():
-    """健康检查"""
+    """健康检查（存活探针，不代表模型已加载；负载均衡和滚动发布请使用 /api/ocr/ready）"""
     return HealthResponse(
         status="healthy",
         version="1.0.0"
     )
 
 
+@app.get(
+    "/api/ocr/ready",
+    response_model=ReadinessResponse,
+    responses={503: {"model": ReadinessResponse, "description": "模型尚未预热完成"}},
+    tags=["系统"]
+)
+async def readiness_check():
+    """
+    就绪探针
+
+    启动预热完成（OCR_PRELOAD_ENGINES 中的模型均已加载并执行过预热推理）后返回 200，
+    预热中或预热失败时返回 503
+    """
+    warmup = ocr_service.get_warmup_status()
+    response = ReadinessResponse(ready=warmup["ready"], state=warmup["state"], warmup=warmup)
+    return JSONResponse(
+        status_code=200 if response.ready else 503,
+        content=response.model_dump()
+    )
+
+
+@app.get("/metrics", tags=["系统"], response_class=Response)
+async def prometheus_metrics():
+    """
+    Prometheus 指标
+
+    - `ocr_stage_seconds{stage}`: 各阶段耗时直方图（upload_read、decode、detection、
+      classification、recognition、inference、layout、serialization）
+    - `ocr_http_request_seconds{method,route,status}`: 请求耗时直方图
+    - `ocr_recognitions_total{lang,text_layout,status}`: 按语言和排版统计的识别次数
+    - `ocr_queue_rejections_total`: 因队列已满返回 429 的请求数
+    - `ocr_engine_replicas` / `ocr_engine_replicas_in_use` / `ocr_queue_running` / `ocr_queue_waiting`: 占用情况
+
+    多个 uvicorn 工作进程时设置 PROMETHEUS_MULTIPROC_DIR，返回所有进程汇总后的指标
+    """
+    ocr_service.update_metrics()
+    content, content_type = metrics.render_latest()
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/api/ocr/admin/profiles", tags=["系统"])
+async def list_profiles():
+    """
+    列出采样分析结果（最新的在前）
+
+    OCR_PROFILE_SAMPLE_RATE 抽样或耗时超过 OCR_PROFILE_SLOW_MS 的识别请求和批量扫描页面会保存
+    调用栈采样分析；每条记录包含耗时、采样数、图片尺寸和识别选项
+    """
+    return {
+        "profiler": ocr_service.get_profiler_status(),
+        "profiles": ocr_service.get_profile_store().list()
+    }
+
+
+@app.get("/api/ocr/admin/profiles/{profile_id}", tags=["系统"])
+async def get_profile(profile_id: str, format: str = "collapsed"):
+    """
+    获取采样分析结果
+
+    - `format=collapsed`（默认）: 折叠调用栈文本，可直接导入 speedscope 或用 flamegraph.pl 生成火焰图
+    - `format=json`: 元数据（耗时、采样数、图片尺寸、识别选项）
+    """
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format 只支持 collapsed 或 json")
+    path = ocr_service.get_profile_store().path(profile_id, ".json" if format == "json" else ".collapsed")
+    if path is None:
+        raise HTTPException(status_code=404, detail="分析结果不存在")
+    if format == "json":
+        return JSONResponse(content=json.loads(path.read_text(encoding="utf-8")))
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=path.name)
+
+
 @app.get("/api/ocr/status", response_model=StatusResponse, tags=["系统"])
 async def get_status():
     """获取服务状态"""
@@ -190,6 +335,215 @@ async def get_status():
     return StatusResponse(**status)
 
 
+def _queue_full_exception(e: QueueFullError) -> HTTPException:
+    """识别队列已满时返回 429，并通过 Retry-After 告知客户端重试时间"""
+    metrics.QUEUE_REJECTIONS.inc()
+    return HTTPException(
+        status_code=429,
+        detail=f"服务繁忙，请 {e.retry_after} 秒后重试",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+class OcrJSONResponse(JSONResponse):
+    """识别结果响应：直接编码为 JSON bytes（安装 orjson 时使用 orjson，数组无需先转换为列表），不经过 pydantic 校验"""
+
+    def render(self, content) -> bytes:
+        return dumps_json(content)
+
+
+def _round_boxes(options: OcrOptions) -> bool:
+    """响应中的坐标是否取整（未指定时使用 OCR_ROUND_BOXES）"""
+    return settings.OCR_ROUND_BOXES if options.round_boxes is None else options.round_boxes
+
+
+def _result_to_json(result: dict, options: OcrOptions) -> dict:
+    """将识别结果中的 OcrLines 转换为与 TextBox 结构一致的字典列表（坐标保持为数组，由 dumps_json 直接编码）"""
+    if result.get("details") is not None:
+        result["details"] = lines_content(result["details"], _round_boxes(options))
+    return result
+
+
+def _parse_rois(rois: Optional[str]) -> Optional[List[Tuple[int, int, int, int]]]:
+    """解析 JSON 格式的识别区域 [[x1, y1, x2, y2], ...]，格式错误时返回 400"""
+    if not rois:
+        return None
+    try:
+        return OcrOptions(rois=json.loads(rois)).rois
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"rois 格式错误：{e.errors()[0]['msg']}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"rois 不是合法的 JSON：{e}")
+
+
+@contextmanager
+def _upload_sources(uploads: List[Tuple[bytes, str]]):
+    """
+    上传内容对应的识别输入
+
+    默认直接在内存中解码上传内容，不经过磁盘；OCR_DECODE_IN_MEMORY=false 时
+    回退为写入临时文件后按路径识别，退出时删除临时文件。
+
+    Args:
+        uploads: (文件内容, 扩展名) 列表
+    """
+    if settings.OCR_DECODE_IN_MEMORY:
+        yield [data for data, _ in uploads]
+        return
+
+    file_paths = [TEMP_DIR / f"{uuid.uuid4()}{file_ext}" for _, file_ext in uploads]
+    try:
+        for file_path, (data, _) in zip(file_paths, uploads):
+            file_path.write_bytes(data)
+        yield [str(p) for p in file_paths]
+    finally:
+        # 删除临时文件
+        for file_path in file_paths:
+            if file_path.exists():
+                file_path.unlink()
+
+
+async def _recognize_uploads(
+    uploads: List[Tuple[bytes, str]],
+    options: OcrOptions
+) -> List[dict]:
+    """
+    识别上传的图片内容
+
+    Args:
+        uploads: (文件内容, 扩展名) 列表
+        options: OCR 选项
+    """
+    with _upload_sources(uploads) as sources:
+        return await ocr_service.recognize_batch_async(sources, options)
+
+
+# 支持上传的图片格式（TIFF 只识别第一帧，多页 TIFF 请使用 /api/ocr/recognize-pdf）
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+# 批量/PDF 请求识别中途队列已满时的重试次数（请求开始时已检查过容量，通常无需重试）
+_BATCH_QUEUE_FULL_RETRIES = 3
+
+
+async def _recognize_with_retry(image, options: OcrOptions) -> dict:
+    """识别多页请求中的一页；中途队列已满时按 Retry-After 等待后重试"""
+    for attempt in range(_BATCH_QUEUE_FULL_RETRIES):
+        try:
+            return await ocr_service.recognize_async(image, options)
+        except QueueFullError as e:
+            await asyncio.sleep(min(e.retry_after, 5))
+    return await ocr_service.recognize_async(image, options)
+
+
+def _failed_result(error: str) -> dict:
+    return {"success": False, "text": "", "details": None, "refined_lines": 0, "processing_time": 0, "error": error}
+
+
+async def _recognize_batch_file(file: UploadFile, options: OcrOptions) -> dict:
+    """读取并识别批量请求中的一个文件，返回 JSON 可序列化的结果（失败时返回失败结果，不抛出异常）"""
+    # 检查文件格式
+    file_ext = Path(file.filename).suffix.lower()
+    if file_ext not in _IMAGE_EXTENSIONS:
+        return _failed_result(f"不支持的文件格式：{file_ext}")
+
+    try:
+        # 轮到该文件时才读入内存，读完即关闭上传的临时文件
+        with metrics.stage("upload_read"):
+            data = await file.read()
+        await file.close()
+
+        with _upload_sources([(data, file_ext)]) as sources:
+            result = await _recognize_with_retry(sources[0], options)
+        return _result_to_json(result, options)
+    except QueueFullError as e:
+        logger.warning(f"识别队列已满，批量请求中的文件未能识别 - 文件: {file.filename}, {e}")
+        return _failed_result(f"服务繁忙，请 {e.retry_after} 秒后重试")
+    except Exception as e:
+        logger.error(f"批量识别文件失败 - 文件: {file.filename}, 错误: {str(e)}", exc_info=True)
+        return _failed_result(str(e))
+
+
+def _detach_uploads(files: List[UploadFile]) -> List[UploadFile]:
+    """
+    接管上传文件的临时文件，供流式响应在接口函数返回后继续读取
+
+    FastAPI 0.118 之前在接口函数返回时（流式响应开始输出之前）就关闭上传文件。
+    Starlette 解析请求时已把上传内容存入临时文件（超过 1MB 的写入磁盘），这里把这些临时文件
+    交给新的 UploadFile，原对象换成空文件，请求结束时关闭的只是空文件；上传内容不再复制。
+    新对象由批量识别在读取后（或流式响应结束时）关闭，临时文件随之删除。
+    """
+    detached = []
+    for file in files:
+        detached.append(UploadFile(file.file, size=file.size, filename=file.filename, headers=file.headers))
+        file.file = io.BytesIO()
+    return detached
+
+
+def _batch_parallelism(count: int) -> int:
+    """批量请求同时识别的文件数（OCR_BATCH_PARALLELISM，为 0 时使用全部推理并发数）"""
+    parallelism = settings.OCR_BATCH_PARALLELISM or ocr_service.inference_capacity()
+    return max(1, min(parallelism, count))
+
+
+async def _iter_batch_results(
+    files: List[UploadFile],
+    options: OcrOptions,
+    parallelism: int
+) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    并发识别批量请求中的文件，按完成顺序产出 (文件序号, 结果)
+
+    同时最多识别 parallelism 个文件，文件内容轮到识别时才读入内存，
+    内存中的上传内容不随文件数增长。
+    """
+    pending = deque(enumerate(files))
+    done: "asyncio.Queue[Tuple[int, dict]]" = asyncio.Queue()
+
+    async def worker():
+        while pending:
+            index, file = pending.popleft()
+            await done.put((index, await _recognize_batch_file(file, options)))
+
+    workers = [asyncio.create_task(worker()) for _ in range(parallelism)]
+    try:
+        for _ in range(len(files)):
+            yield await done.get()
+    finally:
+        # 客户端提前断开时不再读取剩余文件；已开始的识别仍会在后台完成
+        for task in workers:
+            task.cancel()
+        for _, file in pending:
+            await file.close()
+
+
+def _stream_record(record: dict, stream: str) -> bytes:
+    """流式响应中的一条记录：ndjson 为一行 JSON，sse 为一个 result 事件"""
+    data = dumps_json(record)
+    if stream == "sse":
+        return b"event: result\ndata: " + data + b"\n\n"
+    return data + b"\n"
+
+
+def _streaming_response(records: AsyncIterator[dict], stream: str) -> StreamingResponse:
+    """
+    逐条输出记录的流式响应：ndjson 每行一条 JSON，sse 每条为一个 result 事件并以 done 事件结束
+
+    Args:
+        records: 按完成顺序产出的记录
+        stream: ndjson 或 sse
+    """
+    async def body():
+        count = 0
+        async for record in records:
+            count += 1
+            yield _stream_record(record, stream)
+        if stream == "sse":
+            yield f"event: done\ndata: {json.dumps({'count': count})}\n\n".encode("utf-8")
+
+    media_type = "text/event-stream" if stream == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
 @app.post("/api/ocr/recognize", response_model=OcrResponse, tags=["OCR"])
 async def recognize_image(
     file: UploadFile = File(..., description="图片文件"),
@@ -197,12 +551,20 @@ async def recognize_image(
     use_angle_cls: bool = Form(default=True, description="是否使用文字方向分类"),
     return_details: bool = Form(default=True, description="是否返回详细信息"),
     text_layout: str = Form(default="horizontal", description="文字排版方向：horizontal-横排, vertical_rl-竖排从右到左, vertical_lr-竖排从左到右"),
-    output_format: str = Form(default="line_by_line", description="输出格式：line_by_line-逐行, char_by_char-逐字, column_by_column-逐列")
+    output_format: str = Form(default="line_by_line", description="输出格式：line_by_line-逐行, char_by_char-逐字, column_by_column-逐列"),
+    max_side_len: Optional[int] = Form(default=None, ge=0, description="识别前将图片最长边缩小到该像素数（为空使用 OCR_MAX_SIDE_LEN，0 表示不缩小）"),
+    source_dpi: Optional[int] = Form(default=None, gt=0, description="原图扫描分辨率（DPI），与 target_dpi 一起使用"),
+    target_dpi: Optional[int] = Form(default=None, gt=0, description="识别使用的分辨率（DPI），图片按 target_dpi / source_dpi 缩小"),
+    tiled: Optional[bool] = Form(default=None, description="分块识别（为空时像素数超过 OCR_TILE_AUTO_PIXELS 自动启用）"),
+    angle_mode: Optional[Literal["line", "page"]] = Form(default=None, description="文字方向判断方式：line-逐行分类，page-整页判断一次（为空使用 OCR_ANGLE_MODE）"),
+    rois: Optional[str] = Form(default=None, description="只识别这些矩形区域，JSON 格式的原图坐标列表，如 [[200,300,2400,3400]]（为空识别整页）"),
+    refine_threshold: Optional[float] = Form(default=None, ge=0, le=1, description="两遍识别：低分辨率识别后从原图重新识别置信度低于该值的文字行（为空使用 OCR_REFINE_THRESHOLD，0 表示关闭）"),
+    round_boxes: Optional[bool] = Form(default=None, description="文字框坐标四舍五入为整数（为空使用 OCR_ROUND_BOXES）")
 ):
     """
     识别单张图片
 
-    支持的图片格式：jpg, png, bmp, jpeg
+    支持的图片格式：jpg, png, bmp, jpeg, tif, tiff（多页 TIFF 只识别第一帧）
 
     **新增参数说明：**
     - **text_layout**: 文字排版方向
@@ -213,32 +575,43 @@ async def recognize_image(
       - `line_by_line`: 逐行输出（默认）
       - `char_by_char`: 逐字排列，所有文字连在一起
       - `column_by_column`: 逐列排列，保留列结构
+    - **max_side_len / source_dpi / target_dpi**: 识别分辨率
+      - 大幅扫描件可缩小后识别，JPEG 直接按缩小尺寸解码，节省解码时间和内存
+      - 返回的坐标始终对应原图
+    - **tiled**: 分块识别，超大跨页扫描件切成重叠小块识别后合并，避免小字在检测缩放时丢失
+    - **angle_mode**: 文字方向判断方式
+      - `line`: 逐行方向分类
+      - `page`: 抽样几行判断整页是否倒置，省去逐行分类（适合方向一致的扫描件）
+    - **rois**: 只在指定矩形区域内检测和识别（如跳过固定的页眉、边注），返回的坐标仍对应整页
+    - **refine_threshold**: 两遍识别，先按较低分辨率（OCR_REFINE_SIDE_LEN 或 max_side_len）快速识别，
+      再从原图重新识别置信度低于该值的文字行并保留较好的结果；响应中的 refined_lines 为重新识别的行数
+    - **round_boxes**: 文字框坐标四舍五入为整数，响应更小（为空使用 OCR_ROUND_BOXES）
+
+    识别在后台线程池中执行；排队请求超过 `OCR_MAX_QUEUE_DEPTH` 时返回 429，
+    响应头 `Retry-After` 给出建议的重试秒数。
     """
     logger.info(f"收到识别请求 - 文件名: {file.filename}, 语言: {lang}, 角度分类: {use_angle_cls}, 排版: {text_layout}, 格式: {output_format}")
 
     # 检查文件格式
-    allowed_extensions = {".jpg", ".jpeg", ".png", ".bmp"}
     file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in allowed_extensions:
+    if file_ext not in _IMAGE_EXTENSIONS:
         logger.warning(f"不支持的文件格式: {file_ext}")
         return OcrResponse(
             success=False,
             text="",
             details=None,
             processing_time=0,
-            error=f"不支持的文件格式：{file_ext}，支持的格式：{', '.join(allowed_extensions)}"
+            error=f"不支持的文件格式：{file_ext}，支持的格式：{', '.join(_IMAGE_EXTENSIONS)}"
         )
 
-    # 生成唯一文件名
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = TEMP_DIR / unique_filename
+    parsed_rois = _parse_rois(rois)
 
     try:
-        # 保存上传的文件
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # 读取上传内容，直接在内存中解码识别
+        with metrics.stage("upload_read"):
+            data = await file.read()
 
-        logger.info(f"文件已保存: {file_path}, 大小: {file_path.stat().st_size} bytes")
+        logger.info(f"文件已读取: {file.filename}, 大小: {len(data)} bytes")
 
         # 创建 OCR 选项
         options = OcrOptions(
@@ -246,29 +619,41 @@ async def recognize_image(
             use_angle_cls=use_angle_cls,
             return_details=return_details,
             text_layout=text_layout,
-            output_format=output_format
+            output_format=output_format,
+            max_side_len=max_side_len,
+            source_dpi=source_dpi,
+            target_dpi=target_dpi,
+            tiled=tiled,
+            angle_mode=angle_mode,
+            rois=parsed_rois,
+            refine_threshold=refine_threshold,
+            round_boxes=round_boxes
         )
 
-        # 执行识别
-        result = ocr_service.recognize(str(file_path), options)
+        # 执行识别（在有界线程池中执行，不阻塞事件循环）
+        result = (await _recognize_uploads([(data, file_ext)], options))[0]
 
-        logger.info(f"OCR 识别结果 - success: {result.get('success')}, text 长度: {len(result.get('text', ''))}, details 数量: {len(result.get('details', []))}")
+        logger.info(f"OCR 识别结果 - success: {result.get('success')}, text 长度: {len(result.get('text', ''))}, details 数量: {len(result.get('details') or [])}")
 
         if result["success"]:
             logger.info(f"识别成功 - 文件: {file.filename}, 耗时: {result['processing_time']:.2f}秒")
         else:
             logger.error(f"识别失败 - 文件: {file.filename}, 错误: {result['error']}")
 
-        # 将 details 中的 TextBox 对象转换为字典，以便 JSON 序列化
-        if result.get("details"):
-            result["details"] = [detail.dict() for detail in result["details"]]
-            logger.info(f"转换后 details 数量: {len(result['details'])}")
+        # 将紧凑数组结果直接编码为 JSON（不经过逐行 TextBox 模型）
+        with metrics.stage("serialization"):
+            result = _result_to_json(result, options)
+            response = OcrJSONResponse(content=result)
 
-        # 记录完整响应用于调试
-        logger.debug(f"完整响应: {result}")
+        # 记录完整响应用于调试（未开启 DEBUG 时不格式化）
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"完整响应: {response.body.decode('utf-8')}")
 
-        return JSONResponse(content=result)
+        return response
 
+    except QueueFullError as e:
+        logger.warning(f"识别队列已满，拒绝请求 - 文件: {file.filename}, {e}")
+        raise _queue_full_exception(e)
     except Exception as e:
         logger.error(f"处理请求时发生异常 - 文件: {file.filename}, 错误: {str(e)}", exc_info=True)
         return OcrResponse(
@@ -278,87 +663,346 @@ async def recognize_image(
             processing_time=0,
             error=str(e)
         )
-    finally:
-        # 删除临时文件
-        if file_path.exists():
-            file_path.unlink()
-            logger.debug(f"临时文件已删除: {file_path}")
 
 
 @app.post("/api/ocr/recognize-batch", response_model=List[OcrResponse], tags=["OCR"])
 async def recognize_images_batch(
-    files: List[UploadFile] = File(..., description="图片文件列表（最多10张）"),
+    files: List[UploadFile] = File(..., description="图片文件列表（数量上限为 MAX_BATCH_FILES，默认 10 张）"),
     lang: str = Form(default="ch", description="语言类型"),
     use_angle_cls: bool = Form(default=True, description="是否使用文字方向分类"),
     return_details: bool = Form(default=True, description="是否返回详细信息"),
     text_layout: str = Form(default="horizontal", description="文字排版方向：horizontal-横排, vertical_rl-竖排从右到左, vertical_lr-竖排从左到右"),
-    output_format: str = Form(default="line_by_line", description="输出格式：line_by_line-逐行, char_by_char-逐字, column_by_column-逐列")
+    output_format: str = Form(default="line_by_line", description="输出格式：line_by_line-逐行, char_by_char-逐字, column_by_column-逐列"),
+    max_side_len: Optional[int] = Form(default=None, ge=0, description="识别前将图片最长边缩小到该像素数（为空使用 OCR_MAX_SIDE_LEN，0 表示不缩小）"),
+    source_dpi: Optional[int] = Form(default=None, gt=0, description="原图扫描分辨率（DPI），与 target_dpi 一起使用"),
+    target_dpi: Optional[int] = Form(default=None, gt=0, description="识别使用的分辨率（DPI），图片按 target_dpi / source_dpi 缩小"),
+    tiled: Optional[bool] = Form(default=None, description="分块识别（为空时像素数超过 OCR_TILE_AUTO_PIXELS 自动启用）"),
+    angle_mode: Optional[Literal["line", "page"]] = Form(default=None, description="文字方向判断方式：line-逐行分类，page-整页判断一次（为空使用 OCR_ANGLE_MODE）"),
+    rois: Optional[str] = Form(default=None, description="只识别这些矩形区域，JSON 格式的原图坐标列表，如 [[200,300,2400,3400]]（为空识别整页）"),
+    refine_threshold: Optional[float] = Form(default=None, ge=0, le=1, description="两遍识别：低分辨率识别后从原图重新识别置信度低于该值的文字行（为空使用 OCR_REFINE_THRESHOLD，0 表示关闭）"),
+    round_boxes: Optional[bool] = Form(default=None, description="文字框坐标四舍五入为整数（为空使用 OCR_ROUND_BOXES）"),
+    stream: Optional[Literal["ndjson", "sse"]] = Form(default=None, description="流式返回：ndjson-每行一条 JSON 记录，sse-Server-Sent Events；为空时全部完成后一次返回")
 ):
     """
-    批量识别图片（最多10张）
+    批量识别图片（数量上限为 MAX_BATCH_FILES，默认 10 张）
 
     **新增参数说明：**
     - **text_layout**: 文字排版方向
     - **output_format**: 输出格式
+    - **max_side_len / source_dpi / target_dpi**: 识别分辨率（坐标始终对应原图）
+    - **tiled**: 分块识别
+    - **angle_mode**: 文字方向判断方式（line-逐行，page-整页）
+    - **rois**: 只识别指定矩形区域（原图坐标）
+    - **refine_threshold**: 两遍识别（低置信度文字行从原图重新识别）
+    - **round_boxes**: 文字框坐标取整
+    - **stream**: 流式返回，每张图片识别完成后立即输出一条记录（按完成顺序，`index` 为图片在请求中的序号，
+      另带 `filename`）；`ndjson` 每行一条 JSON，`sse` 每条为一个 `result` 事件，最后输出 `done` 事件
+
+    文件并发识别，每个请求同时最多识别 `OCR_BATCH_PARALLELISM` 个（默认为全部推理并发数）；
+    文件轮到识别时才读入内存。开始前识别队列放不下这么多文件时返回 429（带 `Retry-After` 响应头）。
     """
     # 限制文件数量
-    if len(files) > 10:
+    if len(files) > settings.MAX_BATCH_FILES:
         raise HTTPException(
             status_code=400,
-            detail="最多支持同时上传10张图片"
+            detail=f"最多支持同时上传{settings.MAX_BATCH_FILES}张图片"
         )
 
-    results = []
-    for file in files:
-        # 检查文件格式
-        allowed_extensions = {".jpg", ".jpeg", ".png", ".bmp"}
-        file_ext = Path(file.filename).suffix.lower()
-        if file_ext not in allowed_extensions:
-            results.append(OcrResponse(
-                success=False,
-                text="",
-                details=None,
-                processing_time=0,
-                error=f"不支持的文件格式：{file_ext}"
-            ))
-            continue
-
-        # 生成唯一文件名
-        unique_filename = f"{uuid.uuid4()}{file_ext}"
-        file_path = TEMP_DIR / unique_filename
+    # 创建 OCR 选项
+    options = OcrOptions(
+        lang=lang,
+        use_angle_cls=use_angle_cls,
+        return_details=return_details,
+        text_layout=text_layout,
+        output_format=output_format,
+        max_side_len=max_side_len,
+        source_dpi=source_dpi,
+        target_dpi=target_dpi,
+        tiled=tiled,
+        angle_mode=angle_mode,
+        rois=_parse_rois(rois),
+        refine_threshold=refine_threshold,
+        round_boxes=round_boxes
+    )
 
-        try:
-            # 保存上传的文件
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-
-            # 创建 OCR 选项
-            options = OcrOptions(
-                lang=lang,
-                use_angle_cls=use_angle_cls,
-                return_details=return_details,
-                text_layout=text_layout,
-                output_format=output_format
+    parallelism = _batch_parallelism(len(files))
+    try:
+        # 开始前检查队列容量：放不下本请求同时识别的文件时直接返回 429
+        ocr_service.check_capacity(parallelism)
+    except QueueFullError as e:
+        logger.warning(f"识别队列已满，拒绝批量请求 - 文件数: {len(files)}, {e}")
+        raise _queue_full_exception(e)
+
+    if stream:
+        # 响应输出期间才读取的文件先转存，不受接口返回时关闭上传文件的影响
+        files = _detach_uploads(files)
+
+    # 文件逐个读入并识别，同时最多识别 parallelism 个
+    batch_results = _iter_batch_results(files, options, parallelism)
+    if stream:
+        # 每个文件识别完成后立即输出一条记录（按完成顺序，带请求中的序号 index 和文件名）
+        return _streaming_response(
+            ({"index": index, "filename": files[index].filename, **result} async for index, result in batch_results),
+            stream
+        )
+
+    results: List[dict] = [None] * len(files)
+    async for index, result in batch_results:
+        results[index] = result
+
+    with metrics.stage("serialization"):
+        return OcrJSONResponse(content=results)
+
+
+def _save_upload(source: BinaryIO, file_path: Path) -> None:
+    """分块复制上传内容到文件，不整体读入内存"""
+    source.seek(0)
+    with open(file_path, "wb") as target:
+        shutil.copyfileobj(source, target)
+
+
+def _remove_temp_file(file_path: Path) -> None:
+    try:
+        file_path.unlink(missing_ok=True)
+    except OSError as e:
+        # Windows 下文件仍被内存映射时无法删除
+        logger.warning(f"临时文件删除失败: {file_path}, {e}")
+
+
+async def _iter_pdf_results(
+    file_path: Path,
+    dpi: int,
+    options: OcrOptions,
+    first_page: int = 1,
+    last_page: Optional[int] = None
+) -> AsyncIterator[dict]:
+    """
+    逐页渲染并识别 PDF（或逐帧识别多页 TIFF），按页码顺序产出每页的结果（带页码 page）
+
+    每页识别完成后才读取下一页，内存中只保留一页图片；未压缩的 TIFF 帧直接引用文件的内存映射，不复制。
+    读取失败时输出一条失败记录后结束；结束时删除 file_path
+
+    Args:
+        file_path: 转存上传内容的临时文件（扩展名为 .tif 或 .pdf）
+    """
+    try:
+        if is_tiff(str(file_path)):
+            pages = iter_tiff_frames(str(file_path), first_page, last_page)
+        else:
+            pages = iter_pdf_pages(str(file_path), dpi, first_page, last_page)
+    except BaseException:
+        _remove_temp_file(file_path)
+        raise
+    try:
+        while True:
+            try:
+                with metrics.stage("decode"):
+                    item = await run_in_threadpool(next, pages, None)
+            except Exception as e:
+                logger.error(f"页面读取失败: {e}", exc_info=True)
+                yield {"page": None, **_failed_result(f"页面读取失败：{e}")}
+                return
+            if item is None:
+                return
+            page_number, image = item
+            try:
+                result = await _recognize_with_retry(image, options)
+            except QueueFullError as e:
+                result = _failed_result(f"服务繁忙，请 {e.retry_after} 秒后重试")
+            del image
+            yield {"page": page_number, **_result_to_json(result, options)}
+    finally:
+        pages.close()
+        del pages
+        _remove_temp_file(file_path)
+
+
+@app.post("/api/ocr/recognize-pdf", response_model=List[OcrResponse], tags=["OCR"])
+async def recognize_pdf(
+    file: UploadFile = File(..., description="PDF 或多页 TIFF 文件"),
+    lang: str = Form(default="ch", description="语言类型"),
+    use_angle_cls: bool = Form(default=True, description="是否使用文字方向分类"),
+    return_details: bool = Form(default=True, description="是否返回详细信息"),
+    text_layout: str = Form(default="horizontal", description="文字排版方向：horizontal-横排, vertical_rl-竖排从右到左, vertical_lr-竖排从左到右"),
+    output_format: str = Form(default="line_by_line", description="输出格式：line_by_line-逐行, char_by_char-逐字, column_by_column-逐列"),
+    angle_mode: Optional[Literal["line", "page"]] = Form(default=None, description="文字方向判断方式：line-逐行分类，page-整页判断一次（同一 PDF 方向确认后后续页面不再判断）"),
+    dpi: Optional[int] = Form(default=None, gt=0, le=600, description="PDF 页面渲染分辨率（为空使用 PDF_RENDER_DPI）"),
+    first_page: int = Form(default=1, ge=1, description="起始页码（从 1 开始）"),
+    last_page: Optional[int] = Form(default=None, ge=1, description="结束页码（包含，为空时到最后一页）"),
+    round_boxes: Optional[bool] = Form(default=None, description="文字框坐标四舍五入为整数（为空使用 OCR_ROUND_BOXES）"),
+    stream: Optional[Literal["ndjson", "sse"]] = Form(default=None, description="流式返回：ndjson-每行一条 JSON 记录，sse-Server-Sent Events；为空时全部完成后一次返回")
+):
+    """
+    识别 PDF 或多页 TIFF 文件（每页单独识别）
+
+    PDF 逐页渲染为图片后识别，每页识别完成后才渲染下一页，内存中只保留一页图片；
+    多页 TIFF 逐帧识别，未压缩的帧直接引用上传数据（`dpi` 对 TIFF 无效）。
+    每页返回一条结果，带页码 `page`（从 1 开始）；`stream` 为 ndjson/sse 时每页完成后立即输出。
+
+    识别 PDF 需要服务器安装 PyMuPDF；排队请求超过 `OCR_MAX_QUEUE_DEPTH` 时返回 429。
+    上传内容分块转存到临时文件后逐页读取，不整体读入内存，响应结束后删除临时文件。
+    """
+    header = await file.read(8)
+    tiff = is_tiff(header)
+    if not tiff:
+        if not pdf_supported():
+            raise HTTPException(status_code=501, detail="服务器未安装 PyMuPDF，不支持识别 PDF")
+        if not is_pdf(header):
+            raise HTTPException(status_code=400, detail=f"不是有效的 PDF 或 TIFF 文件：{file.filename}")
+
+    # 同一文件的页面共用整页方向记忆
+    options = OcrOptions(
+        lang=lang,
+        use_angle_cls=use_angle_cls,
+        return_details=return_details,
+        text_layout=text_layout,
+        output_format=output_format,
+        angle_mode=angle_mode,
+        orientation_scope=f"pdf-{uuid.uuid4()}",
+        round_boxes=round_boxes
+    )
+    try:
+        ocr_service.check_capacity(1)
+    except QueueFullError as e:
+        logger.warning(f"识别队列已满，拒绝 PDF/TIFF 识别请求 - 文件: {file.filename}, {e}")
+        raise _queue_full_exception(e)
+
+    # TIFF 帧直接引用临时文件的内存映射，内存中只有正在识别的页面
+    file_path = TEMP_DIR / f"{uuid.uuid4()}{'.tif' if tiff else '.pdf'}"
+    try:
+        with metrics.stage("upload_read"):
+            await run_in_threadpool(_save_upload, file.file, file_path)
+        await file.close()
+    except BaseException:
+        _remove_temp_file(file_path)
+        raise
+    logger.info(
+        f"收到 PDF/TIFF 识别请求 - 文件名: {file.filename}, 大小: {file_path.stat().st_size} bytes, 语言: {lang}"
+    )
+
+    page_results = _iter_pdf_results(file_path, dpi or settings.PDF_RENDER_DPI, options, first_page, last_page)
+    if stream:
+        return _streaming_response(page_results, stream)
+
+    results = [result async for result in page_results]
+    with metrics.stage("serialization"):
+        return OcrJSONResponse(content=results)
+
+
+def _parse_regions(regions: str) -> List[List[List[float]]]:
+    """解析 JSON 格式的文字框列表，格式错误时返回 400"""
+    try:
+        polygons = json.loads(regions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"regions 不是合法的 JSON：{e}")
+
+    if not isinstance(polygons, list) or not polygons:
+        raise HTTPException(status_code=400, detail="regions 必须是非空的文字框列表")
+    if len(polygons) > settings.OCR_MAX_REGIONS:
+        raise HTTPException(status_code=400, detail=f"最多支持同时识别 {settings.OCR_MAX_REGIONS} 个文字框")
+    for index, polygon in enumerate(polygons):
+        valid = isinstance(polygon, list) and len(polygon) >= 4 and all(
+            isinstance(point, list) and len(point) == 2
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in point)
+            for point in polygon
+        )
+        if not valid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"第 {index + 1} 个文字框格式错误，应为至少四个点的坐标列表 [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]"
             )
+    return polygons
 
-            # 执行识别
-            result = ocr_service.recognize(str(file_path), options)
-            results.append(OcrResponse(**result))
-
-        except Exception as e:
-            results.append(OcrResponse(
-                success=False,
-                text="",
-                details=None,
-                processing_time=0,
-                error=str(e)
-            ))
-        finally:
-            # 删除临时文件
-            if file_path.exists():
-                file_path.unlink()
 
-    return results
+@app.post("/api/ocr/detect", response_model=DetectResponse, tags=["OCR"])
+async def detect_text_boxes(
+    file: UploadFile = File(..., description="图片文件"),
+    lang: str = Form(default="ch", description="语言类型（与识别接口共用已加载的模型）"),
+    use_angle_cls: bool = Form(default=True, description="是否使用文字方向分类（与识别接口共用已加载的模型）"),
+    max_side_len: Optional[int] = Form(default=None, ge=0, description="检测前将图片最长边缩小到该像素数（为空使用 OCR_MAX_SIDE_LEN，0 表示不缩小）"),
+    source_dpi: Optional[int] = Form(default=None, gt=0, description="原图扫描分辨率（DPI），与 target_dpi 一起使用"),
+    target_dpi: Optional[int] = Form(default=None, gt=0, description="检测使用的分辨率（DPI），图片按 target_dpi / source_dpi 缩小"),
+    round_boxes: Optional[bool] = Form(default=None, description="文字框坐标四舍五入为整数（为空使用 OCR_ROUND_BOXES）")
+):
+    """
+    只检测文字框，不识别文字
+
+    校对界面只需要文字框排版时使用，省去方向分类和识别，耗时远低于完整识别。
+    返回的文字框按阅读顺序排列，坐标对应原图。
+
+    排队请求超过 `OCR_MAX_QUEUE_DEPTH` 时返回 429（带 `Retry-After` 响应头）。
+    """
+    file_ext = Path(file.filename).suffix.lower()
+    if file_ext not in _IMAGE_EXTENSIONS:
+        return DetectResponse(
+            success=False,
+            processing_time=0,
+            error=f"不支持的文件格式：{file_ext}，支持的格式：{', '.join(_IMAGE_EXTENSIONS)}"
+        )
+
+    options = OcrOptions(
+        lang=lang,
+        use_angle_cls=use_angle_cls,
+        max_side_len=max_side_len,
+        source_dpi=source_dpi,
+        target_dpi=target_dpi,
+        round_boxes=round_boxes
+    )
+    try:
+        with metrics.stage("upload_read"):
+            data = await file.read()
+        result = await ocr_service.detect_async(data, options)
+    except QueueFullError as e:
+        logger.warning(f"识别队列已满，拒绝检测请求 - 文件: {file.filename}, {e}")
+        raise _queue_full_exception(e)
+
+    with metrics.stage("serialization"):
+        if result["boxes"] is not None:
+            result["boxes"] = encode_boxes(result["boxes"], _round_boxes(options))
+        return OcrJSONResponse(content=result)
+
+
+@app.post("/api/ocr/recognize-regions", response_model=OcrResponse, tags=["OCR"])
+async def recognize_regions(
+    file: UploadFile = File(..., description="图片文件"),
+    regions: str = Form(..., description="JSON 格式的文字框列表（原图坐标），如 [[[100,50],[200,50],[200,80],[100,80]]]"),
+    lang: str = Form(default="ch", description="语言类型"),
+    use_angle_cls: bool = Form(default=True, description="是否使用文字方向分类"),
+    return_details: bool = Form(default=True, description="是否返回详细信息"),
+    round_boxes: Optional[bool] = Form(default=None, description="文字框坐标四舍五入为整数（为空使用 OCR_ROUND_BOXES）")
+):
+    """
+    识别指定文字框中的文字（跳过检测）
+
+    校对界面重新识别人工调整过的文字框时使用：只对这些文字框执行识别，所有文字框一次成批识别。
+
+    - **regions**: 原图坐标下的文字框列表，每个文字框至少四个点；不是四个点时取其外接矩形
+    - 返回的 details 与 regions 一一对应、顺序一致（不按置信度过滤，空文字也会返回）
+    - 单次最多 `OCR_MAX_REGIONS` 个文字框
+    """
+    polygons = _parse_regions(regions)
+
+    file_ext = Path(file.filename).suffix.lower()
+    if file_ext not in _IMAGE_EXTENSIONS:
+        return OcrResponse(
+            success=False,
+            text="",
+            details=None,
+            processing_time=0,
+            error=f"不支持的文件格式：{file_ext}，支持的格式：{', '.join(_IMAGE_EXTENSIONS)}"
+        )
+
+    options = OcrOptions(lang=lang, use_angle_cls=use_angle_cls, return_details=return_details, round_boxes=round_boxes)
+    try:
+        with metrics.stage("upload_read"):
+            data = await file.read()
+        result = await ocr_service.recognize_regions_async(data, polygons, options)
+    except QueueFullError as e:
+        logger.warning(f"识别队列已满，拒绝区域识别请求 - 文件: {file.filename}, {e}")
+        raise _queue_full_exception(e)
+
+    with metrics.stage("serialization"):
+        return OcrJSONResponse(content=_result_to_json(result, options))
 
 
 # ============ 批量扫描 API 端点 ============
@@ -1,113 +1,142 @@
 """PaddleOCR 服务封装"""
 import os
 import time
+import asyncio
 import threading
+import contextvars
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import numpy as np
+import paddleocr
 from paddleocr import PaddleOCR
-from .schemas import TextBox, OcrOptions
-
-
-def _calculate_box_center(box: List[List[float]]) -> tuple:
-    """计算文字框的中心点坐标"""
-    center_x = sum(p[0] for p in box) / 4
-    center_y = sum(p[1] for p in box) / 4
-    return center_x, center_y
-
-
-def _sort_horizontal(details: List[Dict]) -> List[Dict]:
-    """横排从左到右排序"""
-    for item in details:
-        item['_center_x'], item['_center_y'] = _calculate_box_center(item['box'])
-    # 先按Y升序（从上到下），再按X升序（从左到右）
-    sorted_items = sorted(details, key=lambda x: (x['_center_y'], x['_center_x']))
-    for item in sorted_items:
-        del item['_center_x'], item['_center_y']
-    return sorted_items
-
-
-def _sort_vertical_rl(details: List[Dict]) -> List[Dict]:
-    """竖排从右到左排序"""
-    for item in details:
-        item['_center_x'], item['_center_y'] = _calculate_box_center(item['box'])
-    # 先按X降序（从右到左），再按Y升序（从上到下）
-    sorted_items = sorted(details, key=lambda x: (-x['_center_x'], x['_center_y']))
-    for item in sorted_items:
-        del item['_center_x'], item['_center_y']
-    return sorted_items
-
-
-def _sort_vertical_lr(details: List[Dict]) -> List[Dict]:
-    """竖排从左到右排序"""
-    for item in details:
-        item['_center_x'], item['_center_y'] = _calculate_box_center(item['box'])
-    # 先按X升序（从左到右），再按Y升序（从上到下）
-    sorted_items = sorted(details, key=lambda x: (x['_center_x'], x['_center_y']))
-    for item in sorted_items:
-        del item['_center_x'], item['_center_y']
-    return sorted_items
-
-
-def _format_text_by_layout(details: List[Dict], text_layout: str, output_format: str) -> str:
+from .config import settings
+from .schemas import OcrOptions
+from .services import metrics, ocr_stages
+from .services.engine_registry import EngineRegistry
+from .services.process_backend import ProcessBackend
+from .services.inference_queue import InferenceQueue, QueueFullError
+from .services.batch_scheduler import MicroBatchScheduler
+from .services.result_cache import ResultCache, make_cache_key
+from .services.warmup import WarmupTracker, parse_engine_keys, warm_pool
+from .services.profiler import ProfileStore, SamplingProfiler
+from .services.orientation import OrientationMemo
+from .services.tiling import plan_tiles, merge_tile_lines
+from .utils.image_io import (
+    ImageSource, image_size, load_frame, load_image, load_image_scaled, rescale_boxes, resolve_scale
+)
+from .utils.ocr_lines import OcrLines
+from .utils.reading_order import format_text
+
+
+def _describe_image(image: ImageSource) -> str:
+    """生成用于日志的图片描述（避免把图片字节写进日志）"""
+    if isinstance(image, np.ndarray):
+        return f"<ndarray {image.shape[1]}x{image.shape[0]}>"
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return f"<{len(image)} bytes>"
+    return str(image)
+
+
+def _to_quad(poly: List[List[float]]) -> List[List[float]]:
+    """多边形不是四个点时（如弯曲文本），取其外接矩形的四个角"""
+    if len(poly) == 4:
+        return poly
+    if len(poly) == 0:
+        return [[0, 0], [0, 0], [0, 0], [0, 0]]
+    xs = [float(p[0]) for p in poly]
+    ys = [float(p[1]) for p in poly]
+    x1, y1, x2, y2 = min(xs), min(ys), max(xs), max(ys)
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+def _parse_ocr_result(result) -> Tuple[List[str], np.ndarray, np.ndarray]:
     """
-    根据排版方向和输出格式生成文本
+    将 PaddleOCR 返回结果解析为紧凑数组
 
-    Args:
-        details: 识别结果列表
-        text_layout: 文字排版方向 (horizontal, vertical_rl, vertical_lr)
-        output_format: 输出格式 (line_by_line, char_by_char, column_by_column)
+    兼容新版（字典：rec_texts/rec_scores/rec_polys）和旧版（列表：[[box, (text, score)], ...]）格式
 
     Returns:
-        格式化后的文本
+        (texts, boxes, scores): 文字列表、float32 坐标数组 (N, 4, 2)、float64 置信度数组 (N,)
     """
-    if not details:
-        return ""
-
-    # 转换为字典列表以便处理
-    items = [item.dict() if hasattr(item, 'dict') else item for item in details]
-
-    # 根据排版方向排序
-    if text_layout == "vertical_rl":
-        sorted_items = _sort_vertical_rl(items)
-    elif text_layout == "vertical_lr":
-        sorted_items = _sort_vertical_lr(items)
-    else:  # horizontal
-        sorted_items = _sort_horizontal(items)
-
-    # 根据输出格式生成文本
-    if output_format == "char_by_char":
-        # 逐字排列：将所有文字连在一起
-        return "".join(item['text'] for item in sorted_items)
-
-    elif output_format == "column_by_column":
-        # 逐列排列：需要按列分组
-        if text_layout == "vertical_rl" or text_layout == "vertical_lr":
-            # 竖排版：按X坐标分列
-            columns = {}
-            for item in sorted_items:
-                center_x, _ = _calculate_box_center(item['box'])
-                # 使用X坐标作为列的键（四舍五入以处理精度问题）
-                col_key = round(center_x, 0)
-                if col_key not in columns:
-                    columns[col_key] = []
-                columns[col_key].append(item['text'])
-            # 将每列的文字连成一行
-            return "\n".join("".join(col) for col in columns.values())
-        else:
-            # 横排版：按行分组
-            lines = {}
-            for item in sorted_items:
-                _, center_y = _calculate_box_center(item['box'])
-                line_key = round(center_y, 0)
-                if line_key not in lines:
-                    lines[line_key] = []
-                lines[line_key].append(item['text'])
-            return "\n".join("".join(line) for line in lines.values())
-
-    else:  # line_by_line (默认)
-        # 逐行排列：每个识别结果一行
-        return "\n".join(item['text'] for item in sorted_items)
+    texts = []
+    boxes = []
+    scores = []
+    zero_box = [[0, 0], [0, 0], [0, 0], [0, 0]]
+
+    if result and result[0]:
+        # 兼容新版 PaddleOCR 返回格式（字典）
+        if isinstance(result[0], dict):
+            logger.debug("检测到新版 PaddleOCR 格式（字典）")
+            rec_texts = result[0].get('rec_texts', [])
+            rec_scores = result[0].get('rec_scores', [])
+            rec_polys = result[0].get('rec_polys', [])
+
+            for i, text in enumerate(rec_texts):
+                if not text:
+                    continue
+                texts.append(text)
+                scores.append(float(rec_scores[i]) if i < len(rec_scores) else 1.0)
+                if i < len(rec_polys):
+                    poly = rec_polys[i]
+                    boxes.append(_to_quad(poly.tolist() if isinstance(poly, np.ndarray) else poly))
+                else:
+                    boxes.append(zero_box)
+
+        # 兼容旧版 PaddleOCR 返回格式（列表）
+        elif isinstance(result[0], list):
+            logger.debug("检测到旧版 PaddleOCR 格式（列表）")
+            for line in result[0]:
+                if not line:
+                    continue
+                try:
+                    box_coords = line[0]
+                    text_info = line[1]
+
+                    # 兼容不同版本的 PaddleOCR 返回格式
+                    if isinstance(text_info, (list, tuple)) and len(text_info) >= 2:
+                        text = text_info[0]
+                        confidence = float(text_info[1])
+                    elif isinstance(text_info, str):
+                        text = text_info
+                        confidence = 1.0
+                    else:
+                        continue
+
+                    if not text:
+                        continue
+
+                    try:
+                        box = _to_quad([[float(x), float(y)] for x, y in box_coords])
+                    except (ValueError, TypeError):
+                        box = zero_box
+
+                    texts.append(text)
+                    scores.append(confidence)
+                    boxes.append(box)
+                except Exception as e:
+                    logger.warning(f"跳过无法解析的识别结果: {e}")
+                    continue
+
+    if not texts:
+        return [], np.zeros((0, 4, 2), dtype=np.float32), np.zeros((0,), dtype=np.float64)
+    return (
+        texts,
+        np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2),
+        np.asarray(scores, dtype=np.float64)
+    )
+
+
+# 不影响识别结果的选项（结果呈现方式、方向记忆范围），不参与结果缓存键
+_POSTPROCESS_OPTIONS = {"return_details", "text_layout", "output_format", "orientation_scope", "round_boxes"}
+
+# 与配置项合并后才确定的选项，缓存键使用合并后的值（见 _cache_namespace）
+_RESOLVED_OPTIONS = {"max_side_len", "source_dpi", "target_dpi", "angle_mode", "refine_threshold"}
+
+# 模型版本变化后磁盘缓存自动失效
+_PADDLEOCR_VERSION = getattr(paddleocr, "__version__", "unknown")
+
 
 # 配置日志
 LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
@@ -128,7 +157,15 @@ class OcrService:
     """OCR 服务单例类"""
     _instance = None
     _lock = threading.Lock()
-    _ocr_engine = None
+    _registry = None
+    _process_backend = None
+    _inference_queue = None
+    _scheduler = None
+    _result_cache = None
+    _warmup = None
+    _profiler = None
+    _orientation = None
+    _stats_lock = threading.Lock()
     total_requests = 0
     total_images = 0
 
@@ -141,198 +178,957 @@ class OcrService:
 
     def __init__(self):
         """初始化 OCR 服务（懒加载）"""
-        pass
-
-    def _get_ocr_engine(self, lang: str = "ch", use_angle_cls: bool = True):
-        """获取 OCR 引擎（懒加载）"""
-        if self._ocr_engine is None:
-            # 暂时使用 CPU 模式，WSL2 GPU 存在兼容性问题
-            logger.info(f"正在加载 PaddleOCR 模型（语言：{lang}，文字方向分类：{use_angle_cls}，使用 CPU）...")
-            start_time = time.time()
+        if self._registry is None:
+            with self._lock:
+                if self._registry is None:
+                    # 按 (lang, use_angle_cls) 缓存多个引擎，超出数量或内存上限时淘汰最久未使用的
+                    # 每个选项组合维护 OCR_ENGINE_REPLICAS 个副本，请求独占借出一个副本执行推理
+                    OcrService._registry = EngineRegistry(
+                        factory=self._create_ocr_engine,
+                        max_engines=settings.OCR_MAX_ENGINES,
+                        max_rss_mb=settings.OCR_MAX_ENGINES_RSS_MB,
+                        replicas=settings.OCR_ENGINE_REPLICAS,
+                        checkout_timeout=settings.OCR_ENGINE_CHECKOUT_TIMEOUT
+                    )
+                    OcrService._warmup = WarmupTracker()
+                    # 按批量任务/书籍记住整页方向，确认后同一范围的后续页面不再检测
+                    OcrService._orientation = OrientationMemo(
+                        confirm_pages=settings.OCR_PAGE_ORIENTATION_CONFIRM
+                    )
+
+    @staticmethod
+    def _create_ocr_engine(lang: str, use_angle_cls: bool):
+        """创建 PaddleOCR 引擎"""
+        # 暂时使用 CPU 模式，WSL2 GPU 存在兼容性问题
+        logger.info(f"正在加载 PaddleOCR 模型（语言：{lang}，文字方向分类：{use_angle_cls}，使用 CPU）...")
+        start_time = time.time()
+        try:
+            engine = PaddleOCR(
+                use_angle_cls=use_angle_cls,
+                lang=lang,
+                **OcrService._engine_kwargs()
+            )
+            load_time = time.time() - start_time
+            logger.info(f"PaddleOCR 模型加载完成，耗时：{load_time:.2f} 秒")
+            return engine
+        except Exception as e:
+            logger.error(f"PaddleOCR 模型加载失败: {str(e)}", exc_info=True)
+            raise
+
+    @staticmethod
+    def _engine_kwargs() -> Dict[str, Any]:
+        """创建引擎时按配置传入的额外参数"""
+        kwargs = {}
+        if settings.OCR_CPU_THREADS > 0:
+            # 多副本时限制每个预测器的线程数，避免副本之间争抢 CPU
+            kwargs["cpu_threads"] = settings.OCR_CPU_THREADS
+        return kwargs
+
+    def _checkout_engine(self, lang: str = "ch", use_angle_cls: bool = True):
+        """
+        借出 OCR 引擎副本（按语言和角度分类选项懒加载）
+
+        用法：
+            with self._checkout_engine(lang, use_angle_cls) as ocr:
+                ocr.ocr(image)
+
+        副本在 OCR_ENGINE_CHECKOUT_TIMEOUT 秒内无空闲时抛出 EngineBusyError
+        """
+        return self._registry.checkout(lang, use_angle_cls)
+
+    def _get_process_backend(self) -> ProcessBackend:
+        """获取进程池推理后端（懒加载）"""
+        if self._process_backend is None:
+            with self._lock:
+                if self._process_backend is None:
+                    OcrService._process_backend = ProcessBackend(
+                        workers=settings.OCR_PROCESS_WORKERS,
+                        preload=self.preload_keys()
+                    )
+        return self._process_backend
+
+    @staticmethod
+    def preload_keys() -> List[Tuple[str, bool]]:
+        """
+        启动时预加载的模型列表（OCR_PRELOAD_ENGINES，为空时为默认语言和角度分类选项）
+
+        最多 OCR_MAX_ENGINES 个：超出的模型加载后会淘汰先预热的模型，就绪状态却仍会报告它们已预热
+        """
+        keys = parse_engine_keys(settings.OCR_PRELOAD_ENGINES, settings.OCR_USE_ANGLE_CLS)
+        keys = keys or [(settings.OCR_LANG, settings.OCR_USE_ANGLE_CLS)]
+        max_engines = max(1, settings.OCR_MAX_ENGINES)
+        if len(keys) > max_engines:
+            logger.warning(
+                f"OCR_PRELOAD_ENGINES 中的模型数（{len(keys)}）超过 OCR_MAX_ENGINES（{max_engines}），"
+                f"只预加载前 {max_engines} 个: {keys[:max_engines]}，忽略 {keys[max_engines:]}"
+            )
+            keys = keys[:max_engines]
+        return keys
+
+    def warmup(self, keys: Optional[List[Tuple[str, bool]]] = None) -> bool:
+        """
+        在当前进程中预加载模型，并用合成图片对每个副本执行预热推理
+
+        Args:
+            keys: (lang, use_angle_cls) 列表，默认为 preload_keys()
+
+        Returns:
+            是否全部预热成功
+        """
+        if not settings.OCR_WARMUP_ENABLED:
+            self._warmup.disable()
+            return True
+        if keys is None:
             try:
-                self._ocr_engine = PaddleOCR(
-                    use_angle_cls=use_angle_cls,
-                    lang=lang,
+                keys = self.preload_keys()
+            except ValueError as e:
+                logger.error(f"OCR_PRELOAD_ENGINES 配置错误: {str(e)}")
+                self._warmup.begin()
+                self._warmup.finish(error=str(e))
+                return False
+        logger.info(f"开始预热模型: {keys}")
+        return self._warmup.run(
+            keys,
+            lambda key: warm_pool(self._registry, key, runs=settings.OCR_WARMUP_RUNS)
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        """模型是否已预热完成，可以接收流量"""
+        return self._warmup.ready
+
+    def get_warmup_status(self) -> Dict[str, Any]:
+        """获取预热状态（状态、每个模型的加载与预热耗时）"""
+        return self._warmup.get_status()
+
+    def _get_profiler(self) -> SamplingProfiler:
+        """获取采样分析器（懒加载）"""
+        if self._profiler is None:
+            with self._lock:
+                if self._profiler is None:
+                    OcrService._profiler = SamplingProfiler(
+                        ProfileStore(settings.LOG_DIR / "profiles", max_files=settings.OCR_PROFILE_MAX_FILES),
+                        sample_rate=settings.OCR_PROFILE_SAMPLE_RATE,
+                        slow_threshold=settings.OCR_PROFILE_SLOW_MS / 1000,
+                        interval=settings.OCR_PROFILE_INTERVAL_MS / 1000
+                    )
+        return self._profiler
+
+    def profile(self, label: str):
+        """
+        对一段代码进行采样分析（OCR_PROFILE_SAMPLE_RATE 抽样或耗时超过 OCR_PROFILE_SLOW_MS 时保存）
+
+        用法：
+            with ocr_service.profile("batch_page") as profile:
+                if profile is not None:
+                    profile.annotate({"file": file_path})
+                ...
+
+        分析结果（折叠调用栈和元数据）保存在 logs/profiles/ 目录
+        """
+        return self._get_profiler().profile(label)
+
+    def get_profile_store(self) -> ProfileStore:
+        """获取分析结果存储"""
+        return self._get_profiler().store
+
+    def get_profiler_status(self) -> Dict[str, Any]:
+        """获取采样分析器状态"""
+        return self._get_profiler().get_status()
+
+    @property
+    def uses_process_backend(self) -> bool:
+        """是否在独立进程中执行推理"""
+        return settings.OCR_BACKEND == "process"
+
+    def inference_capacity(self) -> int:
+        """可同时执行的推理数（进程池的进程数，或每个模型的副本数；微批模式下每个副本可同时容纳一整批）"""
+        if self.uses_process_backend:
+            return max(1, settings.OCR_PROCESS_WORKERS)
+        if settings.OCR_MICRO_BATCH_ENABLED:
+            return max(1, settings.OCR_ENGINE_REPLICAS) * max(1, settings.OCR_MICRO_BATCH_MAX_SIZE)
+        return max(1, settings.OCR_ENGINE_REPLICAS)
+
+    def check_capacity(self, count: int = 1) -> None:
+        """
+        检查识别队列能否再容纳 count 个请求（不占用名额）
+
+        Raises:
+            QueueFullError: 队列剩余容量不足时
+        """
+        self._get_inference_queue().check_capacity(count)
+
+    def _get_inference_queue(self) -> InferenceQueue:
+        """获取异步识别使用的有界执行队列（懒加载）"""
+        if self._inference_queue is None:
+            with self._lock:
+                if self._inference_queue is None:
+                    OcrService._inference_queue = InferenceQueue(
+                        workers=settings.OCR_ASYNC_WORKERS or self.inference_capacity(),
+                        max_queue_depth=settings.OCR_MAX_QUEUE_DEPTH,
+                        retry_after=settings.OCR_RETRY_AFTER
+                    )
+        return self._inference_queue
+
+    def _get_scheduler(self) -> MicroBatchScheduler:
+        """获取微批调度器（懒加载）"""
+        if self._scheduler is None:
+            with self._lock:
+                if self._scheduler is None:
+                    OcrService._scheduler = MicroBatchScheduler(
+                        self._registry,
+                        window_ms=settings.OCR_MICRO_BATCH_WINDOW_MS,
+                        max_batch_size=settings.OCR_MICRO_BATCH_MAX_SIZE
+                    )
+        return self._scheduler
+
+    def _get_result_cache(self) -> Optional[ResultCache]:
+        """获取识别结果缓存（懒加载），内存和磁盘缓存均未启用时返回 None"""
+        if self._result_cache is None and (settings.OCR_RESULT_CACHE_SIZE > 0 or settings.OCR_RESULT_CACHE_DIR):
+            with self._lock:
+                if self._result_cache is None:
+                    disk_dir = None
+                    if settings.OCR_RESULT_CACHE_DIR:
+                        disk_dir = Path(settings.OCR_RESULT_CACHE_DIR)
+                        if not disk_dir.is_absolute():
+                            disk_dir = settings.BASE_DIR / disk_dir
+                    OcrService._result_cache = ResultCache(
+                        max_entries=settings.OCR_RESULT_CACHE_SIZE,
+                        disk_dir=disk_dir,
+                        disk_ttl=settings.OCR_RESULT_CACHE_TTL,
+                        disk_max_bytes=settings.OCR_RESULT_CACHE_DISK_MB * 1024 * 1024
+                    )
+        return self._result_cache
+
+    @staticmethod
+    def _cache_namespace(options: OcrOptions) -> Dict[str, Any]:
+        """
+        影响推理结果的选项和配置（排版、输出格式等后处理选项不参与缓存键）
+
+        分辨率、方向判断方式等选项未指定时取决于配置，缓存键使用与配置合并后的实际取值，
+        修改配置后磁盘缓存中按旧配置识别的结果不会被命中
+        """
+        namespace = options.model_dump(exclude=_POSTPROCESS_OPTIONS | _RESOLVED_OPTIONS)
+        max_side_len, scale = OcrService._resolution_policy(options)
+        namespace.update(
+            max_side_len=max_side_len,
+            scale=scale,
+            min_score=OcrService._first_pass_min_score(options),
+            angle_mode=OcrService._angle_mode(options) if options.use_angle_cls else None,
+            orientation_samples=settings.OCR_PAGE_ORIENTATION_SAMPLES,
+            tile_auto_pixels=settings.OCR_TILE_AUTO_PIXELS if options.tiled is None else None,
+            tile_size=settings.OCR_TILE_SIZE,
+            tile_overlap=settings.OCR_TILE_OVERLAP,
+            engine=OcrService._engine_kwargs(),
+            drop_score=ocr_stages.DEFAULT_DROP_SCORE,
+            paddleocr=_PADDLEOCR_VERSION
+        )
+        return namespace
+
+    def _infer_cached(
+        self,
+        image: ImageSource,
+        options: OcrOptions
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """执行推理；相同图片内容和选项命中缓存时直接返回，不再调用模型"""
+        cache = self._get_result_cache()
+        if cache is None:
+            return self._infer(image, options)
+        key = make_cache_key(image, self._cache_namespace(options))
+        # 并发的相同请求只执行一次推理，其余请求等待其结果
+        return cache.get_or_compute(key, lambda: self._infer(image, options))
+
+    @staticmethod
+    def _resolution_policy(options: OcrOptions) -> Tuple[int, float]:
+        """
+        识别分辨率策略：(最长边上限, 缩放比例)，(0, 1.0) 表示按原图识别
+
+        两遍识别且请求未指定分辨率时，第一遍按 OCR_REFINE_SIDE_LEN 快速识别
+        """
+        scale = 1.0
+        if options.source_dpi and options.target_dpi:
+            scale = options.target_dpi / options.source_dpi
+        if options.max_side_len is not None:
+            max_side_len = options.max_side_len
+        elif scale == 1.0 and OcrService._refine_threshold(options) > 0:
+            max_side_len = settings.OCR_REFINE_SIDE_LEN
+        else:
+            max_side_len = settings.OCR_MAX_SIDE_LEN
+        return max(0, max_side_len), scale
+
+    @staticmethod
+    def _refine_threshold(options: OcrOptions) -> float:
+        """两遍识别的置信度阈值（未指定时使用 OCR_REFINE_THRESHOLD，0 表示关闭）"""
+        if options.refine_threshold is not None:
+            return options.refine_threshold
+        return settings.OCR_REFINE_THRESHOLD
+
+    @staticmethod
+    def _first_pass_min_score(options: OcrOptions) -> Optional[float]:
+        """
+        第一遍识别保留文字行的最低置信度（None 表示使用引擎的 drop_score）
+
+        两遍识别时第一遍不过滤：低分辨率下低于 drop_score 的文字行正是需要从原图重新识别的行，
+        重新识别后再按 drop_score 过滤
+        """
+        return 0.0 if OcrService._refine_threshold(options) > 0 else None
+
+    def _refine_lines(self, image: ImageSource, lines: OcrLines, options: OcrOptions) -> Tuple[OcrLines, int]:
+        """
+        两遍识别的第二遍：从原图重新裁剪置信度低于阈值的文字行，一次成批识别，
+        每行保留置信度较高的结果（坐标不变）
+
+        第一遍已按原图识别时不再重复识别
+
+        Returns:
+            (文字行, 重新识别的行数)
+        """
+        threshold = self._refine_threshold(options)
+        low = np.flatnonzero(lines.scores < threshold)
+        if threshold <= 0 or low.size == 0:
+            return lines, 0
+        max_side_len, scale = self._resolution_policy(options)
+        if resolve_scale(*image_size(image), max_side_len, scale) >= 1.0:
+            return lines, 0
+
+        texts, scores = self._run_backend(
+            "_recognize_regions_local", image, lines.boxes[low], options.lang, options.use_angle_cls
+        )
+        # 第一遍结果可能来自缓存，复制后再修改
+        new_texts = list(lines.texts)
+        new_scores = lines.scores.copy()
+        improved = 0
+        for index, text, score in zip(low.tolist(), texts, scores.tolist()):
+            if text and score > new_scores[index]:
+                new_texts[index] = text
+                new_scores[index] = score
+                improved += 1
+        logger.info(f"两遍识别: 重新识别 {low.size} 行（置信度低于 {threshold}），其中 {improved} 行结果更好")
+        return OcrLines(new_texts, lines.boxes, new_scores), int(low.size)
+
+    def _infer(
+        self,
+        image: ImageSource,
+        options: OcrOptions
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        执行推理；设置了分辨率策略时按缩小后的尺寸解码识别，超大图片分块识别，
+        坐标均换算回原图
+        """
+        max_side_len, scale = self._resolution_policy(options)
+        factors = (1.0, 1.0)
+        if max_side_len > 0 or scale < 1.0:
+            # JPEG 利用 DCT 缩放直接解码为小图，不生成全尺寸位图
+            with metrics.stage("decode"):
+                image, factors = load_image_scaled(image, max_side_len, scale)
+
+        # 区域/分块识别：灰度图和未压缩 TIFF 帧（内存映射）不整页转换为 BGR，只转换裁剪出的部分
+        if options.rois:
+            with metrics.stage("decode"):
+                image = load_frame(image)
+            texts, boxes, scores = self._infer_rois(image, options, factors)
+        elif self._should_tile(image, options):
+            with metrics.stage("decode"):
+                image = load_frame(image)
+            texts, boxes, scores = self._infer_tiled(image, options)
+        else:
+            texts, boxes, scores = self._infer_backend(image, options)
+        return texts, rescale_boxes(boxes, factors), scores
+
+    def _infer_rois(
+        self,
+        image: np.ndarray,
+        options: OcrOptions,
+        factors: Tuple[float, float] = (1.0, 1.0)
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        只在指定区域内检测和识别：先裁剪出各区域再检测，检测耗时随面积减少；
+        区域坐标为原图坐标（按 factors 换算到缩小后的图片），结果平移回整页坐标，
+        重叠区域中的重复文字行合并为一行
+        """
+        height, width = image.shape[:2]
+        sx, sy = factors
+        rects = []
+        for x1, y1, x2, y2 in options.rois:
+            rect = (
+                min(int(x1 / sx), width), min(int(y1 / sy), height),
+                min(int(np.ceil(x2 / sx)), width), min(int(np.ceil(y2 / sy)), height)
+            )
+            if rect[2] > rect[0] and rect[3] > rect[1]:
+                rects.append(rect)
+        if not rects:
+            logger.warning(f"识别区域均在图片（{width}x{height}）之外，跳过识别")
+            return [], ocr_stages.EMPTY_BOXES, np.zeros((0,), dtype=np.float64)
+
+        def infer_rect(rect):
+            x0, y0, x1, y1 = rect
+            crop = np.ascontiguousarray(image[y0:y1, x0:x1])
+            if self._should_tile(crop, options):
+                return rect, self._infer_tiled(crop, options)
+            return rect, self._infer_backend(crop, options)
+
+        return merge_tile_lines(self._map_concurrent(infer_rect, rects, "ocr-roi"))
+
+    def _map_concurrent(self, fn, items: List[Any], thread_name_prefix: str) -> List[Any]:
+        """有多个副本/进程时并发执行 fn，结果顺序与输入一致"""
+        workers = min(self.inference_capacity(), len(items))
+        if workers <= 1:
+            return [fn(item) for item in items]
+        # 每项复制一份当前上下文，各阶段耗时计入发起请求的 Server-Timing
+        contexts = [contextvars.copy_context() for _ in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix) as executor:
+            return list(executor.map(lambda ctx, item: ctx.run(fn, item), contexts, items))
+
+    @staticmethod
+    def _should_tile(image: ImageSource, options: OcrOptions) -> bool:
+        """是否分块识别：请求显式指定，或像素数超过 OCR_TILE_AUTO_PIXELS"""
+        if options.tiled is not None:
+            return options.tiled
+        if settings.OCR_TILE_AUTO_PIXELS <= 0:
+            return False
+        width, height = image_size(image)
+        return width * height > settings.OCR_TILE_AUTO_PIXELS
+
+    def _infer_tiled(
+        self,
+        image: np.ndarray,
+        options: OcrOptions
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        分块识别：将图片切成相互重叠的小块分别检测和识别，再合并重叠区域中的重复文字行
+
+        每块只在识别时复制为连续内存并转换为 BGR，推理的峰值内存取决于块大小而不是整页大小；
+        未压缩 TIFF 帧直接从内存映射中裁剪，JPEG/PNG 等压缩格式没有区域解码，仍需整页解码一次。
+        有多个副本/进程时各块并发识别
+        """
+        height, width = image.shape[:2]
+        tiles = plan_tiles(width, height, settings.OCR_TILE_SIZE, settings.OCR_TILE_OVERLAP)
+        logger.info(f"分块识别: {width}x{height}, {len(tiles)} 块, 块大小 {settings.OCR_TILE_SIZE}, "
+                    f"重叠 {settings.OCR_TILE_OVERLAP}")
+
+        def infer_tile(tile):
+            x0, y0, x1, y1 = tile
+            return tile, self._infer_backend(np.ascontiguousarray(image[y0:y1, x0:x1]), options)
+
+        return merge_tile_lines(self._map_concurrent(infer_tile, tiles, "ocr-tile"))
+
+    def _infer_backend(
+        self,
+        image: ImageSource,
+        options: OcrOptions
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """执行推理（按配置在进程池、微批调度器或当前线程中执行），返回紧凑数组结果"""
+        angle_mode = self._angle_mode(options)
+        min_score = self._first_pass_min_score(options)
+        if self.uses_process_backend:
+            # 各阶段在工作进程中执行，这里只记录整体推理耗时
+            with metrics.stage("inference"):
+                return self._get_process_backend().infer(
+                    image,
+                    options.lang,
+                    options.use_angle_cls,
+                    timeout=settings.OCR_PROCESS_TIMEOUT,
+                    angle_mode=angle_mode,
+                    orientation_scope=options.orientation_scope,
+                    min_score=min_score
                 )
-                load_time = time.time() - start_time
-                logger.info(f"PaddleOCR 模型加载完成，耗时：{load_time:.2f} 秒")
-            except Exception as e:
-                logger.error(f"PaddleOCR 模型加载失败: {str(e)}", exc_info=True)
-                raise
-        return self._ocr_engine
+        # 整页方向需要在检测后逐页判断，不参与微批
+        if settings.OCR_MICRO_BATCH_ENABLED and angle_mode != "page":
+            with metrics.stage("decode"):
+                image = load_image(image)
+            # 与同一时间窗口内选项相同的其他请求合并，一次性识别所有文字行
+            with metrics.stage("inference"):
+                return self._get_scheduler().submit(
+                    image,
+                    options.lang,
+                    options.use_angle_cls,
+                    min_score=min_score
+                )
+        return self._infer_local(
+            image, options.lang, options.use_angle_cls, angle_mode, options.orientation_scope, min_score
+        )
+
+    @staticmethod
+    def _angle_mode(options: OcrOptions) -> str:
+        """文字方向判断方式：line-逐行分类，page-整页判断一次（未指定时使用 OCR_ANGLE_MODE）"""
+        return options.angle_mode or settings.OCR_ANGLE_MODE
+
+    def _infer_local(
+        self,
+        image: ImageSource,
+        lang: str,
+        use_angle_cls: bool,
+        angle_mode: str = "line",
+        orientation_scope: Optional[str] = None,
+        min_score: Optional[float] = None
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        在当前进程中执行推理
+
+        引擎支持分阶段调用时依次执行检测、方向分类和识别，分别记录各阶段耗时；
+        否则整体调用 ocr()（逐行方向分类，由引擎按 drop_score 过滤），只记录整体推理耗时
+
+        Args:
+            min_score: 保留文字行的最低置信度（None 表示使用引擎的 drop_score）
+        """
+        # 路径和字节都先解码再借出引擎：路径输入同样走分阶段流程，
+        # 整页方向判断和 min_score 对批量扫描的图片文件也生效
+        with metrics.stage("decode"):
+            image = load_image(image)
+
+        # 借出 OCR 引擎副本并执行识别（同一副本不能被多个线程同时使用）
+        with self._checkout_engine(lang=lang, use_angle_cls=use_angle_cls) as ocr:
+            if ocr_stages.supports_stages(ocr):
+                return self._run_stages(ocr, image, use_angle_cls, angle_mode, orientation_scope, min_score)
+            with metrics.stage("inference"):
+                result = ocr.ocr(image)
+
+        return _parse_ocr_result(result)
+
+    def _run_stages(
+        self,
+        ocr,
+        image: np.ndarray,
+        use_angle_cls: bool,
+        angle_mode: str = "line",
+        orientation_scope: Optional[str] = None,
+        min_score: Optional[float] = None
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        分阶段执行检测、方向分类和识别（与 ocr() 的处理流程一致）
+
+        angle_mode 为 page 时不再逐行分类：抽样几行判断整页是否倒置，倒置时旋转所有文字行，
+        并按旋转后的阅读顺序（即原顺序的逆序）返回；坐标仍对应原图
+        """
+        with metrics.stage("detection"):
+            boxes = ocr_stages.detect(ocr, image)
+            crops = ocr_stages.crop_lines(image, boxes)
+
+        flipped = False
+        if use_angle_cls and ocr_stages.supports_classifier(ocr):
+            with metrics.stage("classification"):
+                if angle_mode == "page":
+                    flipped = self._page_rotation(ocr, crops, orientation_scope) == 180
+                    if flipped:
+                        crops = ocr_stages.rotate_crops_180(crops)
+                else:
+                    crops, _angles = ocr_stages.classify(ocr, crops)
+
+        with metrics.stage("recognition"):
+            texts, scores = ocr_stages.recognize_crops(ocr, crops)
+        if min_score is None:
+            min_score = ocr_stages.drop_score(ocr)
+        texts, boxes, scores = ocr_stages.filter_lines(texts, boxes, scores, min_score)
+        if flipped:
+            return texts[::-1], boxes[::-1], scores[::-1]
+        return texts, boxes, scores
+
+    def _page_rotation(self, ocr, crops: List[np.ndarray], orientation_scope: Optional[str]) -> int:
+        """整页旋转角度（0 或 180）；同一任务/书籍的方向确认后直接使用记住的结果"""
+        rotation = self._orientation.get(orientation_scope)
+        if rotation is not None:
+            return rotation
+        rotation, agreement = ocr_stages.page_orientation(
+            ocr, crops, sample_lines=settings.OCR_PAGE_ORIENTATION_SAMPLES
+        )
+        self._orientation.record(orientation_scope, rotation)
+        if rotation:
+            logger.info(f"检测到页面倒置（{agreement:.0%} 的抽样文字行一致），整页旋转 180 度识别")
+        return rotation
 
     def recognize(
         self,
-        image_path: str,
+        image: ImageSource,
         options: OcrOptions = None
     ) -> Dict[str, Any]:
         """
         识别图片文字
 
         Args:
-            image_path: 图片路径
+            image: 图片路径、图片文件字节（直接在内存中解码，不落盘）或已解码的 BGR ndarray
             options: OCR 选项
 
         Returns:
-            识别结果字典
+            识别结果字典；details 为 OcrLines（紧凑数组），在接口/存储边界处调用
+            to_dicts() 或 to_text_boxes() 转换
         """
         if options is None:
             options = OcrOptions()
 
         start_time = time.time()
 
-        logger.info(f"开始识别图片: {image_path}, 语言: {options.lang}, 使用角度分类: {options.use_angle_cls}")
+        image_desc = _describe_image(image)
+        logger.info(f"开始识别图片: {image_desc}, 语言: {options.lang}, 使用角度分类: {options.use_angle_cls}")
 
-        try:
-            # 获取 OCR 引擎
-            ocr = self._get_ocr_engine(
-                lang=options.lang,
-                use_angle_cls=options.use_angle_cls
-            )
+        with self.profile("recognize") as profile:
+            if profile is not None:
+                profile.annotate(
+                    {"image": image_desc, "options": options.model_dump()},
+                    lambda: dict(zip(("width", "height"), image_size(image)))
+                )
+            try:
+                # 执行识别，得到紧凑的数组结果（文字列表、(N,4,2) 坐标数组、置信度数组）
+                lines = OcrLines.from_tuple(self._infer_cached(image, options))
+                # 两遍识别：低置信度的文字行从原图重新识别（第一遍结果可以命中缓存，第二遍不缓存）
+                lines, refined_lines = self._refine_lines(image, lines, options)
+                if self._first_pass_min_score(options) is not None:
+                    # 第一遍未按 drop_score 过滤，重新识别后再过滤
+                    lines = OcrLines.from_tuple(ocr_stages.filter_lines(
+                        *lines.as_tuple(), ocr_stages.DEFAULT_DROP_SCORE
+                    ))
+                texts = lines.texts
 
-            # 执行识别（PaddleOCR 2.7.0 需要 cls 参数）
-            result = ocr.ocr(image_path)
-
-            # 提取文本和详细信息
-            texts = []
-            details = []
-
-            if result and result[0]:
-                # 兼容新版 PaddleOCR 返回格式（字典）
-                if isinstance(result[0], dict):
-                    logger.info("检测到新版 PaddleOCR 格式（字典）")
-                    rec_texts = result[0].get('rec_texts', [])
-                    rec_scores = result[0].get('rec_scores', [])
-                    rec_polys = result[0].get('rec_polys', [])
-
-                    for i, text in enumerate(rec_texts):
-                        if not text:
-                            continue
-
-                        texts.append(text)
-
-                        if options.return_details:
-                            confidence = float(rec_scores[i]) if i < len(rec_scores) else 1.0
-
-                            if i < len(rec_polys):
-                                poly = rec_polys[i]
-                                if isinstance(poly, np.ndarray):
-                                    box = [[float(x), float(y)] for x, y in poly.tolist()]
-                                else:
-                                    box = [[float(x), float(y)] for x, y in poly]
-                            else:
-                                box = [[0, 0], [0, 0], [0, 0], [0, 0]]
-
-                            details.append(TextBox(
-                                text=text,
-                                confidence=confidence,
-                                box=box
-                            ))
-
-                # 兼容旧版 PaddleOCR 返回格式（列表）
-                elif isinstance(result[0], list):
-                    logger.info("检测到旧版 PaddleOCR 格式（列表）")
-                    for line in result[0]:
-                        if line:
-                            try:
-                                box_coords = line[0]
-                                text_info = line[1]
-
-                                # 兼容不同版本的 PaddleOCR 返回格式
-                                if isinstance(text_info, list) and len(text_info) >= 2:
-                                    text = text_info[0]
-                                    confidence = float(text_info[1])
-                                elif isinstance(text_info, str):
-                                    text = text_info
-                                    confidence = 1.0
-                                else:
-                                    continue
-
-                                if not text:
-                                    continue
-
-                                texts.append(text)
-
-                                if options.return_details:
-                                    try:
-                                        box = [[float(x), float(y)] for x, y in box_coords]
-                                    except (ValueError, TypeError):
-                                        box = [[0, 0], [0, 0], [0, 0], [0, 0]]
-
-                                    details.append(TextBox(
-                                        text=text,
-                                        confidence=confidence,
-                                        box=box
-                                    ))
-                            except Exception as e:
-                                logger.warning(f"跳过无法解析的识别结果: {e}")
-                                continue
-
-            # 根据排版方向和输出格式生成文本
-            if details and (options.text_layout != "horizontal" or options.output_format != "line_by_line"):
-                full_text = _format_text_by_layout(details, options.text_layout, options.output_format)
-                logger.info(f"使用自定义排版: layout={options.text_layout}, format={options.output_format}")
-            else:
-                # 默认拼接方式
-                full_text = "\n".join(texts)
-
-            # 更新统计
-            self.total_requests += 1
-            self.total_images += 1
-
-            processing_time = time.time() - start_time
-
-            logger.info(f"识别成功: {image_path}, 识别到 {len(texts)} 行文字, 耗时: {processing_time:.2f}秒")
-            logger.debug(f"识别文本: {full_text[:100]}...")  # 只记录前100个字符
-
-            return {
-                "success": True,
-                "text": full_text,
-                "details": details if options.return_details else None,
-                "processing_time": processing_time,
-                "error": None
-            }
+                # 根据排版方向和输出格式生成文本（按行/列聚类排序，与 return_details 无关）
+                if lines and (options.text_layout != "horizontal" or options.output_format != "line_by_line"):
+                    with metrics.stage("layout"):
+                        full_text = format_text(texts, lines.boxes, options.text_layout, options.output_format)
+                    logger.info(f"使用自定义排版: layout={options.text_layout}, format={options.output_format}")
+                else:
+                    # 默认拼接方式
+                    full_text = "\n".join(texts)
 
-        except Exception as e:
-            processing_time = time.time() - start_time
-            logger.error(f"识别失败: {image_path}, 错误: {str(e)}", exc_info=True)
-            return {
-                "success": False,
-                "text": "",
-                "details": None,
-                "processing_time": processing_time,
-                "error": str(e)
-            }
+                # 更新统计（多个线程同时识别，计数需加锁）
+                with self._stats_lock:
+                    OcrService.total_requests += 1
+                    OcrService.total_images += 1
+                metrics.RECOGNITIONS.labels(options.lang, options.text_layout, "success").inc()
+
+                processing_time = time.time() - start_time
+
+                logger.info(f"识别成功: {image_desc}, 识别到 {len(texts)} 行文字, 耗时: {processing_time:.2f}秒")
+                logger.debug(f"识别文本: {full_text[:100]}...")  # 只记录前100个字符
+
+                return {
+                    "success": True,
+                    "text": full_text,
+                    "details": lines if options.return_details else None,
+                    "refined_lines": refined_lines,
+                    "processing_time": processing_time,
+                    "error": None
+                }
+
+            except Exception as e:
+                processing_time = time.time() - start_time
+                logger.error(f"识别失败: {image_desc}, 错误: {str(e)}", exc_info=True)
+                metrics.RECOGNITIONS.labels(options.lang, options.text_layout, "error").inc()
+                return {
+                    "success": False,
+                    "text": "",
+                    "details": None,
+                    "refined_lines": 0,
+                    "processing_time": processing_time,
+                    "error": str(e)
+                }
 
     def recognize_batch(
         self,
-        image_paths: List[str],
+        images: List[ImageSource],
         options: OcrOptions = None
     ) -> List[Dict[str, Any]]:
         """
         批量识别图片
 
         Args:
-            image_paths: 图片路径列表
+            images: 图片路径、图片字节或 ndarray 列表
             options: OCR 选项
 
         Returns:
             识别结果列表
         """
-        results = []
-        for image_path in image_paths:
-            result = self.recognize(image_path, options)
-            results.append(result)
-        return results
+        workers = min(self.inference_capacity(), len(images))
+        if workers <= 1:
+            return [self.recognize(image, options) for image in images]
+
+        # 多个副本/进程时并发识别，结果顺序与输入一致；每张图片复制一份当前上下文（阶段耗时统计）
+        contexts = [contextvars.copy_context() for _ in images]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-batch") as executor:
+            return list(executor.map(
+                lambda ctx, image: ctx.run(self.recognize, image, options), contexts, images
+            ))
+
+    async def recognize_async(
+        self,
+        image: ImageSource,
+        options: OcrOptions = None
+    ) -> Dict[str, Any]:
+        """
+        异步识别图片文字（在有界线程池中执行，不阻塞事件循环）
+
+        Raises:
+            QueueFullError: 排队请求数超过 OCR_MAX_QUEUE_DEPTH 时立即拒绝
+        """
+        return await self._get_inference_queue().submit(self.recognize, image, options)
+
+    async def recognize_batch_async(
+        self,
+        images: List[ImageSource],
+        options: OcrOptions = None
+    ) -> List[Dict[str, Any]]:
+        """
+        异步批量识别图片（整批一起入队，要么全部接受要么全部拒绝）
+
+        Raises:
+            QueueFullError: 队列剩余容量不足以容纳整批图片时立即拒绝
+        """
+        return list(await asyncio.gather(*self.submit_batch(images, options)))
+
+    def submit_batch(
+        self,
+        images: List[ImageSource],
+        options: OcrOptions = None
+    ) -> List["asyncio.Future[Dict[str, Any]]"]:
+        """
+        整批图片入队并立即返回每张图片的 Future（与输入顺序一致），
+        调用方可按完成顺序逐个处理结果；需在事件循环中调用
+
+        Raises:
+            QueueFullError: 队列剩余容量不足以容纳整批图片时立即拒绝
+        """
+        return self._get_inference_queue().submit_many(
+            [(self.recognize, (image, options)) for image in images]
+        )
+
+    def _run_backend(self, method: str, *args):
+        """在进程池（启用时）或当前线程中执行 _*_local 方法"""
+        if self.uses_process_backend:
+            with metrics.stage("inference"):
+                return self._get_process_backend().call(method, *args, timeout=settings.OCR_PROCESS_TIMEOUT)
+        return getattr(self, method)(*args)
+
+    def _require_stages(self, ocr) -> None:
+        if not ocr_stages.supports_stages(ocr):
+            raise RuntimeError(f"当前 PaddleOCR 版本（{_PADDLEOCR_VERSION}）不支持单独执行检测或识别")
+
+    def _detect_local(self, image: ImageSource, lang: str, use_angle_cls: bool) -> np.ndarray:
+        """在当前进程中只执行文字检测，返回 (N, 4, 2) 坐标数组（阅读顺序）"""
+        with metrics.stage("decode"):
+            image = load_image(image)
+        with self._checkout_engine(lang=lang, use_angle_cls=use_angle_cls) as ocr:
+            self._require_stages(ocr)
+            with metrics.stage("detection"):
+                return ocr_stages.detect(ocr, image)
+
+    def _recognize_regions_local(
+        self,
+        image: ImageSource,
+        regions: np.ndarray,
+        lang: str,
+        use_angle_cls: bool
+    ) -> Tuple[List[str], np.ndarray]:
+        """在当前进程中对指定文字框执行（方向分类和）识别，返回每个框的文字和置信度"""
+        with metrics.stage("decode"):
+            image = load_image(image)
+        with self._checkout_engine(lang=lang, use_angle_cls=use_angle_cls) as ocr:
+            self._require_stages(ocr)
+            with metrics.stage("recognition"):
+                crops = ocr_stages.crop_lines(image, regions)
+            if use_angle_cls and ocr_stages.supports_classifier(ocr):
+                with metrics.stage("classification"):
+                    crops, _angles = ocr_stages.classify(ocr, crops)
+            # 所有文字框一次交给识别器，由其按 rec_batch_num 成批识别
+            with metrics.stage("recognition"):
+                return ocr_stages.recognize_crops(ocr, crops)
+
+    def detect(
+        self,
+        image: ImageSource,
+        options: OcrOptions = None
+    ) -> Dict[str, Any]:
+        """
+        只检测文字框，不识别文字（校对界面排版使用）
+
+        遵循 max_side_len / source_dpi / target_dpi 分辨率策略，坐标对应原图
+
+        Returns:
+            结果字典；boxes 为 (N, 4, 2) float32 坐标数组（阅读顺序）
+        """
+        if options is None:
+            options = OcrOptions()
+
+        start_time = time.time()
+        image_desc = _describe_image(image)
+        logger.info(f"开始检测文字框: {image_desc}, 语言: {options.lang}")
+
+        with self.profile("detect") as profile:
+            if profile is not None:
+                profile.annotate({"image": image_desc, "options": options.model_dump()})
+            try:
+                max_side_len, scale = self._resolution_policy(options)
+                factors = (1.0, 1.0)
+                if max_side_len > 0 or scale < 1.0:
+                    with metrics.stage("decode"):
+                        image, factors = load_image_scaled(image, max_side_len, scale)
+                boxes = self._run_backend("_detect_local", image, options.lang, options.use_angle_cls)
+                boxes = rescale_boxes(boxes, factors)
+
+                with self._stats_lock:
+                    OcrService.total_requests += 1
+                    OcrService.total_images += 1
+
+                processing_time = time.time() - start_time
+                logger.info(f"检测成功: {image_desc}, 检测到 {len(boxes)} 个文字框, 耗时: {processing_time:.2f}秒")
+                return {"success": True, "boxes": boxes, "processing_time": processing_time, "error": None}
+
+            except Exception as e:
+                processing_time = time.time() - start_time
+                logger.error(f"检测失败: {image_desc}, 错误: {str(e)}", exc_info=True)
+                return {"success": False, "boxes": None, "processing_time": processing_time, "error": str(e)}
+
+    def recognize_regions(
+        self,
+        image: ImageSource,
+        regions: List[List[List[float]]],
+        options: OcrOptions = None
+    ) -> Dict[str, Any]:
+        """
+        识别指定文字框中的文字（跳过检测，校对界面重新识别人工调整过的文字框使用）
+
+        Args:
+            image: 图片路径、图片字节或 ndarray（按原图分辨率裁剪识别）
+            regions: 原图坐标下的多边形列表；不是四个点时取其外接矩形
+            options: OCR 选项（使用 lang、use_angle_cls 和 return_details）
+
+        Returns:
+            与 recognize() 相同结构的结果字典；details 与 regions 一一对应、顺序一致，
+            不按置信度过滤
+        """
+        if options is None:
+            options = OcrOptions()
+
+        start_time = time.time()
+        image_desc = _describe_image(image)
+        logger.info(f"开始识别指定区域: {image_desc}, 文字框: {len(regions)}, 语言: {options.lang}")
+
+        with self.profile("recognize_regions") as profile:
+            if profile is not None:
+                profile.annotate({"image": image_desc, "regions": len(regions), "options": options.model_dump()})
+            try:
+                boxes = np.asarray([_to_quad(region) for region in regions], dtype=np.float32).reshape(-1, 4, 2)
+                texts, scores = self._run_backend(
+                    "_recognize_regions_local", image, boxes, options.lang, options.use_angle_cls
+                )
+                lines = OcrLines(texts, boxes, scores)
+
+                with self._stats_lock:
+                    OcrService.total_requests += 1
+                    OcrService.total_images += 1
+
+                processing_time = time.time() - start_time
+                logger.info(f"区域识别成功: {image_desc}, {len(texts)} 个文字框, 耗时: {processing_time:.2f}秒")
+                return {
+                    "success": True,
+                    "text": "\n".join(texts),
+                    "details": lines if options.return_details else None,
+                    "processing_time": processing_time,
+                    "error": None
+                }
+
+            except Exception as e:
+                processing_time = time.time() - start_time
+                logger.error(f"区域识别失败: {image_desc}, 错误: {str(e)}", exc_info=True)
+                return {
+                    "success": False,
+                    "text": "",
+                    "details": None,
+                    "processing_time": processing_time,
+                    "error": str(e)
+                }
+
+    async def detect_async(self, image: ImageSource, options: OcrOptions = None) -> Dict[str, Any]:
+        """
+        异步检测文字框（与识别共用有界线程池和排队上限）
+
+        Raises:
+            QueueFullError: 排队请求数超过 OCR_MAX_QUEUE_DEPTH 时立即拒绝
+        """
+        return await self._get_inference_queue().submit(self.detect, image, options)
+
+    async def recognize_regions_async(
+        self,
+        image: ImageSource,
+        regions: List[List[List[float]]],
+        options: OcrOptions = None
+    ) -> Dict[str, Any]:
+        """
+        异步识别指定文字框（与识别共用有界线程池和排队上限）
+
+        Raises:
+            QueueFullError: 排队请求数超过 OCR_MAX_QUEUE_DEPTH 时立即拒绝
+        """
+        return await self._get_inference_queue().submit(self.recognize_regions, image, regions, options)
 
     def get_status(self) -> Dict[str, Any]:
         """获取服务状态"""
+        registry_status = self._registry.get_status()
+        if self.uses_process_backend:
+            backend_status = self._get_process_backend().get_status()
+        else:
+            backend_status = {"backend": "thread", "workers": self.inference_capacity()}
         return {
-            "ocr_loaded": self._ocr_engine is not None,
+            "ocr_loaded": len(registry_status["engines"]) > 0,
             "total_requests": self.total_requests,
             "total_images": self.total_images,
+            "loaded_engines": registry_status["engines"],
+            "engine_registry": {
+                k: v for k, v in registry_status.items() if k != "engines"
+            },
+            "inference_backend": backend_status,
+            "inference_queue": self._get_inference_queue().get_status(),
+            "micro_batch": self._get_scheduler().get_status()
+            if settings.OCR_MICRO_BATCH_ENABLED and not self.uses_process_backend else None,
+            "result_cache": self._result_cache.get_status() if self._get_result_cache() else None,
+            "warmup": self.get_warmup_status(),
+            "profiler": self.get_profiler_status(),
+            "orientation": self._orientation.get_status(),
         }
 
+    def update_metrics(self) -> None:
+        """刷新 Prometheus 占用率指标（引擎副本、推理队列）"""
+        engines_in_use, engines_loaded = self._registry.occupancy()
+        queue_running, queue_waiting = (
+            self._inference_queue.occupancy() if self._inference_queue is not None else (0, 0)
+        )
+        metrics.update_occupancy(engines_loaded, engines_in_use, queue_running, queue_waiting)
+
+    def start_backend(self) -> None:
+        """
+        启动推理后端并预热模型（进程启动时即加载模型，而不是等到第一个请求）
+
+        进程池模式下由各工作进程自行预热，这里等待所有工作进程就绪；
+        预热完成前 is_ready 为 False
+        """
+        if not self.uses_process_backend:
+            self.warmup()
+            return
+
+        if not settings.OCR_WARMUP_ENABLED:
+            self._warmup.disable()
+            self._get_process_backend().start(timeout=settings.OCR_PROCESS_TIMEOUT)
+            return
+
+        self._warmup.begin()
+        try:
+            backend = self._get_process_backend()
+            workers = backend.start(timeout=settings.OCR_PROCESS_TIMEOUT)
+        except Exception as e:
+            logger.error(f"进程池启动失败: {str(e)}", exc_info=True)
+            self._warmup.finish(error=str(e))
+            return
+
+        errors = [f"pid {w['pid']}: {w['error']}" for w in workers if w.get("error")]
+        if len(workers) < backend.workers:
+            errors.append(f"only {len(workers)} of {backend.workers} workers started")
+        self._warmup.finish(error="; ".join(errors) or None, workers=workers)
+
+    def shutdown(self) -> None:
+        """释放推理资源（停止进程池）"""
+        if self._scheduler is not None:
+            self._scheduler.shutdown()
+        if self._inference_queue is not None:
+            self._inference_queue.shutdown()
+        if self._process_backend is not None:
+            self._process_backend.shutdown()
+
 
 # 全局 OCR 服务实例
 ocr_service = OcrService()
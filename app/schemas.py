@@ -1,6 +1,19 @@
 """Pydantic 数据模型定义"""
-from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Literal, Tuple
+from pydantic import BaseModel, Field, field_validator
+
+# 矩形区域 (x1, y1, x2, y2)，原图像素坐标
+Rect = Tuple[int, int, int, int]
+
+
+def _check_rois(rois: Optional[List[Rect]]) -> Optional[List[Rect]]:
+    """检查识别区域：坐标非负且右下角在左上角右下方；空列表视为未设置"""
+    if not rois:
+        return None
+    for x1, y1, x2, y2 in rois:
+        if min(x1, y1) < 0 or x2 <= x1 or y2 <= y1:
+            raise ValueError(f"识别区域 {[x1, y1, x2, y2]} 无效，应为 [x1, y1, x2, y2] 且 x2 > x1 >= 0、y2 > y1 >= 0")
+    return rois
 
 
 class TextLayout(str):
@@ -63,6 +76,60 @@ class OcrOptions(BaseModel):
             }
         }
     )
+    max_side_len: Optional[int] = Field(
+        default=None,
+        description="识别前将图片最长边缩小到该像素数（JPEG 直接按缩小尺寸解码）；为空时使用 OCR_MAX_SIDE_LEN，0 表示不缩小",
+        ge=0,
+        json_schema_extra={"example": 3000}
+    )
+    source_dpi: Optional[int] = Field(
+        default=None,
+        description="原图扫描分辨率（DPI），与 target_dpi 一起使用",
+        gt=0,
+        json_schema_extra={"example": 600}
+    )
+    target_dpi: Optional[int] = Field(
+        default=None,
+        description="识别使用的分辨率（DPI），图片按 target_dpi / source_dpi 缩小（不放大）；字号较大的族谱 200 左右即可",
+        gt=0,
+        json_schema_extra={"example": 200}
+    )
+    tiled: Optional[bool] = Field(
+        default=None,
+        description="分块识别（超大跨页扫描件切成重叠小块分别识别后合并）；为空时像素数超过 OCR_TILE_AUTO_PIXELS 自动启用"
+    )
+    angle_mode: Optional[Literal["line", "page"]] = Field(
+        default=None,
+        description="文字方向判断方式（仅 use_angle_cls=true 时生效）：line-逐行分类，page-每页抽样几行判断整页是否倒置；为空时使用 OCR_ANGLE_MODE",
+        json_schema_extra={
+            "x-enumDescriptions": {
+                "line": "逐行方向分类（每个文字行都要分类一次）",
+                "page": "整页方向判断（抽样几行，倒置时整页旋转），适合方向一致的扫描件"
+            }
+        }
+    )
+    orientation_scope: Optional[str] = Field(
+        default=None,
+        description="整页方向的记忆范围（如批量任务 ID 或书籍 ID）：同一范围内连续几页方向一致后，后续页面不再判断"
+    )
+    rois: Optional[List[Rect]] = Field(
+        default=None,
+        description="只在这些矩形区域内检测和识别（原图坐标 [[x1, y1, x2, y2], ...]），用于跳过固定的页眉、边注；坐标仍对应整页；为空时识别整页",
+        json_schema_extra={"example": [[200, 300, 2400, 3400]]}
+    )
+    refine_threshold: Optional[float] = Field(
+        default=None,
+        description="两遍识别：先按较低分辨率快速识别，再从原图重新识别置信度低于该值的文字行，保留置信度较高的结果；为空时使用 OCR_REFINE_THRESHOLD，0 表示关闭",
+        ge=0,
+        le=1,
+        json_schema_extra={"example": 0.8}
+    )
+    round_boxes: Optional[bool] = Field(
+        default=None,
+        description="响应中的文字框坐标四舍五入为整数；为空时使用 OCR_ROUND_BOXES"
+    )
+
+    _check_rois = field_validator("rois")(_check_rois)
 
 
 class TextBox(BaseModel):
@@ -102,6 +169,11 @@ class OcrResponse(BaseModel):
         default=None,
         description="详细的识别结果列表（每个文字框的信息，仅在 return_details=true 时返回）"
     )
+    refined_lines: int = Field(
+        default=0,
+        description="两遍识别时从原图重新识别的文字行数",
+        ge=0
+    )
     processing_time: float = Field(
         ...,
         description="处理耗时（单位：秒）",
@@ -114,6 +186,31 @@ class OcrResponse(BaseModel):
     )
 
 
+class DetectResponse(BaseModel):
+    """文字检测结果响应（只检测文字框，不识别文字）"""
+    success: bool = Field(
+        ...,
+        description="检测是否成功（true=成功，false=失败）"
+    )
+    boxes: Optional[List[List[List[float]]]] = Field(
+        default=None,
+        description="文字框列表（阅读顺序），每个文字框为四个角的坐标 [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]，对应原图",
+        json_schema_extra={
+            "example": [[[100, 50], [200, 50], [200, 80], [100, 80]]]
+        }
+    )
+    processing_time: float = Field(
+        ...,
+        description="处理耗时（单位：秒）",
+        ge=0,
+        json_schema_extra={"example": 0.35}
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="错误信息（仅在 success=false 时有值）"
+    )
+
+
 class HealthResponse(BaseModel):
     """健康检查响应"""
     status: str = Field(
@@ -128,6 +225,35 @@ class HealthResponse(BaseModel):
     )
 
 
+class ReadinessResponse(BaseModel):
+    """就绪探针响应"""
+    ready: bool = Field(..., description="模型是否已加载并预热完成（未就绪时 HTTP 状态码为 503）")
+    state: str = Field(
+        ...,
+        description="预热状态：pending-未开始, warming-预热中, ready-已就绪, failed-预热失败, disabled-未启用预热",
+        json_schema_extra={"example": "ready"}
+    )
+    warmup: Dict[str, Any] = Field(..., description="预热详情（每个模型的加载与预热耗时、错误信息）")
+
+
+class EngineInfo(BaseModel):
+    """已加载的 OCR 引擎信息"""
+    lang: str = Field(..., description="引擎语言类型")
+    use_angle_cls: bool = Field(..., description="是否启用文字方向分类")
+    load_time: float = Field(..., description="模型加载耗时（单位：秒）", ge=0)
+    loaded_at: float = Field(..., description="加载时间（Unix 时间戳）")
+    last_used: float = Field(..., description="最近一次使用时间（Unix 时间戳）")
+    use_count: int = Field(..., description="累计使用次数", ge=0)
+    pool_size: int = Field(default=1, description="副本池大小", ge=1)
+    replicas: int = Field(default=1, description="已创建的副本数", ge=0)
+    in_use: int = Field(default=0, description="当前借出的副本数", ge=0)
+    waits: int = Field(default=0, description="需要等待空闲副本的请求数", ge=0)
+    timeouts: int = Field(default=0, description="等待空闲副本超时的请求数", ge=0)
+    avg_wait_time: float = Field(default=0.0, description="平均等待时间（单位：秒）", ge=0)
+    max_wait_time: float = Field(default=0.0, description="最长等待时间（单位：秒）", ge=0)
+    utilization: float = Field(default=0.0, description="副本利用率（借出时间 / 总副本时间）", ge=0)
+
+
 class StatusResponse(BaseModel):
     """服务统计状态响应"""
     ocr_loaded: bool = Field(
@@ -144,6 +270,42 @@ class StatusResponse(BaseModel):
         description="累计处理的图片总数",
         ge=0
     )
+    loaded_engines: List[EngineInfo] = Field(
+        default_factory=list,
+        description="当前驻留内存的 OCR 引擎（按最近使用时间升序）"
+    )
+    engine_registry: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="引擎注册表状态（数量上限、内存上限、副本数、借出数、当前 RSS、加载/淘汰次数）"
+    )
+    inference_backend: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="推理后端状态（thread=请求线程内推理，process=进程池推理）"
+    )
+    inference_queue: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="接口识别队列状态（工作线程数、执行中、排队中、累计拒绝数）"
+    )
+    micro_batch: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="微批调度状态（窗口、批大小上限、批大小与排队等待时间直方图），未启用时为 null"
+    )
+    result_cache: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="识别结果缓存状态（条目数、命中/未命中/合并请求数、淘汰数），未启用时为 null"
+    )
+    warmup: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="启动预热状态（状态、每个模型的加载与预热耗时）"
+    )
+    profiler: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="采样分析器状态（抽样比例、慢请求阈值、已保存的分析结果数）"
+    )
+    orientation: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="整页方向记忆状态（已记住方向的任务/书籍数、判断次数、跳过次数）"
+    )
 
 
 # ============ 批量扫描相关模型 ============
@@ -230,7 +392,7 @@ class BatchScanRequest(BaseModel):
         description="是否递归扫描子目录（true=扫描所有子文件夹）"
     )
     file_patterns: List[str] = Field(
-        default=["*.jpg", "*.jpeg", "*.png", "*.bmp", "*.pdf"],
+        default=["*.jpg", "*.jpeg", "*.png", "*.bmp", "*.pdf", "*.tif", "*.tiff"],
         description="文件匹配模式（glob模式，只处理匹配的文件）"
     )
     priority: int = Field(
@@ -239,6 +401,52 @@ class BatchScanRequest(BaseModel):
         ge=1,
         le=10
     )
+    max_side_len: Optional[int] = Field(
+        default=None,
+        description="识别前将图片最长边缩小到该像素数（为空使用 OCR_MAX_SIDE_LEN，0 表示不缩小）",
+        ge=0
+    )
+    source_dpi: Optional[int] = Field(
+        default=None,
+        description="扫描分辨率（DPI），与 target_dpi 一起使用",
+        gt=0
+    )
+    target_dpi: Optional[int] = Field(
+        default=None,
+        description="识别使用的分辨率（DPI），图片按 target_dpi / source_dpi 缩小",
+        gt=0
+    )
+    tiled: Optional[bool] = Field(
+        default=None,
+        description="分块识别（为空时按 OCR_TILE_AUTO_PIXELS 自动启用）"
+    )
+    angle_mode: Optional[Literal["line", "page"]] = Field(
+        default=None,
+        description="文字方向判断方式：line-逐行分类，page-整页判断（同一任务方向确认后后续页面不再判断）；为空时使用 OCR_ANGLE_MODE"
+    )
+    rois: Optional[List[Rect]] = Field(
+        default=None,
+        description="只在这些矩形区域内检测和识别（原图坐标 [[x1, y1, x2, y2], ...]，所有页面共用），用于跳过固定的页眉、边注",
+        json_schema_extra={"example": [[200, 300, 2400, 3400]]}
+    )
+    refine_threshold: Optional[float] = Field(
+        default=None,
+        description="两遍识别：低分辨率识别后从原图重新识别置信度低于该值的文字行；为空时使用 OCR_REFINE_THRESHOLD，0 表示关闭",
+        ge=0,
+        le=1
+    )
+
+    _check_rois = field_validator("rois")(_check_rois)
+
+    def ocr_options(self) -> Dict[str, Any]:
+        """任务级识别选项（保存到任务并传给 Celery 任务，未设置的不保存）"""
+        return {
+            name: getattr(self, name)
+            for name in (
+                "max_side_len", "source_dpi", "target_dpi", "tiled", "angle_mode", "rois", "refine_threshold"
+            )
+            if getattr(self, name) is not None
+        }
 
 
 class BatchScanTask(BaseModel):
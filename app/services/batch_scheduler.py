@@ -0,0 +1,250 @@
+"""Micro-Batching Scheduler - Groups concurrent single-image requests into one recognition pass"""
+import bisect
+import time
+import threading
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services import metrics, ocr_stages
+from app.services.engine_registry import EngineKey, EngineRegistry
+
+logger = logging.getLogger(__name__)
+
+CompactLines = Tuple[List[str], np.ndarray, np.ndarray]
+
+
+class Histogram:
+    """Cumulative bucket histogram (thread-safe)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative counts per upper bound, plus count and sum"""
+        with self._lock:
+            counts = list(self._counts)
+            total, value_sum = self._count, self._sum
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + [float("inf")], counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {
+            "buckets": cumulative,
+            "count": total,
+            "sum": round(value_sum, 4),
+            "avg": round(value_sum / total, 4) if total else 0.0,
+        }
+
+
+class _Request:
+    __slots__ = ("image", "min_score", "future", "enqueued_at")
+
+    def __init__(self, image: np.ndarray, min_score: Optional[float] = None):
+        self.image = image
+        self.min_score = min_score
+        self.future: "Future[CompactLines]" = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class MicroBatchScheduler:
+    """
+    Collects requests that share OCR options and runs them as one batch
+
+    A dispatcher thread waits for a free engine replica, then keeps
+    collecting requests for the same (lang, use_angle_cls) key for up to
+    `window_ms` after the oldest one arrived, or until `max_batch_size` are
+    waiting. The batch runs detection per image, then angle classification
+    and recognition once over the text-line crops of all images, and the
+    lines are split back to each caller.
+
+    While all replicas are busy requests keep queueing, so batches grow with
+    load and stay at one request when the service is idle.
+    """
+
+    def __init__(self, registry: EngineRegistry, window_ms: float = 5.0, max_batch_size: int = 8):
+        """
+        Args:
+            registry: Engine registry to check replicas out of
+            window_ms: How long to hold the oldest request while collecting a batch
+            max_batch_size: Maximum images per batch
+        """
+        self.registry = registry
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.workers = registry.replicas
+
+        self._queues: "OrderedDict[EngineKey, Deque[_Request]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._slots = threading.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr-microbatch")
+        self._closed = False
+
+        self.batch_size_hist = Histogram([1, 2, 4, 8, 16, 32, 64])
+        self.queue_wait_hist = Histogram([0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0])
+        self.total_requests = 0
+        self.total_batches = 0
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="ocr-microbatch-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, image: np.ndarray, lang: str, use_angle_cls: bool,
+               timeout: Optional[float] = None, min_score: Optional[float] = None) -> CompactLines:
+        """
+        Queue a decoded BGR image and wait for its lines
+
+        Args:
+            min_score: Drop lines scoring below this (None = the engine's drop_score)
+        """
+        request = _Request(image, min_score)
+        key = (lang, bool(use_angle_cls))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Micro-batch scheduler is shut down")
+            self._queues.setdefault(key, deque()).append(request)
+            self.total_requests += 1
+            self._cond.notify()
+        return request.future.result(timeout=timeout)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            # Batches only start when a replica is free; meanwhile requests accumulate
+            self._slots.acquire()
+            batch = self._collect_batch()
+            if batch is None:
+                self._slots.release()
+                return
+            key, requests = batch
+            self._executor.submit(self._run_batch, key, requests)
+
+    def _collect_batch(self) -> Optional[Tuple[EngineKey, List[_Request]]]:
+        with self._cond:
+            while not self._closed and not any(self._queues.values()):
+                self._cond.wait()
+            if self._closed:
+                return None
+
+            # Serve the key whose oldest request has waited longest
+            key = min(
+                (k for k, q in self._queues.items() if q),
+                key=lambda k: self._queues[k][0].enqueued_at
+            )
+            queue = self._queues[key]
+            deadline = queue[0].enqueued_at + self.window
+            while len(queue) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            requests = [queue.popleft() for _ in range(min(len(queue), self.max_batch_size))]
+            if not queue:
+                del self._queues[key]
+            return key, requests
+
+    def _run_batch(self, key: EngineKey, requests: List[_Request]) -> None:
+        try:
+            now = time.monotonic()
+            for request in requests:
+                self.queue_wait_hist.observe(now - request.enqueued_at)
+            self.batch_size_hist.observe(len(requests))
+            with self._cond:
+                self.total_batches += 1
+
+            with self.registry.checkout(*key) as engine:
+                if ocr_stages.supports_stages(engine):
+                    self._run_staged(engine, key[1], requests)
+                else:
+                    self._run_sequential(engine, requests)
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _run_sequential(engine: Any, requests: List[_Request]) -> None:
+        """Fallback for engines without separate stages: one full pass per image"""
+        from app.ocr_service import _parse_ocr_result
+
+        for request in requests:
+            try:
+                request.future.set_result(_parse_ocr_result(engine.ocr(request.image)))
+            except Exception as e:
+                request.future.set_exception(e)
+
+    @staticmethod
+    def _run_staged(engine: Any, use_angle_cls: bool, requests: List[_Request]) -> None:
+        """Detect per image, then classify and recognise all crops together"""
+        detected = []
+        all_crops: List[np.ndarray] = []
+        for request in requests:
+            try:
+                with metrics.stage("detection"):
+                    boxes = ocr_stages.detect(engine, request.image)
+                    crops = ocr_stages.crop_lines(request.image, boxes)
+            except Exception as e:
+                request.future.set_exception(e)
+                continue
+            detected.append((request, boxes, len(all_crops), len(crops)))
+            all_crops.extend(crops)
+
+        # Classification and recognition are timed once per batch
+        if use_angle_cls and ocr_stages.supports_classifier(engine):
+            with metrics.stage("classification"):
+                all_crops, _angles = ocr_stages.classify(engine, all_crops)
+        with metrics.stage("recognition"):
+            texts, scores = ocr_stages.recognize_crops(engine, all_crops)
+        engine_min_score = ocr_stages.drop_score(engine)
+
+        for request, boxes, offset, count in detected:
+            request.future.set_result(ocr_stages.filter_lines(
+                texts[offset:offset + count],
+                boxes,
+                scores[offset:offset + count],
+                engine_min_score if request.min_score is None else request.min_score
+            ))
+
+    def shutdown(self) -> None:
+        """Stop the dispatcher; queued requests fail"""
+        with self._cond:
+            self._closed = True
+            pending = [r for q in self._queues.values() for r in q]
+            self._queues.clear()
+            self._cond.notify_all()
+        for request in pending:
+            request.future.set_exception(RuntimeError("Micro-batch scheduler is shut down"))
+        self._slots.release()
+        self._executor.shutdown(wait=False)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get configuration, queue length and batch size / queue wait histograms"""
+        with self._cond:
+            queued = sum(len(q) for q in self._queues.values())
+            total_requests, total_batches = self.total_requests, self.total_batches
+        return {
+            "window_ms": round(self.window * 1000, 3),
+            "max_batch_size": self.max_batch_size,
+            "workers": self.workers,
+            "queued": queued,
+            "total_requests": total_requests,
+            "total_batches": total_batches,
+            "batch_size": self.batch_size_hist.snapshot(),
+            "queue_wait_seconds": self.queue_wait_hist.snapshot(),
+        }
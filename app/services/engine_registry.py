@@ -0,0 +1,399 @@
+"""OCR Engine Registry - Lazily loaded engine pools keyed by OCR options"""
+import gc
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EngineKey = Tuple[str, bool]
+
+
+class EngineBusyError(TimeoutError):
+    """Raised when no engine replica becomes free within the checkout timeout"""
+
+
+class _PoolClosed(Exception):
+    """The pool was evicted while waiting for a replica; fetch the pool again"""
+
+
+def get_process_rss_mb() -> Optional[float]:
+    """
+    Get resident set size of the current process in MB
+
+    Returns:
+        RSS in MB, or None if it cannot be determined on this platform
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class EnginePool:
+    """
+    Pool of engine replicas for one option key
+
+    A PaddleOCR predictor must not be used from two threads at once, so each
+    request checks out a replica for the duration of its inference. Replicas
+    are created lazily up to `size`.
+    """
+
+    def __init__(self, key: EngineKey, factory: Callable[[str, bool], Any], size: int = 1):
+        self.key = key
+        self.size = max(1, size)
+        self._factory = factory
+        self._idle: List[Any] = []
+        self._cond = threading.Condition()
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.load_time = 0.0
+        self.use_count = 0
+
+        # Wait and utilisation statistics
+        self.total_waits = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_timeouts = 0
+        self._busy_time = 0.0
+        self._busy_since = self.loaded_at
+
+    def warm(self) -> None:
+        """Create the first replica so the model is resident"""
+        with self._cond:
+            if self._created > 0:
+                return
+            self._created += 1
+        self._add_replica()
+
+    def _add_replica(self) -> None:
+        """Create a replica and put it in the idle list (slot already reserved)"""
+        start_time = time.time()
+        try:
+            engine = self._factory(*self.key)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        elapsed = time.time() - start_time
+        with self._cond:
+            if self.load_time == 0.0:
+                self.load_time = elapsed
+            self._idle.append(engine)
+            self._cond.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Check out a replica, waiting at most `timeout` seconds
+
+        Raises:
+            EngineBusyError: if no replica became free in time
+            _PoolClosed: if the pool was evicted before a replica was free
+        """
+        start_time = time.time()
+        deadline = None if timeout is None else start_time + timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise _PoolClosed(self.key)
+                if self._idle:
+                    engine = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    # Reserve a slot and build the replica outside the lock
+                    self._created += 1
+                    self._cond.release()
+                    try:
+                        self._add_replica()
+                    finally:
+                        self._cond.acquire()
+                    continue
+
+                waited = True
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    self.total_timeouts += 1
+                    raise EngineBusyError(
+                        f"OCR engine {self.key} busy: no free replica within {timeout:.1f}s "
+                        f"(pool size {self.size})"
+                    )
+                self._cond.wait(remaining)
+
+            wait_time = time.time() - start_time
+            if waited:
+                self.total_waits += 1
+                self.total_wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+
+            self._update_busy_time()
+            self._in_use += 1
+            self.use_count += 1
+            self.last_used = time.time()
+            return engine
+
+    def release(self, engine: Any) -> None:
+        """Return a replica to the pool (dropped if the pool was evicted)"""
+        with self._cond:
+            self._update_busy_time()
+            self._in_use -= 1
+            if self._closed:
+                self._created -= 1
+            else:
+                self._idle.append(engine)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Drop idle replicas (in-use replicas are dropped when released) and wake waiters so they go elsewhere"""
+        with self._cond:
+            self._closed = True
+            self._created -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+    def _update_busy_time(self) -> None:
+        """Accumulate replica-seconds spent in use (call with the lock held)"""
+        now = time.time()
+        self._busy_time += self._in_use * (now - self._busy_since)
+        self._busy_since = now
+
+    @property
+    def in_use(self) -> int:
+        with self._cond:
+            return self._in_use
+
+    @property
+    def replicas(self) -> int:
+        """Replicas created so far (at most `size`)"""
+        with self._cond:
+            return self._created
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get pool size, wait time and utilisation"""
+        with self._cond:
+            self._update_busy_time()
+            elapsed = max(time.time() - self.loaded_at, 1e-9)
+            return {
+                "lang": self.key[0],
+                "use_angle_cls": self.key[1],
+                "load_time": round(self.load_time, 3),
+                "loaded_at": self.loaded_at,
+                "last_used": self.last_used,
+                "use_count": self.use_count,
+                "pool_size": self.size,
+                "replicas": self._created,
+                "in_use": self._in_use,
+                "waits": self.total_waits,
+                "timeouts": self.total_timeouts,
+                "avg_wait_time": round(self.total_wait_time / self.total_waits, 4)
+                if self.total_waits else 0.0,
+                "max_wait_time": round(self.max_wait_time, 4),
+                "utilization": round(self._busy_time / (elapsed * self.size), 4),
+            }
+
+
+class EngineRegistry:
+    """
+    Registry of OCR engine pools keyed by (lang, use_angle_cls)
+
+    Pools are created on first use. The number of resident option keys is
+    capped by count and by process RSS; when a cap is exceeded the least
+    recently used pool is evicted.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str, bool], Any],
+        max_engines: int = 3,
+        max_rss_mb: int = 0,
+        replicas: int = 1,
+        checkout_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            factory: Callable creating an engine for (lang, use_angle_cls)
+            max_engines: Maximum number of resident option keys (at least 1)
+            max_rss_mb: Process RSS limit in MB that triggers eviction (0 = unlimited)
+            replicas: Engine replicas per option key
+            checkout_timeout: Default seconds to wait for a free replica (None = forever)
+        """
+        self._factory = factory
+        self.max_engines = max(1, max_engines)
+        self.max_rss_mb = max_rss_mb
+        self.replicas = max(1, replicas)
+        self.checkout_timeout = checkout_timeout
+        self._pools: "OrderedDict[EngineKey, EnginePool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.total_loads = 0
+        self.total_evictions = 0
+
+    def get_pool(self, lang: str, use_angle_cls: bool) -> EnginePool:
+        """Get the pool for the given options, loading the model if needed"""
+        key = (lang, bool(use_angle_cls))
+
+        pool = self._touch(key)
+        if pool is not None:
+            return pool
+
+        # Serialise loads: loading two models at once doubles the memory peak
+        with self._load_lock:
+            pool = self._touch(key)
+            if pool is not None:
+                return pool
+
+            self._evict_for_new_pool()
+
+            pool = EnginePool(key, self._factory, self.replicas)
+            pool.warm()
+
+            with self._lock:
+                self._pools[key] = pool
+                self.total_loads += 1
+
+            self._evict_over_rss(keep=key)
+            return pool
+
+    @contextmanager
+    def checkout(
+        self,
+        lang: str,
+        use_angle_cls: bool,
+        timeout: Optional[float] = None
+    ) -> Iterator[Any]:
+        """
+        Check out an engine replica for exclusive use
+
+        Usage:
+            with registry.checkout("ch", True) as engine:
+                engine.ocr(image)
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            pool = self.get_pool(lang, use_angle_cls)
+            try:
+                engine = pool.acquire(None if deadline is None else max(0.0, deadline - time.time()))
+                break
+            except _PoolClosed:
+                # Evicted while waiting: the next get_pool() reloads the model
+                logger.info(f"OCR engine lang={lang}, use_angle_cls={use_angle_cls} evicted during checkout, retrying")
+        try:
+            yield engine
+        finally:
+            pool.release(engine)
+
+    def _touch(self, key: EngineKey) -> Optional[EnginePool]:
+        """Mark a pool as most recently used and return it"""
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None:
+                self._pools.move_to_end(key)
+            return pool
+
+    def _evict_for_new_pool(self) -> None:
+        """Make room for one more option key: evict down to the count cap, plus one pool if RSS is over the limit"""
+        while True:
+            with self._lock:
+                if len(self._pools) < self.max_engines:
+                    loaded = bool(self._pools)
+                    break
+            self._evict_lru()
+        if loaded and self._rss_exceeded():
+            self._evict_lru()
+
+    def _evict_over_rss(self, keep: EngineKey) -> None:
+        """
+        Evict the least recently used pool other than `keep` if RSS is over the limit
+
+        At most one pool per check: the allocator rarely hands freed memory
+        back to the OS, so RSS often stays over the limit after an eviction,
+        and evicting until it drops would unload every model only to reload
+        them on the next requests.
+        """
+        if not self._rss_exceeded():
+            return
+        with self._lock:
+            if len(self._pools) <= 1 or next(iter(self._pools)) == keep:
+                return
+        self._evict_lru()
+
+    def _rss_exceeded(self) -> bool:
+        if self.max_rss_mb <= 0:
+            return False
+        rss = get_process_rss_mb()
+        return rss is not None and rss > self.max_rss_mb
+
+    def _evict_lru(self) -> None:
+        """Evict the least recently used pool"""
+        with self._lock:
+            if not self._pools:
+                return
+            key, pool = self._pools.popitem(last=False)
+            self.total_evictions += 1
+        logger.info(f"Evicting OCR engine lang={key[0]}, use_angle_cls={key[1]}, "
+                    f"used {pool.use_count} times")
+        pool.close()
+        del pool
+        gc.collect()
+
+    def is_loaded(self, lang: str, use_angle_cls: bool) -> bool:
+        """Check whether an engine is resident"""
+        with self._lock:
+            return (lang, bool(use_angle_cls)) in self._pools
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pools)
+
+    def clear(self) -> None:
+        """Unload all engines"""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+        gc.collect()
+
+    def occupancy(self) -> Tuple[int, int]:
+        """(replicas in use, replicas loaded), without the cost of a full get_status()"""
+        with self._lock:
+            pools = list(self._pools.values())
+        return sum(pool.in_use for pool in pools), sum(pool.replicas for pool in pools)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get loaded engine pools, in least to most recently used order"""
+        with self._lock:
+            pools = list(self._pools.values())
+        engines = [pool.get_status() for pool in pools]
+        rss = get_process_rss_mb()
+        return {
+            "engines": engines,
+            "max_engines": self.max_engines,
+            "max_rss_mb": self.max_rss_mb,
+            "replicas_per_engine": self.replicas,
+            "checkout_timeout": self.checkout_timeout,
+            "in_use": sum(e["in_use"] for e in engines),
+            "capacity": sum(e["pool_size"] for e in engines),
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "total_loads": self.total_loads,
+            "total_evictions": self.total_evictions,
+        }
@@ -0,0 +1,161 @@
+"""Inference Queue - Bounded executor for running blocking OCR off the event loop"""
+import asyncio
+import contextvars
+import functools
+import math
+import threading
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue cannot admit more work"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InferenceQueue:
+    """
+    Bounded executor for blocking inference calls
+
+    At most `workers` calls run at once and at most `max_queue_depth` more wait
+    for a worker. Work beyond that is rejected immediately with QueueFullError
+    so callers can answer 429 instead of letting latency grow without bound.
+    Admission happens synchronously in the event loop, so a batch is either
+    admitted as a whole or not at all.
+    """
+
+    def __init__(self, workers: int, max_queue_depth: int, retry_after: int = 0):
+        """
+        Args:
+            workers: Calls that may run at the same time
+            max_queue_depth: Calls that may wait for a free worker
+            retry_after: Fixed Retry-After seconds (0 = estimate from service time)
+        """
+        self.workers = max(1, workers)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr-infer")
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._running = 0
+        self._avg_service_time = 0.0
+        self.total_submitted = 0
+        self.total_completed = 0
+        self.total_rejected = 0
+
+    @property
+    def max_outstanding(self) -> int:
+        return self.workers + self.max_queue_depth
+
+    def check_capacity(self, count: int = 1) -> None:
+        """
+        Raise QueueFullError if `count` more calls cannot be admitted now
+
+        Raises:
+            QueueFullError: if the queue is full
+        """
+        with self._lock:
+            self._check_capacity_locked(count)
+
+    def _check_capacity_locked(self, count: int) -> None:
+        if self._outstanding + count > self.max_outstanding:
+            self.total_rejected += 1
+            raise QueueFullError(
+                f"OCR queue full ({self._outstanding} outstanding, "
+                f"limit {self.max_outstanding})",
+                retry_after=self._estimate_retry_after(count)
+            )
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        """Admit one call and run it in the executor"""
+        return self.submit_many([(fn, args)])[0]
+
+    def submit_many(
+        self,
+        calls: Sequence[Tuple[Callable[..., Any], Tuple[Any, ...]]]
+    ) -> List["asyncio.Future[Any]"]:
+        """
+        Admit all calls or none, and run them in the executor
+
+        Must be called from the event loop thread.
+
+        Raises:
+            QueueFullError: if the calls do not all fit in the queue
+        """
+        with self._lock:
+            self._check_capacity_locked(len(calls))
+            self._outstanding += len(calls)
+            self.total_submitted += len(calls)
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for fn, args in calls:
+            # run_in_executor does not carry context variables over; copy them so
+            # per-request state (e.g. stage timings) is visible in the worker thread
+            context = contextvars.copy_context()
+            call = self._executor.submit(functools.partial(context.run, self._run, fn, *args))
+            # The slot is freed when the call itself finishes (or is cancelled before it
+            # started), not when the awaiting request goes away: a cancelled request's
+            # inference keeps the worker busy until it completes
+            call.add_done_callback(self._on_done)
+            futures.append(asyncio.wrap_future(call, loop=loop))
+        return futures
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            self._running += 1
+        start_time = time.time()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.time() - start_time
+            with self._lock:
+                self._running -= 1
+                # Exponential moving average of service time, for Retry-After estimates
+                if self._avg_service_time == 0.0:
+                    self._avg_service_time = elapsed
+                else:
+                    self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * elapsed
+
+    def _on_done(self, _call: "Future[Any]") -> None:
+        with self._lock:
+            self._outstanding -= 1
+            self.total_completed += 1
+
+    def _estimate_retry_after(self, count: int) -> int:
+        """Seconds until `count` slots are likely free (call with the lock held)"""
+        if self.retry_after > 0:
+            return self.retry_after
+        excess = self._outstanding + count - self.max_outstanding
+        estimate = self._avg_service_time * max(excess, 1) / self.workers
+        return max(1, math.ceil(estimate))
+
+    def occupancy(self) -> Tuple[int, int]:
+        """(calls running, calls waiting for a worker)"""
+        with self._lock:
+            return self._running, max(0, self._outstanding - self._running)
+
+    def shutdown(self) -> None:
+        """Stop the executor threads"""
+        self._executor.shutdown(wait=False)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get queue occupancy and counters"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue_depth": self.max_queue_depth,
+                "running": self._running,
+                "queued": max(0, self._outstanding - self._running),
+                "avg_service_time": round(self._avg_service_time, 4),
+                "total_submitted": self.total_submitted,
+                "total_completed": self.total_completed,
+                "total_rejected": self.total_rejected,
+            }
@@ -0,0 +1,139 @@
+"""Prometheus Metrics - Stage latency histograms, request counters and occupancy gauges
+
+Stage timings are recorded twice: into a process-wide histogram, and into
+the timings of the HTTP request being served (a ContextVar), which the API
+returns as a `Server-Timing` header.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before the workers start; each worker then writes its samples
+there and `/metrics` aggregates all of them.
+"""
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+
+STAGES = (
+    "upload_read", "decode", "detection", "classification", "recognition",
+    "inference", "layout", "serialization"
+)
+
+_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+STAGE_SECONDS = Histogram(
+    "ocr_stage_seconds", "Time spent in each OCR pipeline stage",
+    ["stage"], buckets=_LATENCY_BUCKETS
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "ocr_http_request_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=_LATENCY_BUCKETS
+)
+RECOGNITIONS = Counter(
+    "ocr_recognitions_total", "Images recognised",
+    ["lang", "text_layout", "status"]
+)
+QUEUE_REJECTIONS = Counter(
+    "ocr_queue_rejections_total", "Requests rejected with 429 because the inference queue was full"
+)
+ENGINE_REPLICAS = Gauge(
+    "ocr_engine_replicas", "Loaded engine replicas", multiprocess_mode="livesum"
+)
+ENGINE_REPLICAS_IN_USE = Gauge(
+    "ocr_engine_replicas_in_use", "Engine replicas checked out for inference", multiprocess_mode="livesum"
+)
+QUEUE_RUNNING = Gauge(
+    "ocr_queue_running", "Inference calls running", multiprocess_mode="livesum"
+)
+QUEUE_WAITING = Gauge(
+    "ocr_queue_waiting", "Inference calls waiting for a worker", multiprocess_mode="livesum"
+)
+
+
+class RequestTimings:
+    """Accumulated stage durations of one request (thread-safe: stages may run in worker threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._durations[stage] = self._durations.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._durations)
+
+    def header(self) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.as_dict().items())
+
+
+_request_timings: "contextvars.ContextVar[Optional[RequestTimings]]" = contextvars.ContextVar(
+    "ocr_request_timings", default=None
+)
+
+
+def start_request_timings() -> RequestTimings:
+    """Start collecting stage timings for the request handled in the current context"""
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration in the histogram and the current request's timings"""
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as pipeline stage `name`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+
+def observe_http_request(method: str, route: str, status: int, seconds: float) -> None:
+    HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(seconds)
+
+
+def update_occupancy(engine_replicas: int, engine_in_use: int, queue_running: int, queue_waiting: int) -> None:
+    """Refresh this process's occupancy gauges"""
+    ENGINE_REPLICAS.set(engine_replicas)
+    ENGINE_REPLICAS_IN_USE.set(engine_in_use)
+    QUEUE_RUNNING.set(queue_running)
+    QUEUE_WAITING.set(queue_waiting)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Exposition text for all workers (multiprocess mode) or this process"""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess directory (call on shutdown)"""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
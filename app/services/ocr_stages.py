@@ -0,0 +1,165 @@
+"""OCR Pipeline Stages - Run detection, angle classification and recognition separately
+
+PaddleOCR 2.x engines expose their predictors as `text_detector`,
+`text_classifier` and `text_recognizer`. Calling them directly lets callers
+batch recognition across images, skip stages, or recognise user supplied
+boxes. Engines without these attributes (e.g. the PaddleOCR 3.x pipeline)
+only support the full `engine.ocr(...)` call; check `supports_stages` first.
+"""
+from typing import Any, List, Tuple
+
+import cv2
+import numpy as np
+
+EMPTY_BOXES = np.zeros((0, 4, 2), dtype=np.float32)
+
+
+def supports_stages(engine: Any) -> bool:
+    """Whether the engine exposes separate detection/recognition predictors"""
+    return (
+        getattr(engine, "text_detector", None) is not None
+        and getattr(engine, "text_recognizer", None) is not None
+    )
+
+
+def supports_classifier(engine: Any) -> bool:
+    """Whether the engine was loaded with the text angle classifier"""
+    return bool(getattr(engine, "use_angle_cls", False)) and \
+        getattr(engine, "text_classifier", None) is not None
+
+
+# PaddleOCR's default drop_score (engines are created without overriding it)
+DEFAULT_DROP_SCORE = 0.5
+
+
+def drop_score(engine: Any) -> float:
+    """Recognition score below which PaddleOCR discards a line"""
+    args = getattr(engine, "args", None)
+    return float(getattr(engine, "drop_score", getattr(args, "drop_score", DEFAULT_DROP_SCORE)))
+
+
+def reading_order(boxes: np.ndarray) -> List[int]:
+    """Indices ordering boxes top to bottom, then left to right (same order as PaddleOCR)"""
+    order = sorted(range(len(boxes)), key=lambda i: (boxes[i][0][1], boxes[i][0][0]))
+    for i in range(len(order) - 1):
+        for j in range(i, -1, -1):
+            upper, lower = boxes[order[j]], boxes[order[j + 1]]
+            if abs(lower[0][1] - upper[0][1]) < 10 and lower[0][0] < upper[0][0]:
+                order[j], order[j + 1] = order[j + 1], order[j]
+            else:
+                break
+    return order
+
+
+def sort_boxes(boxes: np.ndarray) -> np.ndarray:
+    """Sort boxes top to bottom, then left to right (same order as PaddleOCR)"""
+    if len(boxes) == 0:
+        return boxes
+    return boxes[reading_order(boxes)]
+
+
+def detect(engine: Any, image: np.ndarray) -> np.ndarray:
+    """
+    Run text detection
+
+    Returns:
+        float32 array (N, 4, 2) of quadrilaterals in reading order
+    """
+    dt_boxes, _elapse = engine.text_detector(image)
+    if dt_boxes is None or len(dt_boxes) == 0:
+        return EMPTY_BOXES
+    boxes = np.asarray(dt_boxes, dtype=np.float32).reshape(-1, 4, 2)
+    return sort_boxes(boxes)
+
+
+def crop_line(image: np.ndarray, box: np.ndarray) -> np.ndarray:
+    """Perspective-crop one text line, rotating tall crops to horizontal"""
+    points = np.asarray(box, dtype=np.float32)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    width, height = max(width, 1), max(height, 1)
+    target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    matrix = cv2.getPerspectiveTransform(points, target)
+    crop = cv2.warpPerspective(
+        image, matrix, (width, height),
+        borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC
+    )
+    if crop.shape[0] / crop.shape[1] >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+def crop_lines(image: np.ndarray, boxes: np.ndarray) -> List[np.ndarray]:
+    """Crop every box from the image"""
+    return [crop_line(image, box) for box in boxes]
+
+
+def classify(engine: Any, crops: List[np.ndarray]) -> Tuple[List[np.ndarray], List[Tuple[str, float]]]:
+    """
+    Run the angle classifier, rotating upside-down crops
+
+    Returns:
+        (crops, angles): possibly rotated crops and (label, score) per crop
+    """
+    if not crops:
+        return crops, []
+    rotated, cls_res, _elapse = engine.text_classifier(list(crops))
+    return list(rotated), [(str(label), float(score)) for label, score in cls_res]
+
+
+def page_orientation(engine: Any, crops: List[np.ndarray], sample_lines: int = 8) -> Tuple[int, float]:
+    """
+    Decide whether the whole page is upside down from a sample of its lines
+
+    The angle classifier runs on the `sample_lines` widest crops only (long
+    lines give the most reliable votes); votes are weighted by score.
+
+    Returns:
+        (rotation, agreement): 0 or 180, and the weighted share of the
+        sample voting for it
+    """
+    if not crops:
+        return 0, 1.0
+    widths = np.asarray([crop.shape[1] for crop in crops])
+    sample = np.argsort(-widths, kind="stable")[:max(1, sample_lines)]
+    _rotated, angles = classify(engine, [crops[i] for i in sample])
+    flipped = sum(score for label, score in angles if label == "180")
+    total = sum(score for _label, score in angles) or 1.0
+    if flipped > total / 2:
+        return 180, flipped / total
+    return 0, 1.0 - flipped / total
+
+
+def rotate_crops_180(crops: List[np.ndarray]) -> List[np.ndarray]:
+    return [np.rot90(crop, 2) for crop in crops]
+
+
+def recognize_crops(engine: Any, crops: List[np.ndarray]) -> Tuple[List[str], np.ndarray]:
+    """
+    Run text recognition over crops in one call
+
+    The recogniser batches crops internally (rec_batch_num), so passing crops
+    from several images at once fills its batches better.
+
+    Returns:
+        (texts, scores): text per crop and float64 scores (N,)
+    """
+    if not crops:
+        return [], np.zeros((0,), dtype=np.float64)
+    rec_res, _elapse = engine.text_recognizer(list(crops))
+    texts = [str(text) for text, _score in rec_res]
+    scores = np.asarray([float(score) for _text, score in rec_res], dtype=np.float64)
+    return texts, scores
+
+
+def filter_lines(
+    texts: List[str],
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    min_score: float
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Drop empty lines and lines scoring below `min_score`"""
+    keep = [i for i, (text, score) in enumerate(zip(texts, scores)) if text and score >= min_score]
+    if len(keep) == len(texts):
+        return texts, boxes, scores
+    return [texts[i] for i in keep], boxes[keep].reshape(-1, 4, 2), scores[keep]
@@ -0,0 +1,65 @@
+"""Page Orientation Memo - Remember the page rotation of a batch task or book
+
+Scans of one volume are almost always oriented the same way. Once a few
+consecutive pages of a scope (a batch task or book) agree on a rotation,
+later pages of that scope reuse it and skip the orientation check.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class OrientationMemo:
+    """
+    Page rotation per scope, locked in after `confirm_pages` agreeing pages
+
+    Thread-safe; holds at most `max_scopes` scopes, dropping the least
+    recently used.
+    """
+
+    def __init__(self, confirm_pages: int = 2, max_scopes: int = 1024):
+        self.confirm_pages = max(1, confirm_pages)
+        self.max_scopes = max(1, max_scopes)
+        self._lock = threading.Lock()
+        # scope -> (rotation, consecutive pages agreeing, locked)
+        self._scopes: "OrderedDict[str, Tuple[int, int, bool]]" = OrderedDict()
+        self.total_checks = 0
+        self.total_skipped = 0
+
+    def get(self, scope: Optional[str]) -> Optional[int]:
+        """Memoised rotation of the scope, or None if pages still need checking"""
+        if not scope:
+            return None
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None or not entry[2]:
+                return None
+            self._scopes.move_to_end(scope)
+            self.total_skipped += 1
+            return entry[0]
+
+    def record(self, scope: Optional[str], rotation: int) -> None:
+        """Record the rotation detected on one page of the scope"""
+        with self._lock:
+            self.total_checks += 1
+            if not scope:
+                return
+            entry = self._scopes.get(scope)
+            if entry is not None and entry[0] == rotation:
+                agreeing = entry[1] + 1
+            else:
+                agreeing = 1
+            self._scopes[scope] = (rotation, agreeing, agreeing >= self.confirm_pages)
+            self._scopes.move_to_end(scope)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "confirm_pages": self.confirm_pages,
+                "scopes": len(self._scopes),
+                "locked_scopes": sum(1 for _rotation, _count, locked in self._scopes.values() if locked),
+                "total_checks": self.total_checks,
+                "total_skipped": self.total_skipped,
+            }
@@ -0,0 +1,217 @@
+"""Process Pool Inference Backend - Runs OCR engines in pre-warmed worker processes"""
+import os
+import time
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ImageInput = Union[str, bytes, np.ndarray]
+CompactLines = Tuple[List[str], np.ndarray, np.ndarray]
+
+
+def _worker_init(preload: List[Tuple[str, bool]]) -> None:
+    """Load and warm up engines in the worker process before it accepts work"""
+    from app.ocr_service import ocr_service
+
+    ocr_service.warmup(preload)
+
+
+def _worker_probe() -> Tuple[int, Dict[str, Any]]:
+    """Report the worker's pid and warmup status"""
+    from app.ocr_service import ocr_service
+
+    # Hold this worker briefly so probes queued behind it reach the other workers
+    time.sleep(0.05)
+    return os.getpid(), ocr_service.get_warmup_status()
+
+
+def _worker_infer(image: ImageInput, lang: str, use_angle_cls: bool, angle_mode: str = "line",
+                  orientation_scope: Optional[str] = None, min_score: Optional[float] = None) -> CompactLines:
+    """Run inference in the worker process and return compact arrays"""
+    from app.ocr_service import ocr_service
+
+    return ocr_service._infer_local(image, lang, use_angle_cls, angle_mode, orientation_scope, min_score)
+
+
+def _worker_call(method: str, *args: Any) -> Any:
+    """Run an OcrService method in the worker process (detection only, supplied regions, ...)"""
+    from app.ocr_service import ocr_service
+
+    return getattr(ocr_service, method)(*args)
+
+
+class ProcessBackend:
+    """
+    Inference backend backed by a ProcessPoolExecutor
+
+    Paddle inference holds the GIL for long stretches, so running it in worker
+    processes lets one API process use several cores. Requests ship an image
+    path, the encoded image bytes or a decoded array; results come back as
+    (texts, float32 boxes (N, 4, 2), float64 scores (N,)).
+    """
+
+    def __init__(self, workers: int = 2, preload: Optional[List[Tuple[str, bool]]] = None):
+        """
+        Args:
+            workers: Number of worker processes
+            preload: Engine keys (lang, use_angle_cls) each worker loads at start-up
+        """
+        self.workers = max(1, workers)
+        self.preload = list(preload or [])
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.total_tasks = 0
+        self.total_failures = 0
+        self.total_restarts = 0
+        self.total_busy_time = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: Paddle is not fork-safe once its thread pools have started
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_worker_init,
+                    initargs=(self.preload,)
+                )
+                logger.info(f"Started OCR process pool with {self.workers} workers, "
+                            f"preloading {self.preload}")
+            return self._executor
+
+    def start(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Start the worker processes now rather than on first request
+
+        Blocks until every worker has finished its initializer (engine
+        preload and warmup), or `timeout` seconds have passed. Probes still
+        queued at the deadline (e.g. for a worker stuck in its initializer)
+        are cancelled so they do not hold up real work later.
+
+        Returns:
+            Warmup status reported by each worker that answered
+        """
+        executor = self._get_executor()
+        deadline = None if timeout is None else time.time() + timeout
+        workers: Dict[int, Dict[str, Any]] = {}
+        outstanding: Set[Future] = set()
+        # ProcessPoolExecutor spawns workers lazily, and a worker only takes tasks once
+        # its initializer is done; keep one probe in flight per worker that has not answered yet
+        try:
+            while len(workers) < self.workers:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                while len(outstanding) < self.workers - len(workers):
+                    outstanding.add(executor.submit(_worker_probe))
+                done, outstanding = wait(outstanding, timeout=remaining, return_when=FIRST_COMPLETED)
+                for probe in done:
+                    pid, status = probe.result()
+                    workers[pid] = status
+        finally:
+            for probe in outstanding:
+                probe.cancel()
+        if len(workers) < self.workers:
+            logger.warning(f"Only {len(workers)} of {self.workers} OCR workers started "
+                           f"within {timeout}s")
+        return [{"pid": pid, **status} for pid, status in workers.items()]
+
+    def submit(self, image: ImageInput, lang: str, use_angle_cls: bool, angle_mode: str = "line",
+               orientation_scope: Optional[str] = None, min_score: Optional[float] = None) -> "Future[CompactLines]":
+        """Submit an image for inference (page orientation is memoised per worker process)"""
+        return self._submit(_worker_infer, image, lang, use_angle_cls, angle_mode, orientation_scope, min_score)
+
+    def _submit(self, fn, *args: Any) -> Future:
+        executor = self._get_executor()
+        with self._lock:
+            self._pending += 1
+            self.total_tasks += 1
+        start_time = time.time()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._on_done(start_time, failed=True)
+            self._reset(executor)
+            raise
+        future.add_done_callback(
+            lambda f: self._on_done(start_time, failed=f.exception() is not None)
+        )
+        return future
+
+    def infer(
+        self,
+        image: ImageInput,
+        lang: str,
+        use_angle_cls: bool,
+        timeout: Optional[float] = None,
+        angle_mode: str = "line",
+        orientation_scope: Optional[str] = None,
+        min_score: Optional[float] = None
+    ) -> CompactLines:
+        """Run inference in a worker process and wait for the result"""
+        executor = self._get_executor()
+        future = self.submit(image, lang, use_angle_cls, angle_mode, orientation_scope, min_score)
+        return self._wait(executor, future, timeout)
+
+    def call(self, method: str, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run `ocr_service.<method>(*args)` in a worker process and wait for the result"""
+        executor = self._get_executor()
+        future = self._submit(_worker_call, method, *args)
+        return self._wait(executor, future, timeout)
+
+    def _wait(self, executor: ProcessPoolExecutor, future: Future, timeout: Optional[float]) -> Any:
+        try:
+            return future.result(timeout=timeout)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool for the next request
+            self._reset(executor)
+            raise
+
+    def _on_done(self, start_time: float, failed: bool) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.total_busy_time += time.time() - start_time
+            if failed:
+                self.total_failures += 1
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.total_restarts += 1
+        broken.shutdown(wait=False)
+        logger.warning("OCR process pool broken, it will be restarted on next request")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get worker count and task counters"""
+        with self._lock:
+            return {
+                "backend": "process",
+                "workers": self.workers,
+                "started": self._executor is not None,
+                "pending": self._pending,
+                "total_tasks": self.total_tasks,
+                "total_failures": self.total_failures,
+                "total_restarts": self.total_restarts,
+                "total_busy_time": round(self.total_busy_time, 3),
+            }
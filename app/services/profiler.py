@@ -0,0 +1,279 @@
+"""Sampling Profiler - Capture stacks of slow or sampled OCR requests
+
+A single background thread periodically reads the current frame of every
+thread being profiled (`sys._current_frames()`) and counts the stacks, so
+the profiled code runs unmodified; the cost is one stack walk per thread
+per interval. A profile is kept when its request was picked by 1-in-N
+sampling, or when it ran longer than the slow threshold; the threshold can
+only be applied after the fact, so with it enabled every request is sampled
+and fast ones are discarded.
+
+Profiles are written as collapsed stacks (`<id>.collapsed`, one
+"frame;frame;frame count" line per stack, readable by speedscope and
+flamegraph.pl) next to a JSON sidecar (`<id>.json`) with the timing and the
+request metadata. Only the thread that opened the profile is sampled; work
+handed to process workers or the micro-batch dispatcher shows up as waiting.
+"""
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import threading
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_ID_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class ProfileSession:
+    """Stacks sampled from one thread while a request runs"""
+
+    def __init__(self, label: str, thread_id: int, sampled: bool):
+        self.label = label
+        self.thread_id = thread_id
+        self.sampled = sampled
+        self.started_at = time.time()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.metadata: Dict[str, Any] = {}
+        self._metadata_fns: List[Callable[[], Dict[str, Any]]] = []
+
+    def annotate(self, metadata: Optional[Dict[str, Any]] = None,
+                 metadata_fn: Optional[Callable[[], Dict[str, Any]]] = None) -> None:
+        """
+        Attach request metadata
+
+        `metadata_fn` is only called if the profile is kept, for details that
+        cost something to compute (e.g. reading image dimensions).
+        """
+        if metadata:
+            self.metadata.update(metadata)
+        if metadata_fn is not None:
+            self._metadata_fns.append(metadata_fn)
+
+    def resolve_metadata(self) -> Dict[str, Any]:
+        metadata = dict(self.metadata)
+        for fn in self._metadata_fns:
+            try:
+                metadata.update(fn())
+            except Exception as e:
+                metadata.setdefault("metadata_errors", []).append(str(e))
+        return metadata
+
+
+class ProfileStore:
+    """Profiles on disk, keeping at most `max_files` of the newest"""
+
+    def __init__(self, directory: Path, max_files: int = 200):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def save(self, session: ProfileSession, duration: float, reason: str) -> str:
+        """Write the profile and its metadata; returns the profile id"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = (
+            f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(session.started_at))}"
+            f"-{session.label}-{uuid.uuid4().hex[:8]}"
+        )
+        collapsed = "".join(f"{stack} {count}\n" for stack, count in session.stacks.most_common())
+        (self.directory / f"{profile_id}.collapsed").write_text(collapsed, encoding="utf-8")
+        info = {
+            "id": profile_id,
+            "label": session.label,
+            "reason": reason,
+            "started_at": session.started_at,
+            "duration": round(duration, 4),
+            "samples": session.samples,
+            "metadata": session.resolve_metadata(),
+        }
+        (self.directory / f"{profile_id}.json").write_text(
+            json.dumps(info, ensure_ascii=False, default=str), encoding="utf-8"
+        )
+        self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        if self.max_files <= 0:
+            return
+        infos = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in infos[:max(0, len(infos) - self.max_files)]:
+            for stale in (path, path.with_suffix(".collapsed")):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, newest first"""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for path in self.directory.glob("*.json"):
+            try:
+                profiles.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        profiles.sort(key=lambda info: info.get("started_at", 0), reverse=True)
+        return profiles
+
+    def path(self, profile_id: str, suffix: str = ".collapsed") -> Optional[Path]:
+        """Path of a stored profile file, or None if the id is unknown or malformed"""
+        if not _PROFILE_ID_RE.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.is_file() else None
+
+
+class SamplingProfiler:
+    """
+    Opt-in request profiler
+
+    Usage:
+        with profiler.profile("recognize") as session:
+            if session is not None:
+                session.annotate({"lang": "ch"})
+            ...
+    """
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        sample_rate: int = 0,
+        slow_threshold: float = 0.0,
+        interval: float = 0.005
+    ):
+        """
+        Args:
+            store: Where kept profiles are written
+            sample_rate: Keep 1 in N profiles regardless of latency (0 = off)
+            slow_threshold: Keep profiles of requests slower than this many seconds (0 = off)
+            interval: Seconds between stack samples
+        """
+        self.store = store
+        self.sample_rate = max(0, sample_rate)
+        self.slow_threshold = max(0.0, slow_threshold)
+        self.interval = max(0.001, interval)
+        self._lock = threading.Lock()
+        self._sessions: Dict[int, ProfileSession] = {}
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counter = 0
+        self.total_saved = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_threshold > 0
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[Optional[ProfileSession]]:
+        """
+        Profile the enclosed block if sampling selects it
+
+        Yields the session (None when nothing is recorded). A nested call on
+        a thread that is already being profiled yields the outer session, so
+        inner code can add its metadata to it.
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        thread_id = threading.get_ident()
+        with self._lock:
+            outer = self._sessions.get(thread_id)
+            if outer is None:
+                self._counter += 1
+                sampled = self.sample_rate > 0 and self._counter % self.sample_rate == 0
+                if sampled or self.slow_threshold > 0:
+                    session = ProfileSession(label, thread_id, sampled)
+                    self._sessions[thread_id] = session
+                else:
+                    session = None
+        if outer is not None:
+            yield outer
+            return
+        if session is None:
+            yield None
+            return
+
+        self._ensure_thread()
+        start_time = time.perf_counter()
+        try:
+            yield session
+        finally:
+            duration = time.perf_counter() - start_time
+            with self._lock:
+                self._sessions.pop(thread_id, None)
+            self._finish(session, duration)
+
+    def _finish(self, session: ProfileSession, duration: float) -> None:
+        slow = self.slow_threshold > 0 and duration >= self.slow_threshold
+        if not (session.sampled or slow):
+            return
+        try:
+            profile_id = self.store.save(session, duration, "slow" if slow else "sampled")
+        except Exception as e:
+            logger.warning(f"Failed to save profile for {session.label}: {e}")
+            return
+        self.total_saved += 1
+        logger.info(f"Saved profile {profile_id} ({duration:.2f}s, {session.samples} samples)")
+
+    def _ensure_thread(self) -> None:
+        self._wakeup.set()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample_loop, name="ocr-profiler", daemon=True)
+                self._thread.start()
+
+    def _sample_loop(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            # Clear before looking, so a session registered meanwhile still wakes us
+            self._wakeup.clear()
+            with self._lock:
+                idle = not self._sessions
+            if idle:
+                self._wakeup.wait()
+                continue
+            frames = sys._current_frames()
+            # Record under the lock: a finished session is removed under it
+            # before being written out, so its counts no longer change
+            with self._lock:
+                for session in self._sessions.values():
+                    frame = frames.get(session.thread_id)
+                    if frame is None or session.thread_id == own_id:
+                        continue
+                    session.stacks[_collapse(frame)] += 1
+                    session.samples += 1
+            del frames
+            time.sleep(self.interval)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            active = len(self._sessions)
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_threshold": self.slow_threshold,
+            "interval": self.interval,
+            "active": active,
+            "total_saved": self.total_saved,
+            "directory": str(self.store.directory),
+        }
+
+
+def _collapse(frame) -> str:
+    """Root-to-leaf "func (file:line);..." string for one stack"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
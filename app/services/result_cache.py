@@ -0,0 +1,314 @@
+"""OCR Result Cache - Content-addressed cache of recognition results
+
+Results are keyed by a SHA-256 of the image content plus the options that
+affect inference, so re-uploading the same page skips the model entirely.
+A bounded in-memory LRU sits in front of an optional on-disk tier with a
+TTL and a byte quota. Concurrent misses for the same key are coalesced:
+one caller runs inference and the others wait for its result.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.image_io import iter_row_bands
+
+logger = logging.getLogger(__name__)
+
+CompactLines = Tuple[List[str], np.ndarray, np.ndarray]
+
+_READ_CHUNK = 1024 * 1024
+
+
+def make_cache_key(image: Any, namespace: Dict[str, Any]) -> str:
+    """
+    Hash image content and inference options into a cache key
+
+    Args:
+        image: File path, encoded image bytes or a decoded ndarray
+        namespace: JSON-serialisable options that change the inference result
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(namespace, sort_keys=True, default=str).encode("utf-8"))
+    if isinstance(image, np.ndarray):
+        digest.update(f"ndarray:{image.dtype.str}:{image.shape}".encode("ascii"))
+        # Band by band: a strided or memory-mapped page is never copied or held in full
+        for band in iter_row_bands(image):
+            digest.update(np.ascontiguousarray(band).data)
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        digest.update(b"bytes:")
+        digest.update(image)
+    else:
+        # Hash the file content, not the path: the same page saved twice hits the same entry
+        digest.update(b"bytes:")
+        with open(image, "rb") as f:
+            for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier result cache with request coalescing
+
+    Values are compact results (texts, float32 boxes (N, 4, 2), float64
+    scores (N,)). The memory tier holds at most `max_entries` results; the
+    disk tier stores one JSON file per key under `disk_dir`, drops entries
+    older than `disk_ttl` seconds and evicts least recently used files once
+    the directory exceeds `disk_max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        disk_dir: Optional[Path] = None,
+        disk_ttl: float = 0,
+        disk_max_bytes: int = 0
+    ):
+        """
+        Args:
+            max_entries: Results kept in memory (0 = no memory tier)
+            disk_dir: Directory for the disk tier (None = no disk tier)
+            disk_ttl: Seconds a disk entry stays valid (0 = forever)
+            disk_max_bytes: Disk tier quota in bytes (0 = unlimited)
+        """
+        self.max_entries = max(0, max_entries)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_ttl = disk_ttl
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: "OrderedDict[str, CompactLines]" = OrderedDict()
+        self._inflight: Dict[str, "Future[CompactLines]"] = {}
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.disk_expired = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_or_compute(self, key: str, compute: Callable[[], CompactLines]) -> CompactLines:
+        """
+        Return the cached result for `key`, computing it on a miss
+
+        If another thread is already computing the same key, wait for its
+        result instead of running inference again. Failures are not cached.
+        """
+        with self._lock:
+            value = self._memory_get_locked(key)
+            if value is not None:
+                self.memory_hits += 1
+                return value
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                future: "Future[CompactLines]" = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            value = self._disk_get(key)
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._memory_put_locked(key, value)
+            else:
+                with self._lock:
+                    self.misses += 1
+                value = compute()
+                with self._lock:
+                    self._memory_put_locked(key, value)
+                self._disk_put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _memory_get_locked(self, key: str) -> Optional[CompactLines]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+        return value
+
+    def _memory_put_locked(self, key: str, value: CompactLines) -> None:
+        if self.max_entries == 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Optional[CompactLines]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        if self.disk_ttl > 0 and time.time() - stat.st_mtime > self.disk_ttl:
+            self._disk_remove(path, stat.st_size)
+            with self._lock:
+                self.disk_expired += 1
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Refresh atime so quota eviction keeps recently read entries
+            os.utime(path, (time.time(), stat.st_mtime))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._disk_remove(path, stat.st_size)
+            return None
+
+        texts = [str(text) for text in data["texts"]]
+        boxes = np.asarray(data["boxes"], dtype=np.float32).reshape(-1, 4, 2)
+        scores = np.asarray(data["scores"], dtype=np.float64).reshape(-1)
+        return texts, boxes, scores
+
+    def _disk_put(self, key: str, value: CompactLines) -> None:
+        if self.disk_dir is None:
+            return
+        texts, boxes, scores = value
+        payload = json.dumps(
+            {"texts": list(texts), "boxes": boxes.tolist(), "scores": scores.tolist()},
+            ensure_ascii=False
+        ).encode("utf-8")
+        path = self._disk_path(key)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(exist_ok=True)
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(payload) - replaced
+            if self.disk_max_bytes > 0 and self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk_locked()
+
+    def _disk_remove(self, path: Path, size: int) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            return
+        with self._disk_lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes = max(0, self._disk_bytes - size)
+
+    def _disk_entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.disk_dir.glob("*/*.json"):
+            try:
+                entries.append((path, path.stat()))
+            except OSError:
+                continue
+        return entries
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(stat.st_size for _path, stat in self._disk_entries())
+
+    def _evict_disk_locked(self) -> None:
+        """Delete expired entries, then least recently used ones, until under quota"""
+        now = time.time()
+        entries = self._disk_entries()
+        total = sum(stat.st_size for _path, stat in entries)
+        entries.sort(key=lambda entry: entry[1].st_atime)
+        for path, stat in entries:
+            expired = self.disk_ttl > 0 and now - stat.st_mtime > self.disk_ttl
+            if not expired and total <= self.disk_max_bytes:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= stat.st_size
+            if expired:
+                self.disk_expired += 1
+            else:
+                self.disk_evictions += 1
+        self._disk_bytes = total
+
+    def clear(self) -> None:
+        """Drop all memory and disk entries"""
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir is not None:
+            with self._disk_lock:
+                for path, _stat in self._disk_entries():
+                    path.unlink(missing_ok=True)
+                self._disk_bytes = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get sizes and hit/miss/eviction counters"""
+        with self._lock:
+            # Coalesced requests were served without running inference, so they count as hits
+            hits = self.memory_hits + self.disk_hits + self.coalesced
+            lookups = hits + self.misses
+            status = {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_evictions": self.memory_evictions,
+                "inflight": len(self._inflight),
+            }
+        if self.disk_dir is not None:
+            with self._disk_lock:
+                if self._disk_bytes is None:
+                    self._disk_bytes = self._scan_disk_bytes()
+                status.update({
+                    "disk_dir": str(self.disk_dir),
+                    "disk_bytes": self._disk_bytes,
+                    "disk_max_bytes": self.disk_max_bytes,
+                    "disk_ttl": self.disk_ttl,
+                    "disk_evictions": self.disk_evictions,
+                    "disk_expired": self.disk_expired,
+                })
+        else:
+            status["disk_dir"] = None
+        return status
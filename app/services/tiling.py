@@ -0,0 +1,149 @@
+"""Tiled Inference - Split oversized pages into overlapping tiles and merge the lines
+
+Detection shrinks its input to a fixed side limit, so small characters on a
+very large spread are lost, and running the full pipeline on the whole page
+holds page-sized intermediate buffers. Recognising overlapping tiles keeps
+the working set bounded by the tile size. A line crossing a tile border is
+seen whole by the neighbouring tile as long as the overlap is larger than
+the line; the cut copies are removed when the tiles are merged.
+"""
+import difflib
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.services import ocr_stages
+
+CompactLines = Tuple[List[str], np.ndarray, np.ndarray]
+Tile = Tuple[int, int, int, int]
+
+
+def plan_tiles(width: int, height: int, tile_size: int, overlap: int) -> List[Tile]:
+    """
+    Cover the page with tiles of at most `tile_size` pixels per side
+
+    Neighbouring tiles share at least `overlap` pixels; the last tile in each
+    row/column is aligned to the page edge rather than overhanging it.
+
+    Returns:
+        (x0, y0, x1, y1) per tile, row by row
+    """
+    tile_size = max(1, tile_size)
+    overlap = min(max(0, overlap), tile_size // 2)
+    xs = _tile_starts(width, tile_size, overlap)
+    ys = _tile_starts(height, tile_size, overlap)
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in ys
+        for x in xs
+    ]
+
+
+def _tile_starts(length: int, tile_size: int, overlap: int) -> List[int]:
+    if length <= tile_size:
+        return [0]
+    stride = tile_size - overlap
+    count = -(-(length - overlap) // stride)  # ceil((length - overlap) / stride)
+    # Spread the tiles evenly so all overlaps are about the same size
+    step = (length - tile_size) / (count - 1)
+    return [round(i * step) for i in range(count)]
+
+
+def merge_tile_lines(
+    tile_lines: Sequence[Tuple[Tile, CompactLines]],
+    overlap_threshold: float = 0.5,
+    text_threshold: float = 0.6
+) -> CompactLines:
+    """
+    Shift tile results into page coordinates and drop duplicates
+
+    Two lines from different tiles are duplicates when the intersection of
+    their bounding rectangles covers at least `overlap_threshold` of the
+    smaller one (so a line cut at a tile border matches its whole copy) and
+    their texts agree: one contains the other, or their similarity ratio is
+    at least `text_threshold`. The larger box is kept (the higher score on
+    a tie), since the smaller one is usually the cut copy.
+
+    Returns:
+        Lines in reading order: (texts, float32 boxes (N, 4, 2), float64 scores (N,))
+    """
+    texts: List[str] = []
+    boxes_list = []
+    scores_list = []
+    tile_ids = []
+    for tile_id, ((x0, y0, _x1, _y1), (tile_texts, tile_boxes, tile_scores)) in enumerate(tile_lines):
+        if len(tile_texts) == 0:
+            continue
+        texts.extend(tile_texts)
+        boxes_list.append(tile_boxes + np.asarray([x0, y0], dtype=np.float32))
+        scores_list.append(tile_scores)
+        tile_ids.extend([tile_id] * len(tile_texts))
+
+    if not texts:
+        return [], ocr_stages.EMPTY_BOXES, np.zeros((0,), dtype=np.float64)
+
+    boxes = np.concatenate(boxes_list).astype(np.float32, copy=False)
+    scores = np.concatenate(scores_list).astype(np.float64, copy=False)
+    tiles = np.asarray([tile for tile, _lines in tile_lines], dtype=np.float32)
+    keep = _dedupe(texts, boxes, scores, np.asarray(tile_ids), tiles, overlap_threshold, text_threshold)
+
+    boxes = boxes[keep]
+    order = ocr_stages.reading_order(boxes)
+    return (
+        [texts[keep[i]] for i in order],
+        boxes[order].reshape(-1, 4, 2),
+        scores[keep][order]
+    )
+
+
+def _dedupe(
+    texts: List[str],
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    tile_ids: np.ndarray,
+    tiles: np.ndarray,
+    overlap_threshold: float,
+    text_threshold: float
+) -> List[int]:
+    """Indices of the lines to keep"""
+    rects = np.concatenate([boxes.min(axis=1), boxes.max(axis=1)], axis=1)  # (N, 4) x0 y0 x1 y1
+    areas = np.maximum(rects[:, 2] - rects[:, 0], 0) * np.maximum(rects[:, 3] - rects[:, 1], 0)
+
+    # Only lines reaching into another tile can have a duplicate; compare just those
+    reaches = (
+        (rects[:, None, 0] < tiles[None, :, 2]) & (rects[:, None, 2] > tiles[None, :, 0])
+        & (rects[:, None, 1] < tiles[None, :, 3]) & (rects[:, None, 3] > tiles[None, :, 1])
+    )
+    shared = np.nonzero(reaches.sum(axis=1) > 1)[0]
+    if len(shared) < 2:
+        return list(range(len(texts)))
+
+    r = rects[shared]
+    ix = np.minimum(r[:, None, 2], r[None, :, 2]) - np.maximum(r[:, None, 0], r[None, :, 0])
+    iy = np.minimum(r[:, None, 3], r[None, :, 3]) - np.maximum(r[:, None, 1], r[None, :, 1])
+    inter = np.maximum(ix, 0) * np.maximum(iy, 0)
+    a = areas[shared]
+    smaller = np.maximum(np.minimum(a[:, None], a[None, :]), 1e-6)
+    ids = tile_ids[shared]
+    candidate = (inter / smaller >= overlap_threshold) & (ids[:, None] != ids[None, :])
+
+    # Visit larger boxes first so the complete copy of a cut line wins
+    ranking = sorted(range(len(shared)), key=lambda k: (-a[k], -scores[shared[k]]))
+    rank = np.empty(len(shared), dtype=np.int64)
+    rank[ranking] = np.arange(len(shared))
+    dropped = np.zeros(len(texts), dtype=bool)
+    for k in ranking:
+        i = shared[k]
+        if dropped[i]:
+            continue
+        for m in np.nonzero(candidate[k] & (rank > rank[k]))[0]:
+            j = shared[m]
+            if not dropped[j] and _texts_agree(texts[i], texts[j], text_threshold):
+                dropped[j] = True
+    return [i for i in range(len(texts)) if not dropped[i]]
+
+
+def _texts_agree(a: str, b: str, threshold: float) -> bool:
+    if a in b or b in a:
+        return True
+    return difflib.SequenceMatcher(None, a, b).ratio() >= threshold
@@ -0,0 +1,199 @@
+"""Engine Warmup - Preload OCR engines and run a synthetic image through them
+
+Loading a PaddleOCR engine and its first inference (predictor
+initialisation, memory pool growth) take seconds. Doing both at start-up
+keeps that cost off the first real request, and lets a readiness probe hold
+traffic back until the engines are hot.
+"""
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from app.services.engine_registry import EngineKey, EngineRegistry
+
+logger = logging.getLogger(__name__)
+
+_TRUE_VALUES = {"1", "true", "yes", "on", "cls"}
+_FALSE_VALUES = {"0", "false", "no", "off", "nocls"}
+
+
+def parse_engine_keys(spec: str, default_use_angle_cls: bool = True) -> List[EngineKey]:
+    """
+    Parse an engine list such as "ch,en:false" into (lang, use_angle_cls) keys
+
+    Each comma separated item is `lang` or `lang:use_angle_cls`; items
+    without a flag use `default_use_angle_cls`. Duplicates are dropped.
+
+    Raises:
+        ValueError: if a use_angle_cls flag is not a boolean
+    """
+    keys: List[EngineKey] = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        lang, _, flag = item.partition(":")
+        flag = flag.strip().lower()
+        if not flag:
+            use_angle_cls = default_use_angle_cls
+        elif flag in _TRUE_VALUES:
+            use_angle_cls = True
+        elif flag in _FALSE_VALUES:
+            use_angle_cls = False
+        else:
+            raise ValueError(f"Invalid use_angle_cls flag in engine spec: {item!r}")
+        key = (lang.strip(), use_angle_cls)
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def make_warmup_image(width: int = 640, height: int = 160) -> np.ndarray:
+    """Synthetic page with a few printed lines, so detection finds boxes and every stage runs"""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    lines = ["PaddleOCR warmup 0123456789", "ABCDEFGHIJ abcdefghij"]
+    line_height = height // (len(lines) + 1)
+    for index, text in enumerate(lines, start=1):
+        cv2.putText(
+            image, text, (20, index * line_height + 10),
+            cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2, cv2.LINE_AA
+        )
+    return image
+
+
+def warm_pool(registry: EngineRegistry, key: EngineKey, runs: int = 1,
+              image: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Load every replica of one engine key and run warmup inference on each
+
+    Args:
+        registry: Engine registry to load into
+        key: (lang, use_angle_cls)
+        runs: Warmup inferences per replica (0 = load only)
+        image: Warmup image (default: make_warmup_image())
+
+    Returns:
+        Timings: load_time (seconds to create the replicas) and
+        warmup_time (seconds spent in warmup inference)
+    """
+    if image is None:
+        image = make_warmup_image()
+
+    start_time = time.time()
+    pool = registry.get_pool(*key)
+    # Check out all replicas at once so each one gets created and warmed
+    engines = []
+    try:
+        for _ in range(pool.size):
+            engines.append(pool.acquire(registry.checkout_timeout))
+        load_time = time.time() - start_time
+
+        warmup_start = time.time()
+        for engine in engines:
+            for _ in range(runs):
+                engine.ocr(image)
+        warmup_time = time.time() - warmup_start
+    finally:
+        for engine in engines:
+            pool.release(engine)
+
+    return {
+        "lang": key[0],
+        "use_angle_cls": key[1],
+        "replicas": len(engines),
+        "load_time": round(load_time, 3),
+        "warmup_time": round(warmup_time, 3),
+    }
+
+
+class WarmupTracker:
+    """
+    Start-up warmup state for the readiness probe
+
+    States: pending -> warming -> ready | failed. `disabled` means no warmup
+    was configured and the service counts as ready straight away.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "pending"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.engines: List[Dict[str, Any]] = []
+        self.workers: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state in ("ready", "disabled")
+
+    def disable(self) -> None:
+        with self._lock:
+            self.state = "disabled"
+
+    def begin(self) -> None:
+        with self._lock:
+            self.state = "warming"
+            self.started_at = time.time()
+            self.finished_at = None
+            self.engines = []
+            self.workers = []
+            self.error = None
+
+    def add_engine(self, info: Dict[str, Any]) -> None:
+        with self._lock:
+            self.engines.append(info)
+
+    def finish(self, error: Optional[str] = None, workers: Optional[List[Dict[str, Any]]] = None) -> None:
+        with self._lock:
+            self.finished_at = time.time()
+            self.error = error
+            if workers is not None:
+                self.workers = workers
+            self.state = "failed" if error else "ready"
+
+    def run(self, keys: List[EngineKey], warm_one: Callable[[EngineKey], Dict[str, Any]]) -> bool:
+        """
+        Warm each key in turn, recording timings
+
+        A key that fails is logged and recorded; the rest are still warmed,
+        but the tracker ends in the `failed` state.
+
+        Returns:
+            True if every key warmed up
+        """
+        self.begin()
+        errors = []
+        for key in keys:
+            try:
+                info = warm_one(key)
+            except Exception as e:
+                logger.error(f"Warmup failed for engine lang={key[0]}, use_angle_cls={key[1]}: {e}",
+                             exc_info=True)
+                errors.append(f"{key[0]}:{key[1]}: {e}")
+                continue
+            logger.info(f"Warmed engine lang={key[0]}, use_angle_cls={key[1]}: "
+                        f"load {info['load_time']}s, warmup {info['warmup_time']}s")
+            self.add_engine(info)
+        self.finish(error="; ".join(errors) or None)
+        return not errors
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            status = {
+                "state": self.state,
+                "ready": self.ready,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "duration": round(self.finished_at - self.started_at, 3)
+                if self.started_at and self.finished_at else None,
+                "engines": list(self.engines),
+                "error": self.error,
+            }
+            if self.workers:
+                status["workers"] = list(self.workers)
+            return status
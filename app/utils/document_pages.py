@@ -0,0 +1,37 @@
+"""Page iteration over scanned files: images, PDFs and multi-page TIFFs"""
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from app.utils.pdf_pages import is_pdf, iter_pdf_pages
+from app.utils.pdf_pages import page_count as pdf_page_count
+from app.utils.tiff_pages import frame_count, is_tiff, iter_tiff_frames
+
+
+def page_count(path: str) -> int:
+    """Pages in a scanned file: PDF pages, TIFF frames, or 1 for other images"""
+    if is_pdf(path):
+        return pdf_page_count(path)
+    if is_tiff(path):
+        return frame_count(path)
+    return 1
+
+
+def iter_file_pages(path: str, dpi: int = 200) -> Iterator[Tuple[Optional[int], Union[str, np.ndarray]]]:
+    """
+    Pages of a scanned file, read one at a time
+
+    Yields:
+        (page_number, image): the 1-based page number and the BGR page for
+        PDFs, the frame (a view of the memory-mapped file when uncompressed)
+        for multi-page TIFFs; (None, path) for other images, and (None, frame)
+        for single-frame TIFFs so the page number still comes from the file name
+    """
+    if is_pdf(path):
+        yield from iter_pdf_pages(path, dpi)
+    elif is_tiff(path):
+        multi_page = frame_count(path) > 1
+        for frame_number, image in iter_tiff_frames(path):
+            yield (frame_number if multi_page else None), image
+    else:
+        yield None, path
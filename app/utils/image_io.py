@@ -0,0 +1,334 @@
+"""Image loading helpers"""
+import io
+import math
+import mmap
+import struct
+from typing import Iterator, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from app.utils.tiff_pages import is_tiff, iter_tiff_frames
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional: without it JPEGs are decoded at full size, then resized
+    Image = None
+
+ImageSource = Union[str, bytes, np.ndarray]
+ScaleFactors = Tuple[float, float]
+
+_JPEG_MAGIC = b"\xff\xd8\xff"
+# Rows of a memory-mapped image are read and released in bands of about this size
+_BAND_BYTES = 16 * 1024 * 1024
+# EXIF orientations that rotate the image by 90 degrees (width and height swap)
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def load_image(image: ImageSource) -> np.ndarray:
+    """
+    Load an image as a 3-channel BGR ndarray
+
+    Args:
+        image: File path, encoded image bytes, or an already decoded ndarray
+
+    Returns:
+        BGR image array (H, W, 3)
+
+    Raises:
+        ValueError: if the image cannot be decoded
+    """
+    if isinstance(image, np.ndarray):
+        return to_bgr(image)
+
+    frame = _load_tiff_frame(image)
+    if frame is not None:
+        return to_bgr(frame)
+
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        data = np.frombuffer(image, dtype=np.uint8)
+    else:
+        # np.fromfile + imdecode also handles non-ASCII paths on Windows, unlike cv2.imread
+        data = np.fromfile(str(image), dtype=np.uint8)
+
+    decoded = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if decoded is None:
+        raise ValueError("Cannot decode image data")
+    return decoded
+
+
+def load_frame(image: ImageSource) -> np.ndarray:
+    """
+    Load an image to be cut into tiles or regions, without expanding it to a full-page BGR array
+
+    Arrays and uncompressed TIFF frames are returned as they are (grayscale,
+    or a view of the memory-mapped file), so only the crops taken from them
+    are copied and converted with to_bgr. JPEG, PNG and other compressed
+    formats have no region decode and are decoded whole.
+
+    Raises:
+        ValueError: if the image cannot be decoded
+    """
+    if isinstance(image, np.ndarray):
+        return image
+    frame = _load_tiff_frame(image)
+    if frame is not None:
+        return frame
+    return load_image(image)
+
+
+def to_bgr(image: np.ndarray) -> np.ndarray:
+    """
+    Convert grayscale or BGRA arrays to 3-channel BGR
+
+    Memory-mapped and strided frames are converted band by band into the
+    result, so the source pages are released as they are consumed and no
+    full-size contiguous copy of the source is made first.
+    """
+    if image.ndim == 2:
+        code = cv2.COLOR_GRAY2BGR
+    elif image.ndim == 3 and image.shape[2] == 4:
+        code = cv2.COLOR_BGRA2BGR
+    else:
+        return image
+    if _mapped_buffer(image) is None and image.flags.c_contiguous:
+        return cv2.cvtColor(image, code)
+    converted = np.empty(image.shape[:2] + (3,), dtype=image.dtype)
+    top = 0
+    for band in iter_row_bands(image):
+        bottom = top + band.shape[0]
+        cv2.cvtColor(np.ascontiguousarray(band), code, dst=converted[top:bottom])
+        top = bottom
+    return converted
+
+
+def resolve_scale(width: int, height: int, max_side_len: int = 0, scale: float = 1.0) -> float:
+    """
+    Scale factor (at most 1) satisfying both a maximum side length and a fixed ratio
+
+    Args:
+        width, height: Original image size
+        max_side_len: Longest side after scaling (0 = unlimited)
+        scale: Requested ratio, e.g. target_dpi / source_dpi
+    """
+    factor = min(1.0, scale) if scale > 0 else 1.0
+    if max_side_len > 0 and max(width, height) * factor > max_side_len:
+        factor = max_side_len / max(width, height)
+    return factor
+
+
+def load_image_scaled(
+    image: ImageSource,
+    max_side_len: int = 0,
+    scale: float = 1.0
+) -> Tuple[np.ndarray, ScaleFactors]:
+    """
+    Load an image as BGR, reduced to the requested resolution
+
+    JPEGs are decoded with libjpeg DCT scaling (Pillow draft mode), so only
+    1/2, 1/4 or 1/8 of the pixels are ever materialised; the remaining
+    reduction is an area resize. Other formats are decoded at full size and
+    resized; uncompressed TIFFs are resized straight from a memory map of the
+    file. Images are never enlarged.
+
+    Args:
+        image: File path, encoded image bytes, or an already decoded ndarray
+        max_side_len: Longest side of the result (0 = unlimited)
+        scale: Requested ratio, e.g. target_dpi / source_dpi
+
+    Returns:
+        (image, (sx, sy)): BGR image and the factors mapping its coordinates
+        back to the original image (x_original = x * sx)
+
+    Raises:
+        ValueError: if the image cannot be decoded
+    """
+    if isinstance(image, np.ndarray):
+        # Reduce first: a grayscale or memory-mapped page is never expanded to full-size BGR
+        resized, factors = _resize_to_scale(image, max_side_len, scale)
+        return to_bgr(resized), factors
+
+    frame = _load_tiff_frame(image)
+    if frame is not None:
+        resized, factors = _resize_to_scale(frame, max_side_len, scale)
+        return to_bgr(resized), factors
+
+    if Image is not None and _is_jpeg(image):
+        decoded = _load_jpeg_draft(image, max_side_len, scale)
+        if decoded is not None:
+            return decoded
+
+    return _resize_to_scale(load_image(image), max_side_len, scale)
+
+
+def image_size(image: ImageSource) -> Tuple[int, int]:
+    """
+    (width, height) of an image, read from the file header when possible
+
+    Raises:
+        ValueError: if the image cannot be decoded
+    """
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    if Image is not None:
+        source = io.BytesIO(image) if isinstance(image, (bytes, bytearray, memoryview)) else image
+        try:
+            with Image.open(source) as pil_image:
+                width, height = pil_image.size
+                if pil_image.getexif().get(0x0112, 1) in _TRANSPOSED_ORIENTATIONS:
+                    width, height = height, width
+                return width, height
+        except (OSError, SyntaxError, ValueError):
+            pass
+    decoded = load_image(image)
+    return decoded.shape[1], decoded.shape[0]
+
+
+def iter_row_bands(image: np.ndarray, band_bytes: int = _BAND_BYTES) -> Iterator[np.ndarray]:
+    """
+    Horizontal bands of an image, about band_bytes each
+
+    For memory-mapped images (e.g. TIFF frames) the pages of a band are
+    released once the caller moves on to the next band, so reading a whole
+    frame keeps only one band resident.
+    """
+    rows = max(1, band_bytes // max(1, image[:1].nbytes))
+    for top in range(0, image.shape[0], rows):
+        band = image[top:top + rows]
+        yield band
+        _release_mapped_pages(band)
+
+
+def rescale_boxes(boxes: np.ndarray, factors: ScaleFactors) -> np.ndarray:
+    """Map (N, 4, 2) boxes from a scaled image back to original coordinates"""
+    sx, sy = factors
+    if (sx, sy) == (1.0, 1.0) or len(boxes) == 0:
+        return boxes
+    return boxes * np.asarray([sx, sy], dtype=boxes.dtype)
+
+
+def _is_jpeg(image: ImageSource) -> bool:
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return bytes(image[:3]) == _JPEG_MAGIC
+    try:
+        with open(image, "rb") as f:
+            return f.read(3) == _JPEG_MAGIC
+    except OSError:
+        return False
+
+
+def _load_tiff_frame(image: Union[str, bytes]) -> Optional[np.ndarray]:
+    """First frame of a TIFF (a view of the file when uncompressed), or None for other formats"""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        header = bytes(image[:4])
+    else:
+        try:
+            with open(image, "rb") as f:
+                header = f.read(4)
+        except OSError:
+            return None
+    if not is_tiff(header):
+        return None
+    try:
+        for _, frame in iter_tiff_frames(image, last_frame=1):
+            return frame
+    except (OSError, RuntimeError, ValueError, KeyError, struct.error):
+        # Unusual layouts are left to cv2
+        pass
+    return None
+
+
+def _resize_to_scale(image: np.ndarray, max_side_len: int, scale: float) -> Tuple[np.ndarray, ScaleFactors]:
+    height, width = image.shape[:2]
+    factor = resolve_scale(width, height, max_side_len, scale)
+    if factor >= 1.0:
+        return image, (1.0, 1.0)
+    target = (max(1, round(width * factor)), max(1, round(height * factor)))
+    if _mapped_buffer(image) is not None or not image.flags.c_contiguous:
+        resized = _resize_banded(image, target)
+    else:
+        resized = cv2.resize(image, target, interpolation=cv2.INTER_AREA)
+    return resized, (width / target[0], height / target[1])
+
+
+def _resize_banded(image: np.ndarray, target: Tuple[int, int]) -> np.ndarray:
+    """
+    Area-resize band by band
+
+    cv2 would copy a strided view (e.g. a channel-reversed TIFF frame) in
+    full before resizing; here only one band is copied, and memory-mapped
+    pages are released as the bands are consumed.
+    """
+    height = image.shape[0]
+    resized = np.empty((target[1], target[0]) + image.shape[2:], dtype=image.dtype)
+    top = 0
+    for band in iter_row_bands(image):
+        bottom = top + band.shape[0]
+        out_top, out_bottom = round(top * target[1] / height), round(bottom * target[1] / height)
+        if out_bottom > out_top:
+            resized[out_top:out_bottom] = cv2.resize(
+                np.ascontiguousarray(band), (target[0], out_bottom - out_top), interpolation=cv2.INTER_AREA
+            ).reshape(resized[out_top:out_bottom].shape)
+        top = bottom
+    return resized
+
+
+def _mapped_buffer(image: np.ndarray) -> Optional[mmap.mmap]:
+    """The mmap an array is a view of, if any"""
+    base = image
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return base if isinstance(base, mmap.mmap) else None
+
+
+def _release_mapped_pages(image: np.ndarray) -> None:
+    """Drop the resident pages behind a view of a read-only mmap (they are re-read from the file if needed)"""
+    buffer = _mapped_buffer(image)
+    if buffer is None or not hasattr(mmap, "MADV_DONTNEED") or image.size == 0:
+        return
+    low = high = image.__array_interface__["data"][0]
+    for extent, stride in zip(image.shape, image.strides):
+        if stride < 0:
+            low += stride * (extent - 1)
+        else:
+            high += stride * (extent - 1)
+    origin = np.frombuffer(buffer, dtype=np.uint8).__array_interface__["data"][0]
+    start = (low - origin) // mmap.PAGESIZE * mmap.PAGESIZE
+    end = high + image.itemsize - origin
+    try:
+        buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+    except (OSError, ValueError):
+        pass
+
+
+def _load_jpeg_draft(
+    image: Union[str, bytes],
+    max_side_len: int,
+    scale: float
+) -> Optional[Tuple[np.ndarray, ScaleFactors]]:
+    """Decode a JPEG at reduced size, or None if no reduction is needed"""
+    source = io.BytesIO(image) if isinstance(image, (bytes, bytearray, memoryview)) else image
+    try:
+        with Image.open(source) as pil_image:
+            # Original size as cv2.imdecode would return it (EXIF orientation applied)
+            width, height = pil_image.size
+            orientation = pil_image.getexif().get(0x0112, 1)
+            if orientation in _TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+
+            factor = resolve_scale(width, height, max_side_len, scale)
+            if factor >= 1.0:
+                return None
+            target = (max(1, round(width * factor)), max(1, round(height * factor)))
+
+            # draft() picks the largest DCT scale still covering the requested size
+            draft_size = (target[1], target[0]) if orientation in _TRANSPOSED_ORIENTATIONS else target
+            pil_image.draft("RGB", draft_size)
+            pil_image = ImageOps.exif_transpose(pil_image.convert("RGB"))
+            decoded = cv2.cvtColor(np.asarray(pil_image), cv2.COLOR_RGB2BGR)
+    except (OSError, SyntaxError, ValueError) as e:
+        raise ValueError(f"Cannot decode image data: {e}") from e
+
+    if decoded.shape[1] != target[0] or decoded.shape[0] != target[1]:
+        decoded = cv2.resize(decoded, target, interpolation=cv2.INTER_AREA)
+    return decoded, (width / target[0], height / target[1])
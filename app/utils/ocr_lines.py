@@ -0,0 +1,66 @@
+"""Compact OCR result representation"""
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+EMPTY_BOXES = np.zeros((0, 4, 2), dtype=np.float32)
+EMPTY_SCORES = np.zeros((0,), dtype=np.float64)
+
+
+class OcrLines:
+    """
+    Recognised lines of one page, held as arrays
+
+    texts: list of N strings; boxes: float32 (N, 4, 2) quadrilaterals;
+    scores: float64 (N,) confidences. Per-line dicts or pydantic models are
+    only built at the API / storage boundary via `to_dicts()` and
+    `to_text_boxes()`, so intermediate stages do not allocate one Python
+    object graph per line.
+    """
+
+    __slots__ = ("texts", "boxes", "scores")
+
+    def __init__(self, texts: List[str], boxes: np.ndarray, scores: np.ndarray):
+        self.texts = texts
+        self.boxes = boxes
+        self.scores = scores
+
+    @classmethod
+    def empty(cls) -> "OcrLines":
+        return cls([], EMPTY_BOXES, EMPTY_SCORES)
+
+    @classmethod
+    def from_tuple(cls, lines: Tuple[List[str], np.ndarray, np.ndarray]) -> "OcrLines":
+        texts, boxes, scores = lines
+        return cls(texts, boxes, scores)
+
+    def as_tuple(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        return self.texts, self.boxes, self.scores
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __repr__(self) -> str:
+        return f"OcrLines({len(self)} lines)"
+
+    def take(self, indices: List[int]) -> "OcrLines":
+        """Lines at `indices`, in that order"""
+        return OcrLines(
+            [self.texts[i] for i in indices],
+            self.boxes[indices].reshape(-1, 4, 2),
+            self.scores[indices]
+        )
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """JSON-ready [{"text", "confidence", "box"}, ...] (the TextBox wire format)"""
+        # ndarray.tolist() converts in C; far cheaper than per-element float() calls
+        return [
+            {"text": text, "confidence": score, "box": box}
+            for text, score, box in zip(self.texts, self.scores.tolist(), self.boxes.tolist())
+        ]
+
+    def to_text_boxes(self) -> List[Any]:
+        """Pydantic TextBox models (for callers that need validated objects)"""
+        from app.schemas import TextBox
+
+        return [TextBox.model_construct(**item) for item in self.to_dicts()]
@@ -0,0 +1,81 @@
+"""PDF page rasterisation helpers
+
+PDF pages are rendered lazily, one page at a time, so memory stays flat at
+a single page whatever the document length.
+"""
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+try:
+    import pymupdf
+except ImportError:  # PyMuPDF is optional: without it PDF files cannot be recognised
+    pymupdf = None
+
+PdfSource = Union[str, bytes]
+
+_PDF_MAGIC = b"%PDF-"
+
+
+def pdf_supported() -> bool:
+    """Whether PyMuPDF is installed"""
+    return pymupdf is not None
+
+
+def is_pdf(source: PdfSource) -> bool:
+    """Whether the path has a .pdf extension, or the bytes start with the PDF header"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:len(_PDF_MAGIC)]) == _PDF_MAGIC
+    return Path(source).suffix.lower() == ".pdf"
+
+
+def _open(source: PdfSource):
+    if pymupdf is None:
+        raise RuntimeError("PDF support requires PyMuPDF (pip install PyMuPDF)")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pymupdf.open(stream=bytes(source), filetype="pdf")
+    return pymupdf.open(source)
+
+
+def page_count(source: PdfSource) -> int:
+    """Number of pages (reads the page tree only, nothing is rendered)"""
+    with _open(source) as document:
+        return document.page_count
+
+
+def render_page(page, dpi: int) -> np.ndarray:
+    """Rasterise one PyMuPDF page as a BGR ndarray (H, W, 3)"""
+    zoom = dpi / 72.0
+    pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), colorspace=pymupdf.csRGB, alpha=False)
+    rgb = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, pixmap.n)
+    # cvtColor writes a new array, so the pixmap buffer can be freed right away
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+
+def iter_pdf_pages(
+    source: PdfSource,
+    dpi: int = 200,
+    first_page: int = 1,
+    last_page: Optional[int] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Render PDF pages one at a time
+
+    Only the page being yielded is held in memory; the next page is rendered
+    when the caller asks for it.
+
+    Args:
+        source: PDF file path or PDF bytes
+        dpi: Rendering resolution
+        first_page, last_page: 1-based inclusive page range (default: all pages)
+
+    Yields:
+        (page_number, BGR image) with 1-based page numbers
+    """
+    with _open(source) as document:
+        last = document.page_count if last_page is None else min(last_page, document.page_count)
+        for page_number in range(max(1, first_page), last + 1):
+            yield page_number, render_page(document.load_page(page_number - 1), dpi)
+
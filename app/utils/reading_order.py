@@ -0,0 +1,146 @@
+"""Reading order and line/column grouping for recognised text boxes
+
+Box geometry is computed on the (N, 4, 2) box array at once. Boxes are
+grouped into lines (horizontal text) or columns (vertical text) along the
+cross axis: after sorting by start coordinate, a box joins the current
+group when it overlaps that group's own extent by at least `min_overlap`
+of its size, and opens a new group otherwise. Boxes far larger than the
+median across that axis (a title spanning several columns, a rule, a tall
+margin note) form groups of their own and never widen another group.
+Sorting dominates (grouping is one linear pass), so ordering is O(n log n).
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+TEXT_LAYOUTS = ("horizontal", "vertical_rl", "vertical_lr")
+
+# Fraction of a box's extent that must overlap the current group to join it
+DEFAULT_MIN_OVERLAP = 0.3
+
+# Boxes whose cross-axis extent exceeds this multiple of the median stand alone
+OVERSIZED_FACTOR = 2.5
+
+
+def cluster_intervals(lo: np.ndarray, hi: np.ndarray, min_overlap: float = DEFAULT_MIN_OVERLAP) -> np.ndarray:
+    """
+    Group 1-D intervals [lo, hi] that overlap enough
+
+    Each interval is tested against the extent of the group being built,
+    not against everything seen so far, and oversized intervals get a group
+    of their own, so one wide box cannot chain the groups after it together.
+
+    Returns:
+        Group id per interval; ids increase with the groups' start along the axis
+        (an oversized interval sorts before a group starting at the same place)
+    """
+    count = len(lo)
+    if count == 0:
+        return np.zeros((0,), dtype=np.int64)
+    extent = np.maximum(hi - lo, 1e-6)
+    if count >= 3:
+        oversized = extent > OVERSIZED_FACTOR * np.median(extent)
+    else:
+        oversized = np.zeros(count, dtype=bool)
+
+    regular = np.flatnonzero(~oversized)
+    order = regular[np.argsort(lo[regular], kind="stable")]
+    member_groups = np.empty(len(order), dtype=np.int64)
+    group_starts: List[float] = []
+    group_end = -np.inf
+    for position, (start, end, size) in enumerate(zip(
+        lo[order].tolist(), hi[order].tolist(), extent[order].tolist()
+    )):
+        if min(group_end, end) - start < min_overlap * size:
+            group_starts.append(start)
+            group_end = end
+        else:
+            group_end = max(group_end, end)
+        member_groups[position] = len(group_starts) - 1
+
+    # Number regular groups and standalone boxes together by where they start
+    standalone = np.flatnonzero(oversized)
+    starts = np.concatenate((np.asarray(group_starts, dtype=np.float64), lo[standalone].astype(np.float64)))
+    ties = np.concatenate((np.ones(len(group_starts)), np.zeros(len(standalone))))
+    rank = np.empty(len(starts), dtype=np.int64)
+    rank[np.lexsort((ties, starts))] = np.arange(len(starts))
+
+    groups = np.empty(count, dtype=np.int64)
+    groups[order] = rank[member_groups]
+    groups[standalone] = rank[len(group_starts):]
+    return groups
+
+
+def layout_order(
+    boxes: np.ndarray,
+    text_layout: str = "horizontal",
+    min_overlap: float = DEFAULT_MIN_OVERLAP
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reading order of boxes for a text layout
+
+    horizontal: lines top to bottom, left to right within a line.
+    vertical_rl: columns right to left, top to bottom within a column.
+    vertical_lr: columns left to right, top to bottom within a column.
+
+    Args:
+        boxes: (N, 4, 2) quadrilaterals
+
+    Returns:
+        (order, groups): indices in reading order, and the line/column
+        number (in reading order) of each box listed in `order`
+    """
+    if text_layout not in TEXT_LAYOUTS:
+        raise ValueError(f"Unknown text_layout: {text_layout}")
+    if len(boxes) == 0:
+        empty = np.zeros((0,), dtype=np.int64)
+        return empty, empty
+
+    mins = boxes.min(axis=1)
+    maxs = boxes.max(axis=1)
+    centers = (mins + maxs) / 2
+
+    if text_layout == "horizontal":
+        groups = cluster_intervals(mins[:, 1], maxs[:, 1], min_overlap)
+        order = np.lexsort((centers[:, 0], groups))
+    else:
+        if text_layout == "vertical_rl":
+            # Mirrored axis: groups are numbered from the right edge of the page
+            groups = cluster_intervals(-maxs[:, 0], -mins[:, 0], min_overlap)
+        else:
+            groups = cluster_intervals(mins[:, 0], maxs[:, 0], min_overlap)
+        order = np.lexsort((centers[:, 1], groups))
+
+    ordered_groups = groups[order]
+    # Renumber so groups count 0, 1, 2, ... in reading order
+    _, ordered_groups = np.unique(ordered_groups, return_inverse=True)
+    return order, ordered_groups.reshape(-1)
+
+
+def format_text(
+    texts: List[str],
+    boxes: np.ndarray,
+    text_layout: str = "horizontal",
+    output_format: str = "line_by_line"
+) -> str:
+    """
+    Join recognised texts in reading order
+
+    line_by_line: one box per line.
+    char_by_char: all text joined without separators.
+    column_by_column: one line per detected column (vertical layouts) or
+    text line (horizontal), the boxes in it joined without separators.
+    """
+    if not texts:
+        return ""
+    order, groups = layout_order(np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2), text_layout)
+    ordered = [texts[i] for i in order]
+
+    if output_format == "char_by_char":
+        return "".join(ordered)
+    if output_format == "column_by_column":
+        # Boundaries where the group number changes
+        breaks = np.flatnonzero(np.diff(groups)) + 1
+        bounds = np.concatenate(([0], breaks, [len(ordered)]))
+        return "\n".join("".join(ordered[start:end]) for start, end in zip(bounds[:-1], bounds[1:]))
+    return "\n".join(ordered)
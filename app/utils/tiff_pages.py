@@ -0,0 +1,223 @@
+"""TIFF frame reading with memory-mapped strips
+
+Archive volumes arrive as multi-page and very large uncompressed TIFFs. A
+minimal IFD parser walks the frames lazily; an uncompressed 8-bit frame is
+returned as an ndarray view over a memory map of the file (or over the
+upload bytes), so the frame is never copied into RAM and its pages are read
+from disk only when OCR touches them. Other frames (compressed, tiled,
+bilevel, palette, 16-bit, ...) fall back to Pillow, one frame at a time.
+"""
+import io
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional: without it only uncompressed 8-bit frames can be read
+    Image = None
+
+TiffSource = Union[str, bytes]
+
+TIFF_EXTENSIONS = (".tif", ".tiff")
+
+_IMAGE_WIDTH = 256
+_IMAGE_LENGTH = 257
+_BITS_PER_SAMPLE = 258
+_COMPRESSION = 259
+_PHOTOMETRIC = 262
+_STRIP_OFFSETS = 273
+_SAMPLES_PER_PIXEL = 277
+_ROWS_PER_STRIP = 278
+_STRIP_BYTE_COUNTS = 279
+_PLANAR_CONFIGURATION = 284
+_TILE_WIDTH = 322
+_SAMPLE_FORMAT = 339
+_TAGS = {
+    _IMAGE_WIDTH, _IMAGE_LENGTH, _BITS_PER_SAMPLE, _COMPRESSION, _PHOTOMETRIC, _STRIP_OFFSETS,
+    _SAMPLES_PER_PIXEL, _ROWS_PER_STRIP, _STRIP_BYTE_COUNTS, _PLANAR_CONFIGURATION, _TILE_WIDTH,
+    _SAMPLE_FORMAT,
+}
+
+# Integer field types: BYTE, SHORT, LONG, LONG8 (BigTIFF) and IFD offsets
+_TYPE_FORMATS = {1: "B", 3: "H", 4: "I", 13: "I", 16: "Q", 18: "Q"}
+
+_PHOTOMETRIC_MIN_IS_BLACK = 1
+_PHOTOMETRIC_RGB = 2
+
+
+class TiffFrame:
+    """Layout of one frame (IFD), as needed to read its pixels"""
+
+    def __init__(self, index: int, tags: Dict[int, Tuple[int, ...]]):
+        self.index = index
+        self.width = tags[_IMAGE_WIDTH][0]
+        self.height = tags[_IMAGE_LENGTH][0]
+        self.samples = tags.get(_SAMPLES_PER_PIXEL, (1,))[0]
+        self.bits = tags.get(_BITS_PER_SAMPLE, (1,))
+        self.compression = tags.get(_COMPRESSION, (1,))[0]
+        self.photometric = tags.get(_PHOTOMETRIC, (_PHOTOMETRIC_MIN_IS_BLACK,))[0]
+        self.planar = tags.get(_PLANAR_CONFIGURATION, (1,))[0]
+        self.sample_format = tags.get(_SAMPLE_FORMAT, (1,))[0]
+        self.rows_per_strip = min(tags.get(_ROWS_PER_STRIP, (self.height,))[0], self.height)
+        self.strip_offsets = np.asarray(tags.get(_STRIP_OFFSETS, ()), dtype=np.int64)
+        self.strip_byte_counts = np.asarray(tags.get(_STRIP_BYTE_COUNTS, ()), dtype=np.int64)
+        self.tiled = _TILE_WIDTH in tags
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.height * self.samples
+
+    @property
+    def mappable(self) -> bool:
+        """Uncompressed, 8 bits per sample, interleaved gray/RGB(A) strips: readable as a view"""
+        return (
+            self.compression == 1
+            and not self.tiled
+            and len(self.strip_offsets) > 0
+            and all(bits == 8 for bits in self.bits)
+            and self.sample_format == 1
+            and (self.planar == 1 or self.samples == 1)
+            and (
+                (self.photometric == _PHOTOMETRIC_MIN_IS_BLACK and self.samples in (1, 2))
+                or (self.photometric == _PHOTOMETRIC_RGB and self.samples in (3, 4))
+            )
+        )
+
+    @property
+    def contiguous(self) -> bool:
+        """Whether the strips follow each other in the file with no gaps"""
+        strip_bytes = self.rows_per_strip * self.width * self.samples
+        expected = self.strip_offsets[0] + strip_bytes * np.arange(len(self.strip_offsets))
+        return bool(np.array_equal(self.strip_offsets, expected))
+
+
+def is_tiff(source: TiffSource) -> bool:
+    """Whether the path has a TIFF extension, or the bytes start with a TIFF header"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:4]) in (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+")
+    return Path(source).suffix.lower() in TIFF_EXTENSIONS
+
+
+def _buffer(source: TiffSource) -> np.ndarray:
+    """The whole file as a uint8 array: a read-only memory map, or a view of the bytes"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return np.frombuffer(source, dtype=np.uint8)
+    return np.memmap(source, dtype=np.uint8, mode="r")
+
+
+def _iter_frames(buffer: np.ndarray) -> Iterator[TiffFrame]:
+    """Walk the IFD chain, parsing each frame only when it is reached"""
+    byte_order = bytes(buffer[:2])
+    if byte_order not in (b"II", b"MM"):
+        raise ValueError("Not a TIFF file")
+    endian = "<" if byte_order == b"II" else ">"
+    version = struct.unpack_from(endian + "H", buffer, 2)[0]
+    if version == 42:
+        big, offset = False, struct.unpack_from(endian + "I", buffer, 4)[0]
+    elif version == 43:
+        big, offset = True, struct.unpack_from(endian + "Q", buffer, 8)[0]
+    else:
+        raise ValueError(f"Unsupported TIFF version: {version}")
+
+    seen = set()
+    index = 0
+    while offset and offset not in seen:
+        seen.add(offset)
+        tags, offset = _read_ifd(buffer, offset, endian, big)
+        yield TiffFrame(index, tags)
+        index += 1
+
+
+def _read_ifd(buffer: np.ndarray, offset: int, endian: str, big: bool) -> Tuple[Dict[int, Tuple[int, ...]], int]:
+    """Read the tags of one IFD; returns (tags, offset of the next IFD)"""
+    count_format, header_size, entry_format, entry_size, offset_format, inline_size = (
+        ("Q", 8, "HHQ", 20, "Q", 8) if big else ("H", 2, "HHI", 12, "I", 4)
+    )
+    entries = struct.unpack_from(endian + count_format, buffer, offset)[0]
+    position = offset + header_size
+    tags = {}
+    for _ in range(entries):
+        tag, field_type, count = struct.unpack_from(endian + entry_format, buffer, position)
+        value_format = _TYPE_FORMATS.get(field_type)
+        if tag in _TAGS and value_format is not None:
+            value_position = position + entry_size - inline_size
+            if struct.calcsize(value_format) * count > inline_size:
+                value_position = struct.unpack_from(endian + offset_format, buffer, value_position)[0]
+            tags[tag] = struct.unpack_from(f"{endian}{count}{value_format}", buffer, value_position)
+        position += entry_size
+    next_offset = struct.unpack_from(endian + offset_format, buffer, position)[0]
+    return tags, next_offset
+
+
+def frame_count(source: TiffSource) -> int:
+    """Number of frames (walks the IFD chain, nothing is decoded)"""
+    return sum(1 for _ in _iter_frames(_buffer(source)))
+
+
+def _read_mapped(buffer: np.ndarray, frame: TiffFrame) -> np.ndarray:
+    """Frame pixels as a view of the buffer (strips with gaps are copied together)"""
+    if frame.contiguous:
+        start = int(frame.strip_offsets[0])
+        if start + frame.nbytes > len(buffer):
+            raise ValueError(f"TIFF frame {frame.index + 1} is truncated")
+        pixels = buffer[start:start + frame.nbytes]
+    else:
+        pixels = np.concatenate([
+            buffer[int(offset):int(offset) + int(count)]
+            for offset, count in zip(frame.strip_offsets, frame.strip_byte_counts)
+        ])[:frame.nbytes]
+    if frame.samples == 1:
+        return pixels.reshape(frame.height, frame.width)
+    pixels = pixels.reshape(frame.height, frame.width, frame.samples)
+    if frame.photometric == _PHOTOMETRIC_RGB:
+        # RGB(A) -> BGR without copying: reversed channel view, alpha dropped
+        return pixels[:, :, 2::-1]
+    # Gray + alpha: keep the gray channel
+    return pixels[:, :, 0]
+
+
+def _read_with_pillow(source: TiffSource, index: int) -> np.ndarray:
+    if Image is None:
+        raise RuntimeError("Reading compressed TIFF frames requires Pillow")
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+    with Image.open(stream) as image:
+        image.seek(index)
+        rgb = np.asarray(image.convert("RGB"))
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+
+def iter_tiff_frames(
+    source: TiffSource,
+    first_frame: int = 1,
+    last_frame: Optional[int] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Read TIFF frames one at a time
+
+    Uncompressed 8-bit frames are views of a memory map of the file (or of
+    the bytes): nothing is copied, and the views stay valid after the
+    iterator moves on. Other frames are decoded with Pillow.
+
+    Args:
+        source: TIFF file path or TIFF bytes
+        first_frame, last_frame: 1-based inclusive frame range (default: all frames)
+
+    Yields:
+        (frame_number, image) with 1-based frame numbers; images are
+        grayscale (H, W) or BGR (H, W, 3)
+    """
+    buffer = _buffer(source)
+    for frame in _iter_frames(buffer):
+        if frame.index + 1 < first_frame:
+            continue
+        if last_frame is not None and frame.index + 1 > last_frame:
+            return
+        if frame.mappable:
+            yield frame.index + 1, _read_mapped(buffer, frame)
+        else:
+            yield frame.index + 1, _read_with_pillow(source, frame.index)
+
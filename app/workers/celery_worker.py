@@ -1,18 +1,23 @@
 """Celery Worker for OCR Processing"""
 from celery import Celery, shared_task
+from celery.signals import worker_process_init
 from celery.exceptions import SoftTimeLimitExceeded
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 import logging
+import threading
 import traceback
 from pathlib import Path
 import uuid
 from datetime import datetime
 import sys
 
+import numpy as np
+
 from app.config import settings
 from app.database.session import get_db
 from app.database.repositories import BatchTaskRepository, OcrResultRepository, BookRepository
 from app.ocr_service import ocr_service, OcrOptions
+from app.utils.document_pages import iter_file_pages, page_count
 
 # 配置日志输出到文件
 logging.basicConfig(
@@ -47,6 +52,19 @@ celery_app.conf.update(
 )
 
 
+@worker_process_init.connect
+def warmup_ocr_engines(**kwargs):
+    """Preload and warm up OCR engines in each worker child process
+
+    Runs in a background thread: worker_process_init must return within
+    worker_proc_alive_timeout (seconds), far less than a model load. Tasks
+    that arrive before warmup finishes wait for the engine like before.
+    Only the active backend is warmed: with OCR_BACKEND=process the engines
+    live in the pool's worker processes, not in this one.
+    """
+    threading.Thread(target=ocr_service.start_backend, name="ocr-warmup", daemon=True).start()
+
+
 @shared_task(bind=True, name="app.process_batch_scan", max_retries=settings.TASK_MAX_RETRIES)
 def process_batch_scan_task(
     self,
@@ -59,7 +77,8 @@ def process_batch_scan_task(
     output_format: str = "line_by_line",
     recursive: bool = True,
     file_patterns: List[str] = None,
-    priority: int = 5
+    priority: int = 5,
+    ocr_options: Dict[str, Any] = None
 ) -> Dict[str, Any]:
     """
     Process batch scan task - Main Celery task
@@ -75,6 +94,7 @@ def process_batch_scan_task(
         recursive: Recursive directory scan
         file_patterns: File patterns to match
         priority: Task priority
+        ocr_options: Extra OcrOptions fields (e.g. max_side_len, source_dpi, target_dpi)
 
     Returns:
         Task result dictionary
@@ -92,71 +112,34 @@ def process_batch_scan_task(
         task_repo.update_status(task_id, "processing", celery_task_id=self.request.id)
         logger.info(f"Processing batch scan task: {task_id}")
 
-        # Scan directory for files
+        # Scan directory for files; every PDF page / TIFF frame counts as a file of its own
         files = scan_directory(directory, recursive, file_patterns)
-        task_repo.update_total_files(task_id, len(files))
+        total_pages = count_pages(files)
+        task_repo.update_total_files(task_id, total_pages)
+
+        # Create OCR options; page orientation is memoised per task
+        options = OcrOptions(
+            lang=lang,
+            use_angle_cls=use_angle_cls,
+            return_details=True,
+            text_layout=text_layout,
+            output_format=output_format,
+            **{"orientation_scope": task_id, **(ocr_options or {})}
+        )
 
-        # Process files
+        # Process files; PDF pages are rendered, TIFF frames memory-mapped, one at a time
         results = []
         for file_path in files:
             try:
-                # Create OCR options
-                options = OcrOptions(
-                    lang=lang,
-                    use_angle_cls=use_angle_cls,
-                    return_details=True,
-                    text_layout=text_layout,
-                    output_format=output_format
-                )
-
-                # Execute OCR
-                ocr_result = ocr_service.recognize(file_path, options)
-
-                # Extract metadata from filename
-                file_name = Path(file_path).name
-                from app.batch_scan_service import FileNameParser
-                volume, page_num = FileNameParser.parse(file_name)
-
-                # Prepare JSON data with box coordinates
-                json_data = None
-                if ocr_result.get("details"):
-                    json_data = [
-                        {
-                            "text": item.text,
-                            "confidence": float(item.confidence) if item.confidence else 0.0,
-                            "box": item.box
-                        }
-                        for item in ocr_result["details"]
-                    ]
-
-                # Save to database
-                page_id = str(uuid.uuid4())
-                ocr_repo.create(
-                    page_id=page_id,
-                    task_id=task_id,
-                    book_id=book_id,
-                    file_name=file_name,
-                    page_number=page_num,
-                    volume=volume,
-                    raw_text=ocr_result.get("text", ""),
-                    json_data=json_data,
-                    confidence=ocr_result.get("confidence", 0.0),
-                    success=ocr_result.get("success", False),
-                    processing_time=ocr_result.get("processing_time", 0.0)
-                )
-
-                results.append({
-                    "file_path": file_path,
-                    "page_id": page_id,
-                    "success": ocr_result.get("success", False)
-                })
-
-                # Update progress
-                progress = (len(results) / len(files)) * 100
-                task_repo.update_progress(task_id, progress, len(results))
+                for file_page, image in iter_file_pages(file_path, settings.PDF_RENDER_DPI):
+                    results.append(process_page(task_id, book_id, file_path, file_page, image, options, ocr_repo))
 
+                    # Update progress
+                    progress = (len(results) / max(total_pages, 1)) * 100
+                    task_repo.update_progress(task_id, progress, len(results))
             except Exception as e:
-                logger.error(f"Failed to process file {file_path}: {e}")
+                # The PDF / TIFF could not be opened or read
+                logger.error(f"Failed to read file {file_path}: {e}")
                 results.append({
                     "file_path": file_path,
                     "success": False,
@@ -166,6 +149,8 @@ def process_batch_scan_task(
         # Mark task as completed
         success_count = sum(1 for r in results if r.get("success"))
         failed_count = len(results) - success_count
+        # Lines re-read at full resolution in two-pass mode
+        refined_count = sum(r.get("refined_lines", 0) for r in results)
 
         task_repo.complete_task(
             task_id=task_id,
@@ -174,14 +159,16 @@ def process_batch_scan_task(
             failed_files=failed_count
         )
 
-        logger.info(f"Batch scan task {task_id} completed: {success_count} success, {failed_count} failed")
+        logger.info(f"Batch scan task {task_id} completed: {success_count} success, {failed_count} failed, "
+                    f"{refined_count} lines refined")
 
         return {
             "task_id": task_id,
             "status": "completed",
             "total_files": len(files),
             "success_files": success_count,
-            "failed_files": failed_count
+            "failed_files": failed_count,
+            "refined_lines": refined_count
         }
 
     except SoftTimeLimitExceeded:
@@ -210,11 +197,94 @@ def process_batch_scan_task(
         db.close()
 
 
+def process_page(
+    task_id: str,
+    book_id: str,
+    file_path: str,
+    file_page: Optional[int],
+    image: Union[str, np.ndarray],
+    options: OcrOptions,
+    ocr_repo: OcrResultRepository
+) -> Dict[str, Any]:
+    """
+    Recognise one page and store it as an OcrResult
+
+    Args:
+        file_page: 1-based page number within a PDF or multi-page TIFF, or None for single-page files
+        image: Image file path, the rendered PDF page or the TIFF frame
+    """
+    # Sampled / slow pages are profiled as a whole, including the database writes
+    with ocr_service.profile("batch_page") as profile:
+        if profile is not None:
+            profile.annotate({"task_id": task_id, "file_path": file_path, "file_page": file_page})
+        try:
+            # Execute OCR
+            ocr_result = ocr_service.recognize(image, options)
+
+            # Extract metadata from filename; PDF / TIFF pages are numbered by their position in the file
+            file_name = Path(file_path).name
+            from app.batch_scan_service import FileNameParser
+            volume, page_num = FileNameParser.parse(file_name)
+            if file_page is not None:
+                page_num = file_page
+
+            # Prepare JSON data with box coordinates (built straight from the result arrays)
+            json_data = None
+            if ocr_result.get("details"):
+                json_data = ocr_result["details"].to_dicts()
+
+            # Save to database
+            page_id = str(uuid.uuid4())
+            ocr_repo.create(
+                page_id=page_id,
+                task_id=task_id,
+                book_id=book_id,
+                file_name=file_name,
+                page_number=page_num,
+                volume=volume,
+                raw_text=ocr_result.get("text", ""),
+                json_data=json_data,
+                confidence=ocr_result.get("confidence", 0.0),
+                success=ocr_result.get("success", False),
+                processing_time=ocr_result.get("processing_time", 0.0)
+            )
+
+            return {
+                "file_path": file_path,
+                "file_page": file_page,
+                "page_id": page_id,
+                "success": ocr_result.get("success", False),
+                "refined_lines": ocr_result.get("refined_lines", 0)
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to process file {file_path} (page {file_page}): {e}")
+            return {
+                "file_path": file_path,
+                "file_page": file_page,
+                "success": False,
+                "error": str(e)
+            }
+
+
+def count_pages(files: List[str]) -> int:
+    """Pages to process: one per image file, every page of each PDF / multi-page TIFF"""
+    total = 0
+    for file_path in files:
+        try:
+            total += page_count(file_path)
+        except Exception as e:
+            # Counted as one page; the error is reported when the file is processed
+            logger.warning(f"Failed to count pages of {file_path}: {e}")
+            total += 1
+    return total
+
+
 def scan_directory(directory: str, recursive: bool = True, patterns: List[str] = None) -> List[str]:
     """Scan directory for matching files"""
     if patterns is None:
-        patterns = ["*.jpg", "*.jpeg", "*.png", "*.bmp", "*.pdf",
-                   "*.JPG", "*.JPEG", "*.PNG", "*.BMP", "*.PDF"]
+        patterns = ["*.jpg", "*.jpeg", "*.png", "*.bmp", "*.pdf", "*.tif", "*.tiff",
+                   "*.JPG", "*.JPEG", "*.PNG", "*.BMP", "*.PDF", "*.TIF", "*.TIFF"]
 
     dir_path = Path(directory)
     if not dir_path.exists():
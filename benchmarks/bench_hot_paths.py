@@ -0,0 +1,271 @@
+"""Benchmark: OCR service hot paths, run against a fake engine
+
+Runs offline and without a GPU: `benchmarks.fake_engine` stands in for
+PaddleOCR, so only the service's own code is measured.
+
+Suites:
+    parse      `_parse_ocr_result`, and the whole `recognize()` call, for the
+               PaddleOCR 2.x list and 3.x dict result formats
+    layout     `format_text` (reading order + text assembly) for every
+               text_layout x output_format combination
+    filename   `FileNameParser.parse` over typical scan file names
+    serialize  API response serialisation (`_result_to_json` + OcrJSONResponse),
+               with and without box rounding, against the previous
+               `to_dicts()` + stdlib JSONResponse path; rows also carry the
+               payload size in bytes
+
+Results are written as JSON (`--output`); pass an earlier file as
+`--compare` to flag cases whose median got slower than `--tolerance`.
+
+Usage:
+    python -m benchmarks.bench_hot_paths [--suite parse layout filename serialize]
+        [--boxes 10 100 1000 5000] [--repeat 20] [--output results.json]
+        [--compare baseline.json] [--tolerance 0.2]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import fake_engine
+
+# The engine must be faked, and the result cache off, before the service is imported
+fake_engine.install()
+os.environ["OCR_RESULT_CACHE_SIZE"] = "0"
+os.environ["OCR_RESULT_CACHE_DIR"] = ""
+os.environ["OCR_PROFILE_SAMPLE_RATE"] = "0"
+os.environ["OCR_PROFILE_SLOW_MS"] = "0"
+
+import numpy as np  # noqa: E402
+
+from app.ocr_service import ocr_service, _parse_ocr_result  # noqa: E402
+from app.schemas import OcrOptions  # noqa: E402
+from app.utils.ocr_lines import OcrLines  # noqa: E402
+from app.utils.reading_order import TEXT_LAYOUTS, format_text  # noqa: E402
+
+SUITES = ("parse", "layout", "filename", "serialize")
+OUTPUT_FORMATS = ("line_by_line", "char_by_char", "column_by_column")
+DEFAULT_BOXES = [10, 100, 1000, 5000]
+
+FILE_NAMES = [
+    "卷一_001.jpg", "卷12-045.png", "volume3_page017.jpg", "v2-p005.jpeg",
+    "李氏族谱_卷三_第102页.jpg", "0042.jpg", "page-007.png", "扫描件_218.bmp",
+    "IMG_20240101_120000.jpg", "封面.jpg",
+]
+
+
+def time_call(fn: Callable[[], Any], repeat: int, min_time: float = 0.02) -> Dict[str, float]:
+    """
+    Per-call wall time in microseconds
+
+    Fast calls are looped so each of the `repeat` measurements lasts at
+    least `min_time` seconds; the median is the number to compare.
+    """
+    fn()  # warm up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    samples_us = np.asarray(samples) * 1e6
+    return {
+        "median_us": round(float(np.median(samples_us)), 3),
+        "p95_us": round(float(np.percentile(samples_us, 95)), 3),
+        "min_us": round(float(samples_us.min()), 3),
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def _row(suite: str, case: str, params: Dict[str, Any], stats: Dict[str, float]) -> Dict[str, Any]:
+    return {"suite": suite, "case": case, "params": params, **stats}
+
+
+def bench_parse(boxes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    image = np.full((64, 64, 3), 255, dtype=np.uint8)
+    options = OcrOptions(return_details=True)
+    for result_format in fake_engine.RESULT_FORMATS:
+        for count in boxes:
+            raw = fake_engine.make_raw_result(count, result_format)
+            params = {"format": result_format, "boxes": count}
+            rows.append(_row("parse", f"parse_result/{result_format}/{count}", params,
+                             time_call(lambda: _parse_ocr_result(raw), repeat)))
+
+            fake_engine.configure(lines=count, result_format=result_format)
+            rows.append(_row("parse", f"recognize/{result_format}/{count}", params,
+                             time_call(lambda: ocr_service.recognize(image, options), repeat)))
+    return rows
+
+
+def bench_layout(boxes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    for count in boxes:
+        texts, box_array, _scores = fake_engine.make_lines(count)
+        for text_layout in TEXT_LAYOUTS:
+            for output_format in OUTPUT_FORMATS:
+                stats = time_call(lambda: format_text(texts, box_array, text_layout, output_format), repeat)
+                rows.append(_row(
+                    "layout", f"format_text/{text_layout}/{output_format}/{count}",
+                    {"text_layout": text_layout, "output_format": output_format, "boxes": count}, stats
+                ))
+    return rows
+
+
+def bench_filename(repeat: int) -> List[Dict[str, Any]]:
+    from app.batch_scan_service import FileNameParser
+
+    def parse_all():
+        for name in FILE_NAMES:
+            FileNameParser.parse(name)
+
+    stats = time_call(parse_all, repeat)
+    # Report per file name
+    for key in ("median_us", "p95_us", "min_us"):
+        stats[key] = round(stats[key] / len(FILE_NAMES), 3)
+    return [_row("filename", "FileNameParser.parse", {"names": len(FILE_NAMES)}, stats)]
+
+
+def bench_serialize(boxes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    from fastapi.responses import JSONResponse
+
+    from app.main import OcrJSONResponse, _result_to_json
+    from app.utils import response_json
+
+    encoder = "orjson" if response_json.orjson is not None else "json"
+    exact, rounded = OcrOptions(round_boxes=False), OcrOptions(round_boxes=True)
+    rows = []
+    for count in boxes:
+        lines = OcrLines(*fake_engine.make_lines(count))
+        text = "\n".join(lines.texts)
+
+        def make_result():
+            return {"success": True, "text": text, "details": lines, "processing_time": 0.1, "error": None}
+
+        def serialize(options: OcrOptions) -> bytes:
+            return OcrJSONResponse(content=_result_to_json(make_result(), options)).body
+
+        def serialize_stdlib() -> bytes:
+            result = make_result()
+            result["details"] = lines.to_dicts()
+            return JSONResponse(content=result).body
+
+        cases = (
+            ("response", lambda: serialize(exact), {"encoder": encoder}),
+            ("response_int", lambda: serialize(rounded), {"encoder": encoder, "round_boxes": True}),
+            ("stdlib", serialize_stdlib, {"encoder": "json"}),
+        )
+        for name, fn, params in cases:
+            stats = time_call(fn, repeat)
+            stats["payload_bytes"] = len(fn())
+            rows.append(_row("serialize", f"{name}/{count}", {"boxes": count, **params}, stats))
+    return rows
+
+
+def run(suites: List[str], boxes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    if "parse" in suites:
+        rows += bench_parse(boxes, repeat)
+    if "layout" in suites:
+        rows += bench_layout(boxes, repeat)
+    if "filename" in suites:
+        rows += bench_filename(repeat)
+    if "serialize" in suites:
+        rows += bench_serialize(boxes, repeat)
+    return rows
+
+
+def environment() -> Dict[str, Any]:
+    """Where the numbers came from, so runs from different releases can be told apart"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(rows: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Cases whose median is more than `tolerance` slower than in the baseline"""
+    previous = {row["case"]: row for row in baseline.get("results", [])}
+    regressions = []
+    for row in rows:
+        old = previous.get(row["case"])
+        if not old or not old.get("median_us"):
+            continue
+        ratio = row["median_us"] / old["median_us"]
+        if ratio > 1 + tolerance:
+            regressions.append({
+                "case": row["case"],
+                "baseline_us": old["median_us"],
+                "median_us": row["median_us"],
+                "ratio": round(ratio, 2),
+            })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--boxes", type=int, nargs="+", default=DEFAULT_BOXES)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown against the baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    # Per-request INFO logs would dominate the measured time
+    logging.disable(logging.INFO)
+
+    rows = run(args.suite, args.boxes, max(1, args.repeat))
+    report = {"environment": environment(), "results": rows}
+
+    print(f"{'case':<48} {'median us':>12} {'p95 us':>12} {'min us':>12} {'bytes':>10}")
+    for row in rows:
+        print(f"{row['case']:<48} {row['median_us']:>12} {row['p95_us']:>12} {row['min_us']:>12} "
+              f"{row.get('payload_bytes', ''):>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(rows, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}:")
+            for item in regressions:
+                print(f"  {item['case']}: {item['baseline_us']} -> {item['median_us']} us (x{item['ratio']})")
+            return 1
+        print(f"\nNo regressions over {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
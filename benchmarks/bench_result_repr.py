@@ -0,0 +1,106 @@
+"""Benchmark: per-page cost of the OCR result representation
+
+Compares the old per-line object path (TextBox model per line, `.dict()`
+for the API response, another list of dicts for `json_data`) with the
+array-backed OcrLines that materialises dicts only at the boundary.
+
+Usage:
+    python -m benchmarks.bench_result_repr [--lines 50 500 2000] [--repeat 50] [--json]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from app.schemas import TextBox
+from app.utils.ocr_lines import OcrLines
+
+
+def make_page(lines: int, seed: int = 0) -> OcrLines:
+    """Synthetic page: `lines` lines of 12 CJK characters with random boxes"""
+    rng = np.random.default_rng(seed)
+    origins = rng.uniform(0, 4000, size=(lines, 1, 2))
+    sizes = rng.uniform([200, 30], [800, 60], size=(lines, 1, 2))
+    corners = np.asarray([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float64)
+    boxes = (origins + corners * sizes).astype(np.float32)
+    scores = rng.uniform(0.5, 1.0, size=lines)
+    texts = ["".join(chr(0x4E00 + int(c)) for c in rng.integers(0, 20000, 12)) for _ in range(lines)]
+    return OcrLines(texts, boxes, scores)
+
+
+def legacy_path(page: OcrLines) -> Any:
+    """Old flow: TextBox per line in recognize(), .dict() in main.py, dicts again for json_data"""
+    details = [
+        TextBox(text=text, confidence=float(score), box=box)
+        for text, score, box in zip(page.texts, page.scores.tolist(), page.boxes.tolist())
+    ]
+    response = [detail.model_dump() for detail in details]
+    json_data = [
+        {"text": item.text, "confidence": float(item.confidence), "box": item.box}
+        for item in details
+    ]
+    return details, response, json_data
+
+
+def compact_path(page: OcrLines) -> Any:
+    """New flow: arrays until the boundary, one dict list for the response and one for json_data"""
+    return page, page.to_dicts(), page.to_dicts()
+
+
+def measure(fn: Callable[[OcrLines], Any], page: OcrLines, repeat: int) -> Dict[str, float]:
+    """Median wall time (ms) and peak traced allocation (KiB) of one call"""
+    fn(page)  # warm caches (pydantic validators, allocator)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = fn(page)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"ms": round(float(np.median(timings)) * 1000, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def run(line_counts: List[int], repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    for lines in line_counts:
+        page = make_page(lines)
+        legacy = measure(legacy_path, page, repeat)
+        compact = measure(compact_path, page, repeat)
+        rows.append({
+            "lines": lines,
+            "legacy_ms": legacy["ms"],
+            "compact_ms": compact["ms"],
+            "speedup": round(legacy["ms"] / compact["ms"], 2) if compact["ms"] else None,
+            "legacy_peak_kib": legacy["peak_kib"],
+            "compact_peak_kib": compact["peak_kib"],
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.lines, args.repeat)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'lines':>6} {'legacy ms':>10} {'compact ms':>11} {'speedup':>8} "
+          f"{'legacy KiB':>11} {'compact KiB':>12}")
+    for row in rows:
+        print(f"{row['lines']:>6} {row['legacy_ms']:>10} {row['compact_ms']:>11} {row['speedup']:>8} "
+              f"{row['legacy_peak_kib']:>11} {row['compact_peak_kib']:>12}")
+
+
+if __name__ == "__main__":
+    main()
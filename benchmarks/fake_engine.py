@@ -0,0 +1,106 @@
+"""Deterministic stand-in for `PaddleOCR`, so benchmarks run offline and without a GPU
+
+`install()` registers a fake `paddleocr` module; call it before
+`app.ocr_service` is imported. The fake returns a fixed, seeded set of
+lines for every image and can inject latency per call to model the real
+engine's service time.
+"""
+import sys
+import time
+import types
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+RESULT_FORMATS = ("list", "dict")
+
+
+def make_lines(count: int, seed: int = 0) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """`count` lines of 8 CJK characters laid out in vertical columns, right to left"""
+    rng = np.random.default_rng(seed)
+    columns = max(1, int(np.ceil(np.sqrt(count))))
+    texts = ["".join(chr(0x4E00 + int(c)) for c in rng.integers(0, 20000, 8)) for _ in range(count)]
+    index = np.arange(count)
+    x = 4000.0 - (index // columns) * 60.0 + rng.uniform(-3, 3, count)
+    y = (index % columns) * 320.0 + rng.uniform(-3, 3, count)
+    corners = np.asarray([[0, 0], [40, 0], [40, 300], [0, 300]], dtype=np.float64)
+    boxes = (np.stack([x, y], axis=1)[:, None, :] + corners).astype(np.float32)
+    scores = rng.uniform(0.6, 1.0, count)
+    return texts, boxes, scores
+
+
+@lru_cache(maxsize=16)
+def make_raw_result(count: int, result_format: str = "list", seed: int = 0) -> Any:
+    """A PaddleOCR `ocr()` return value: 2.x list format or 3.x dict format"""
+    texts, boxes, scores = make_lines(count, seed)
+    if result_format == "dict":
+        return [{
+            "rec_texts": texts,
+            "rec_scores": scores.tolist(),
+            "rec_polys": [box for box in boxes.astype(np.int16)],
+        }]
+    if result_format == "list":
+        return [[
+            [box.tolist(), (text, float(score))]
+            for text, box, score in zip(texts, boxes, scores)
+        ]]
+    raise ValueError(f"Unknown result format: {result_format}")
+
+
+class FakePaddleOCR:
+    """
+    Engine returning the same lines for every image
+
+    Configure with `configure()`; changes apply to engines already created:
+    `lines`, `result_format`, `latency` (seconds slept per `ocr()` call) and
+    `load_time` (seconds slept in the constructor). Results are shared
+    between calls and must not be modified.
+    """
+
+    lines = 100
+    result_format = "list"
+    latency = 0.0
+    load_time = 0.0
+
+    def __init__(self, use_angle_cls: bool = True, lang: str = "ch", **kwargs: Any):
+        if self.load_time:
+            time.sleep(self.load_time)
+        self.use_angle_cls = use_angle_cls
+        self.lang = lang
+
+    def ocr(self, img: Any, det: bool = True, rec: bool = True, cls: bool = True) -> Any:
+        if self.latency:
+            time.sleep(self.latency)
+        return make_raw_result(self.lines, self.result_format)
+
+
+def configure(lines: Optional[int] = None, result_format: Optional[str] = None,
+              latency: Optional[float] = None, load_time: Optional[float] = None) -> None:
+    """Change what the fake engines return and how long they take"""
+    if lines is not None:
+        FakePaddleOCR.lines = lines
+    if result_format is not None:
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"Unknown result format: {result_format}")
+        FakePaddleOCR.result_format = result_format
+    if latency is not None:
+        FakePaddleOCR.latency = latency
+    if load_time is not None:
+        FakePaddleOCR.load_time = load_time
+
+
+def install() -> None:
+    """
+    Make `import paddleocr` return the fake
+
+    Raises:
+        RuntimeError: if app.ocr_service was already imported with another engine
+    """
+    if "app.ocr_service" in sys.modules and not getattr(sys.modules.get("paddleocr"), "__fake__", False):
+        raise RuntimeError("fake_engine.install() must run before app.ocr_service is imported")
+    module = types.ModuleType("paddleocr")
+    module.PaddleOCR = FakePaddleOCR
+    module.__version__ = "fake"
+    module.__fake__ = True
+    sys.modules["paddleocr"] = module
@@ -0,0 +1,315 @@
+"""Load test: drive the API endpoints with async httpx and report throughput and latency
+
+By default the FastAPI app runs in this process (httpx ASGI transport) with
+the fake engine from `benchmarks.fake_engine`, which sleeps `--latency`
+seconds per image to model inference; `--engine real` loads PaddleOCR
+instead, and `--base-url` targets a running server.
+
+Modes:
+    closed  `--concurrency` clients each send the next request as soon as the
+            previous one returns (throughput at a fixed number of users)
+    open    requests arrive at `--rate` per second whether or not earlier ones
+            have finished (latency at a fixed offered load); latency is
+            measured from the scheduled arrival, so queueing is not hidden
+
+For the in-process app an event-loop lag probe runs alongside the load: a
+task that sleeps 10 ms and records how late it wakes up. Lag that grows with
+load means an endpoint is blocking the event loop. The batch status
+endpoints read the database synchronously; with the fake engine they are
+served from a stub that blocks for `--db-latency` seconds, so that cost
+shows up without a database.
+
+Usage:
+    python -m benchmarks.load_test --endpoint recognize --mode closed --concurrency 8 --duration 10
+    python -m benchmarks.load_test --endpoint recognize batch-status --mode open --rate 20 --latency 0.2
+    python -m benchmarks.load_test --engine real --image page.jpg --mode closed --concurrency 4
+    python -m benchmarks.load_test --base-url http://localhost:8000 --mode open --rate 5 --output load.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+ENDPOINTS = ("recognize", "recognize-batch", "batch-status", "batch-tasks")
+
+STUB_TASK_ID = "load-test-task"
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """Latency percentiles in milliseconds"""
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(max(latencies) if latencies else None),
+    }
+
+
+def make_image(path: Optional[str], width: int, height: int) -> bytes:
+    """Image bytes to upload: the given file, or a synthetic JPEG page"""
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    import cv2
+    from app.services.warmup import make_warmup_image
+
+    page = cv2.resize(make_warmup_image(), (width, height))
+    return cv2.imencode(".jpg", page, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def setup_app(args: argparse.Namespace):
+    """Import the app configured for the run (fake or real engine) and warm it up"""
+    if args.engine == "fake":
+        from benchmarks import fake_engine
+
+        fake_engine.install()
+        fake_engine.configure(lines=args.lines, latency=args.latency)
+    if not args.cache:
+        os.environ["OCR_RESULT_CACHE_SIZE"] = "0"
+        os.environ["OCR_RESULT_CACHE_DIR"] = ""
+
+    from app.main import app
+    from app.ocr_service import ocr_service
+
+    if args.engine == "fake":
+        stub_batch_service(args.db_latency)
+    ocr_service.start_backend()
+    return app, ocr_service
+
+
+def stub_batch_service(db_latency: float) -> None:
+    """Serve task status/list from memory, blocking like a synchronous database query"""
+    from app.batch_scan_service import batch_scan_service
+
+    task = {
+        "task_id": STUB_TASK_ID, "book_id": "load-test", "status": "processing", "progress": 50.0,
+        "total_files": 200, "processed_files": 100, "success_files": 99, "failed_files": 1,
+        "created_at": None, "started_at": None, "completed_at": None, "error": None, "recent_pages": [],
+    }
+
+    def get_task_status(task_id: str) -> Optional[Dict[str, Any]]:
+        time.sleep(db_latency)
+        return dict(task, task_id=task_id)
+
+    def list_tasks(book_id: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        time.sleep(db_latency)
+        return [dict(task, task_id=f"{STUB_TASK_ID}-{i}") for i in range(min(limit, 20))]
+
+    batch_scan_service.get_task_status = get_task_status
+    batch_scan_service.list_tasks = list_tasks
+
+
+class LoadTest:
+    def __init__(self, client, args: argparse.Namespace, image: bytes):
+        self.client = client
+        self.args = args
+        self.image = image
+        self.rng = random.Random(args.seed)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.loop_lag: List[float] = []
+
+    async def request(self, endpoint: str):
+        """Send one request and return the response"""
+        args = self.args
+        if endpoint == "recognize":
+            return await self.client.post(
+                "/api/ocr/recognize", files={"file": ("page.jpg", self.image, "image/jpeg")},
+                data={"text_layout": args.text_layout}
+            )
+        if endpoint == "recognize-batch":
+            files = [("files", (f"page{i}.jpg", self.image, "image/jpeg")) for i in range(args.batch_size)]
+            return await self.client.post(
+                "/api/ocr/recognize-batch", files=files, data={"text_layout": args.text_layout}
+            )
+        if endpoint == "batch-status":
+            return await self.client.get(f"/api/ocr/batch/status/{args.task_id}")
+        return await self.client.get("/api/ocr/batch/tasks")
+
+    async def timed(self, endpoint: str, start: float) -> None:
+        """Send a request and record its latency from `start` (perf_counter time)"""
+        try:
+            response = await self.request(endpoint)
+            status = str(response.status_code)
+        except Exception as e:
+            status = type(e).__name__
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        self.statuses[endpoint][status] += 1
+
+    def pick(self) -> str:
+        return self.rng.choice(self.args.endpoint)
+
+    async def closed_loop(self, deadline: float) -> None:
+        async def user():
+            while time.perf_counter() < deadline:
+                await self.timed(self.pick(), time.perf_counter())
+
+        await asyncio.gather(*(user() for _ in range(self.args.concurrency)))
+
+    async def open_loop(self, deadline: float) -> None:
+        interval = 1.0 / self.args.rate
+        tasks = []
+        next_arrival = time.perf_counter()
+        while next_arrival < deadline:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(self.timed(self.pick(), next_arrival)))
+            gap = self.rng.expovariate(self.args.rate) if self.args.poisson else interval
+            next_arrival += gap
+        await asyncio.gather(*tasks)
+
+    async def probe_loop_lag(self, stop: asyncio.Event, period: float = 0.01) -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(period)
+            self.loop_lag.append(max(0.0, time.perf_counter() - start - period))
+
+    async def run(self, probe_lag: bool) -> Dict[str, Any]:
+        stop = asyncio.Event()
+        probe = asyncio.ensure_future(self.probe_loop_lag(stop)) if probe_lag else None
+        start = time.perf_counter()
+        deadline = start + self.args.duration
+        if self.args.mode == "closed":
+            await self.closed_loop(deadline)
+        else:
+            await self.open_loop(deadline)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        if probe is not None:
+            await probe
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        per_endpoint = {}
+        all_latencies: List[float] = []
+        totals: Counter = Counter()
+        for endpoint, latencies in self.latencies.items():
+            statuses = self.statuses[endpoint]
+            per_endpoint[endpoint] = self._stats(latencies, statuses, elapsed)
+            all_latencies += latencies
+            totals.update(statuses)
+        report = {
+            "mode": self.args.mode,
+            "duration_s": round(elapsed, 3),
+            "offered_rate": self.args.rate if self.args.mode == "open" else None,
+            "concurrency": self.args.concurrency if self.args.mode == "closed" else None,
+            **self._stats(all_latencies, totals, elapsed),
+            "endpoints": per_endpoint,
+        }
+        if self.loop_lag:
+            report["event_loop_lag"] = summarize(self.loop_lag)
+        return report
+
+    @staticmethod
+    def _stats(latencies: List[float], statuses: Counter, elapsed: float) -> Dict[str, Any]:
+        completed = len(latencies)
+        ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+        rejected = statuses.get("429", 0)
+        return {
+            "requests": completed,
+            "throughput_rps": round(ok / elapsed, 2) if elapsed else None,
+            "error_rate": round((completed - ok) / completed, 4) if completed else None,
+            "rejected_429": rejected,
+            "statuses": dict(statuses),
+            **summarize(latencies),
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    load = f"rate {report['offered_rate']}/s" if report["mode"] == "open" else f"concurrency {report['concurrency']}"
+    print(f"{report['mode']}-loop, {load}, {report['duration_s']}s")
+    header = f"{'endpoint':<16} {'requests':>8} {'ok/s':>8} {'errors':>7} {'429':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    rows = [("all", report)] + sorted(report["endpoints"].items())
+    for name, stats in rows:
+        error_rate = f"{stats['error_rate']:.1%}" if stats["error_rate"] is not None else "-"
+        print(f"{name:<16} {stats['requests']:>8} {stats['throughput_rps']:>8} {error_rate:>7} "
+              f"{stats['rejected_429']:>5} {stats['p50_ms']!s:>9} {stats['p95_ms']!s:>9} "
+              f"{stats['p99_ms']!s:>9} {stats['max_ms']!s:>9}")
+    lag = report.get("event_loop_lag")
+    if lag:
+        print(f"event loop lag: p50 {lag['p50_ms']} ms, p99 {lag['p99_ms']} ms, max {lag['max_ms']} ms")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    timeout = httpx.Timeout(args.timeout)
+    if args.base_url:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+            image = make_image(args.image, args.image_width, args.image_height)
+            return await LoadTest(client, args, image).run(probe_lag=False)
+
+    app, ocr_service = setup_app(args)
+    image = make_image(args.image, args.image_width, args.image_height)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=timeout) as client:
+            return await LoadTest(client, args, image).run(probe_lag=True)
+    finally:
+        ocr_service.shutdown()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", nargs="+", choices=ENDPOINTS, default=["recognize"],
+                        help="endpoints to drive; each request picks one at random")
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=4, help="closed loop: concurrent clients")
+    parser.add_argument("--rate", type=float, default=10.0, help="open loop: requests per second")
+    parser.add_argument("--poisson", action="store_true", help="open loop: exponential inter-arrival times")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to generate load")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout in seconds")
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--engine", choices=("fake", "real"), default="fake")
+    parser.add_argument("--latency", type=float, default=0.1, help="fake engine: seconds per image")
+    parser.add_argument("--lines", type=int, default=50, help="fake engine: lines per image")
+    parser.add_argument("--db-latency", type=float, default=0.005,
+                        help="fake engine: seconds each batch status/list call blocks")
+    parser.add_argument("--cache", action="store_true", help="keep the result cache on (same image every request)")
+    parser.add_argument("--image", help="image file to upload (default: synthetic JPEG page)")
+    parser.add_argument("--image-width", type=int, default=1600)
+    parser.add_argument("--image-height", type=int, default=2400)
+    parser.add_argument("--batch-size", type=int, default=4, help="images per recognize-batch request")
+    parser.add_argument("--text-layout", default="horizontal")
+    parser.add_argument("--task-id", default=STUB_TASK_ID, help="task id for batch-status")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.mode == "open" and args.rate <= 0:
+        parser.error("--rate must be positive")
+    # Per-request INFO logs slow the in-process app and bury the report
+    logging.disable(logging.INFO)
+
+    report = asyncio.run(run(args))
+    report["config"] = {k: v for k, v in vars(args).items() if k != "output"}
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -47,6 +47,7 @@ CREATE TABLE batch_tasks (
     output_format VARCHAR(30) DEFAULT 'line_by_line' COMMENT '输出格式',
     recursives TINYINT DEFAULT 1 COMMENT '是否递归扫描目录',
     file_patterns JSON DEFAULT NULL COMMENT '文件匹配模式',
+    ocr_options JSON DEFAULT NULL COMMENT '任务级OCR识别选项（识别分辨率等）',
 
     -- 任务状态
     status ENUM('pending', 'queued', 'processing', 'completed', 'failed', 'cancelled', 'retrying')
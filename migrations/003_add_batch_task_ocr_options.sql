@@ -0,0 +1,13 @@
+-- =====================================================
+-- 迁移脚本：添加 ocr_options 列到 batch_tasks 表
+-- 数据库: paddleocr_api
+-- =====================================================
+
+USE paddleocr_api;
+
+-- 任务级识别选项（如识别分辨率 max_side_len / source_dpi / target_dpi）
+ALTER TABLE batch_tasks
+ADD COLUMN ocr_options JSON DEFAULT NULL COMMENT '任务级OCR识别选项（识别分辨率等）'
+AFTER file_patterns;
+
+SELECT '迁移完成！ocr_options 列已添加' AS 状态;
@@ -0,0 +1,61 @@
+"""Streamed batch requests must read uploads after the endpoint has returned"""
+import asyncio
+import io
+import json
+import sys
+
+import pytest
+from fastapi import UploadFile
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from app import main
+from app.config import settings
+
+
+@pytest.mark.parametrize("size", [10, 3 * 1024 * 1024])
+def test_detached_uploads_survive_closing_the_originals(size):
+    data = (bytes(range(256)) * (size // 256 + 1))[:size]
+
+    async def run():
+        spool = io.BytesIO(data)
+        original = UploadFile(spool, size=size, filename="page.png")
+        [detached] = main._detach_uploads([original])
+        # The request's spooled file is handed over, not copied
+        assert detached.file is spool
+        # What FastAPI < 0.118 does when the endpoint returns a StreamingResponse
+        await original.close()
+        assert detached.filename == "page.png"
+        assert detached.size == size
+        assert await detached.read() == data
+        await detached.close()
+        assert spool.closed
+
+    asyncio.run(run())
+
+
+def test_stream_reads_files_after_endpoint_returns(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    seen = []
+
+    async def fake_recognize(image, options):
+        seen.append(bytes(image))
+        return {"success": True, "text": "ok", "details": None, "refined_lines": 0,
+                "processing_time": 0, "error": None}
+
+    monkeypatch.setattr(settings, "OCR_DECODE_IN_MEMORY", True)
+    monkeypatch.setattr(main, "_batch_parallelism", lambda count: 1)
+    monkeypatch.setattr(main.ocr_service, "check_capacity", lambda count: None)
+    monkeypatch.setattr(main.ocr_service, "recognize_async", fake_recognize)
+    files = [("files", (f"{i}.png", f"image-{i}".encode(), "image/png")) for i in range(3)]
+    with TestClient(main.app) as client:
+        response = client.post("/api/ocr/recognize-batch", files=files, data={"stream": "ndjson"})
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(record["filename"] for record in records) == ["0.png", "1.png", "2.png"]
+    assert all(record["success"] for record in records)
+    assert sorted(seen) == [b"image-0", b"image-1", b"image-2"]
@@ -0,0 +1,41 @@
+"""Result cache keys must follow the settings an unset option falls back to"""
+import sys
+
+import pytest
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from app.config import settings
+from app.ocr_service import OcrService
+from app.schemas import OcrOptions
+
+
+@pytest.mark.parametrize("name, value", [
+    ("OCR_MAX_SIDE_LEN", 1234),
+    ("OCR_REFINE_THRESHOLD", 0.8),
+    ("OCR_ANGLE_MODE", "page"),
+    ("OCR_TILE_AUTO_PIXELS", 1000),
+    ("OCR_TILE_SIZE", 777),
+    ("OCR_TILE_OVERLAP", 33),
+    ("OCR_CPU_THREADS", 3),
+])
+def test_namespace_changes_with_effective_setting(monkeypatch, name, value):
+    options = OcrOptions(use_angle_cls=True)
+    before = OcrService._cache_namespace(options)
+    monkeypatch.setattr(settings, name, value)
+    assert OcrService._cache_namespace(options) != before
+
+
+def test_explicit_option_ignores_setting(monkeypatch):
+    options = OcrOptions(max_side_len=2000)
+    before = OcrService._cache_namespace(options)
+    monkeypatch.setattr(settings, "OCR_MAX_SIDE_LEN", 1234)
+    assert OcrService._cache_namespace(options) == before
+
+
+def test_equal_dpi_ratio_shares_namespace():
+    assert OcrService._cache_namespace(OcrOptions(source_dpi=600, target_dpi=300)) == \
+        OcrService._cache_namespace(OcrOptions(source_dpi=400, target_dpi=200))
@@ -0,0 +1,18 @@
+"""Image helpers on memory-mapped and strided frames"""
+import cv2
+import numpy as np
+
+from app.utils.image_io import to_bgr
+
+
+def test_to_bgr_converts_mapped_gray_frame_band_by_band(tmp_path):
+    page = (np.arange(3000 * 4000) % 251).astype(np.uint8).reshape(3000, 4000)
+    path = tmp_path / "frame.raw"
+    page.tofile(path)
+    mapped = np.memmap(path, dtype=np.uint8, mode="r").reshape(page.shape)
+    assert np.array_equal(to_bgr(mapped), cv2.cvtColor(page, cv2.COLOR_GRAY2BGR))
+
+
+def test_to_bgr_converts_strided_bgra():
+    image = np.random.default_rng(0).integers(0, 255, (50, 40, 4), dtype=np.uint8)[:, ::-1]
+    assert np.array_equal(to_bgr(image), cv2.cvtColor(np.ascontiguousarray(image), cv2.COLOR_BGRA2BGR))
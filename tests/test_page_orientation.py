@@ -0,0 +1,68 @@
+"""Page orientation mode must also apply to image files passed by path (batch scans)"""
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from app import ocr_service
+from app.config import settings
+from app.schemas import OcrOptions
+
+LINES = 12
+
+
+class StagedEngine:
+    """Twelve upright text lines; records how many crops the angle classifier sees"""
+
+    classified = []
+
+    def __init__(self, use_angle_cls: bool = True, lang: str = "ch", **kwargs):
+        self.use_angle_cls = use_angle_cls
+        self.lang = lang
+        self.drop_score = 0.5
+
+    def text_detector(self, image):
+        boxes = [[[20, 20 + 60 * i], [780, 20 + 60 * i], [780, 60 + 60 * i], [20, 60 + 60 * i]] for i in range(LINES)]
+        return np.asarray(boxes, dtype=np.float32), 0.0
+
+    def text_classifier(self, crops):
+        StagedEngine.classified.append(len(crops))
+        return crops, [["0", 0.99] for _ in crops], 0.0
+
+    def text_recognizer(self, crops):
+        return [("line", 0.9) for _ in crops], 0.0
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(ocr_service, "PaddleOCR", StagedEngine)
+    monkeypatch.setattr(StagedEngine, "classified", [])
+    monkeypatch.setattr(settings, "OCR_BACKEND", "thread")
+    monkeypatch.setattr(settings, "OCR_MICRO_BATCH_ENABLED", False)
+    monkeypatch.setattr(settings, "OCR_RESULT_CACHE_SIZE", 0)
+    monkeypatch.setattr(settings, "OCR_RESULT_CACHE_DIR", "")
+    monkeypatch.setattr(settings, "OCR_REFINE_THRESHOLD", 0.0)
+    monkeypatch.setattr(settings, "OCR_PAGE_ORIENTATION_SAMPLES", 3)
+    monkeypatch.setattr(ocr_service.OcrService, "_result_cache", None)
+    service = ocr_service.OcrService()
+    # Drop engines other tests (or app startup warm-up) loaded with another factory
+    service._registry.clear()
+    yield service
+    service._registry.clear()
+
+
+def test_page_mode_samples_lines_for_path_input(service, tmp_path):
+    path = tmp_path / "page.png"
+    cv2.imwrite(str(path), np.full((800, 800, 3), 255, dtype=np.uint8))
+    options = OcrOptions(use_angle_cls=True, angle_mode="page", orientation_scope="task-1")
+    result = service.recognize(str(path), options)
+    assert result["success"], result["error"]
+    assert result["text"].splitlines() == ["line"] * LINES
+    # Only the sampled lines are classified, not every line
+    assert StagedEngine.classified == [3]
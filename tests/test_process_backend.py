@@ -0,0 +1,36 @@
+"""Process pool start-up: probes left at the deadline must not stay queued"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from app.services.process_backend import ProcessBackend
+
+
+def test_start_cancels_outstanding_probes_at_deadline(monkeypatch):
+    # One thread answers with the process pid; the second "worker" never starts
+    executor = ThreadPoolExecutor(max_workers=1)
+    submitted = []
+    original_submit = executor.submit
+
+    def submit(fn, *args):
+        future = original_submit(fn, *args)
+        submitted.append(future)
+        return future
+
+    monkeypatch.setattr(executor, "submit", submit)
+    backend = ProcessBackend(workers=3)
+    monkeypatch.setattr(backend, "_get_executor", lambda: executor)
+
+    started = time.time()
+    workers = backend.start(timeout=0.5)
+    assert time.time() - started < 1.5
+    assert len(workers) == 1
+    # Probes still queued at the deadline are cancelled rather than left for the pool
+    executor.shutdown(wait=True)
+    assert all(future.done() for future in submitted)
+    assert any(future.cancelled() for future in submitted)
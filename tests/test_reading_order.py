@@ -0,0 +1,51 @@
+"""Reading order regressions: spanning titles and margin notes must not merge groups"""
+import numpy as np
+
+from app.utils.reading_order import cluster_intervals, format_text
+
+
+def rect(x0: float, y0: float, x1: float, y1: float) -> list:
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+def test_overlapping_intervals_group_together():
+    lo = np.array([0.0, 2.0, 20.0, 21.0])
+    hi = np.array([10.0, 11.0, 30.0, 31.0])
+    assert cluster_intervals(lo, hi).tolist() == [0, 0, 1, 1]
+
+
+def test_spanning_title_over_vertical_columns():
+    # Title across the top of three right-to-left columns
+    texts = ["TITLE", "col1", "col2", "col3"]
+    boxes = [rect(0, 0, 300, 40), rect(220, 60, 260, 600), rect(120, 60, 160, 600), rect(20, 60, 60, 600)]
+    assert format_text(texts, boxes, "vertical_rl", "column_by_column") == "TITLE\ncol1\ncol2\ncol3"
+
+
+def test_spanning_title_keeps_column_order_line_by_line():
+    texts = ["T", "c1a", "c1b", "c2a", "c2b"]
+    boxes = [
+        rect(0, 0, 300, 40),
+        rect(220, 60, 260, 320), rect(220, 340, 260, 600),
+        rect(120, 60, 160, 320), rect(120, 340, 160, 600),
+    ]
+    assert format_text(texts, boxes, "vertical_rl", "line_by_line") == "T\nc1a\nc1b\nc2a\nc2b"
+
+
+def test_tall_margin_note_does_not_merge_lines():
+    # Three horizontal lines with a narrow note in the left margin spanning all of them
+    texts = ["L1a", "L1b", "L2a", "L2b", "L3a", "L3b", "note"]
+    boxes = [
+        rect(100, 10, 300, 40), rect(320, 10, 500, 40),
+        rect(100, 60, 300, 90), rect(320, 60, 500, 90),
+        rect(100, 110, 300, 140), rect(320, 110, 500, 140),
+        rect(10, 20, 60, 140),
+    ]
+    text = format_text(texts, boxes, "horizontal", "column_by_column")
+    assert text == "L1aL1b\nnote\nL2aL2b\nL3aL3b"
+
+
+def test_margin_note_beside_vertical_columns():
+    # Small annotation in the left margin of right-to-left columns is read last
+    texts = ["col1", "col2", "note"]
+    boxes = [rect(220, 60, 260, 600), rect(120, 60, 160, 600), rect(20, 300, 50, 400)]
+    assert format_text(texts, boxes, "vertical_rl", "column_by_column") == "col1\ncol2\nnote"
@@ -0,0 +1,59 @@
+"""Multi-page TIFF uploads are spooled to disk and read through a memory map"""
+import io
+import json
+import sys
+
+import numpy as np
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from PIL import Image
+
+from app import main
+from app.utils.image_io import _mapped_buffer
+
+
+def multi_page_tiff(pages: int) -> bytes:
+    frames = [Image.fromarray(np.full((64, 96), 40 * i, dtype=np.uint8)) for i in range(pages)]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format="TIFF", save_all=True, append_images=frames[1:], compression="raw")
+    return buffer.getvalue()
+
+
+def test_tiff_frames_are_mapped_and_temp_file_removed(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    seen = []
+
+    async def fake_recognize(image, options):
+        seen.append((image.shape, _mapped_buffer(image) is not None, int(image[0, 0])))
+        return {"success": True, "text": "ok", "details": None, "refined_lines": 0,
+                "processing_time": 0, "error": None}
+
+    monkeypatch.setattr(main.ocr_service, "check_capacity", lambda count: None)
+    monkeypatch.setattr(main.ocr_service, "recognize_async", fake_recognize)
+    before = set(main.TEMP_DIR.iterdir())
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/api/ocr/recognize-pdf",
+            files={"file": ("book.tif", multi_page_tiff(3), "image/tiff")},
+            data={"stream": "ndjson"}
+        )
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["page"] for record in records] == [1, 2, 3]
+    assert seen == [((64, 96), True, 0), ((64, 96), True, 40), ((64, 96), True, 80)]
+    assert set(main.TEMP_DIR.iterdir()) == before
+
+
+def test_invalid_upload_is_rejected_without_temp_file():
+    from fastapi.testclient import TestClient
+
+    before = set(main.TEMP_DIR.iterdir())
+    with TestClient(main.app) as client:
+        response = client.post("/api/ocr/recognize-pdf", files={"file": ("notes.txt", b"plain text", "text/plain")})
+    assert response.status_code in (400, 501)
+    assert set(main.TEMP_DIR.iterdir()) == before
@@ -0,0 +1,80 @@
+"""Two-pass recognition: lines scored under drop_score at low resolution must still be re-read"""
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from app import ocr_service
+from app.config import settings
+from app.schemas import OcrOptions
+
+LINE_BOX = np.array([[20, 200], [780, 200], [780, 260], [20, 260]], dtype=np.float32)
+
+
+class StagedEngine:
+    """One text line; its score depends on how tall the recognised crop is"""
+
+    def __init__(self, use_angle_cls: bool = True, lang: str = "ch", **kwargs):
+        self.use_angle_cls = use_angle_cls
+        self.lang = lang
+        self.drop_score = 0.5
+        self.text_classifier = None
+
+    def text_detector(self, image):
+        scale = image.shape[0] / 800
+        return LINE_BOX[None] * scale, 0.0
+
+    def text_recognizer(self, crops):
+        # Unreadable when shrunk, clear at full resolution
+        return [("low" if crop.shape[0] < 30 else "high", 0.3 if crop.shape[0] < 30 else 0.9)
+                for crop in crops], 0.0
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(ocr_service, "PaddleOCR", StagedEngine)
+    monkeypatch.setattr(settings, "OCR_BACKEND", "thread")
+    monkeypatch.setattr(settings, "OCR_MICRO_BATCH_ENABLED", False)
+    monkeypatch.setattr(settings, "OCR_RESULT_CACHE_SIZE", 0)
+    monkeypatch.setattr(settings, "OCR_RESULT_CACHE_DIR", "")
+    monkeypatch.setattr(settings, "OCR_REFINE_SIDE_LEN", 200)
+    monkeypatch.setattr(ocr_service.OcrService, "_result_cache", None)
+    service = ocr_service.OcrService()
+    # Drop engines other tests (or app startup warm-up) loaded with another factory
+    service._registry.clear()
+    yield service
+    service._registry.clear()
+
+
+def page() -> np.ndarray:
+    return np.full((800, 800, 3), 255, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("by_path", [False, True])
+def test_low_resolution_line_under_drop_score_is_refined(service, tmp_path, by_path):
+    image = page()
+    if by_path:
+        # Batch scans pass image files by path
+        image = str(tmp_path / "page.png")
+        cv2.imwrite(image, page())
+    options = OcrOptions(use_angle_cls=False, refine_threshold=0.8, return_details=True)
+    result = service.recognize(image, options)
+    assert result["success"], result["error"]
+    assert result["text"] == "high"
+    assert result["refined_lines"] == 1
+    assert result["details"].scores.tolist() == [0.9]
+
+
+def test_line_still_under_drop_score_after_refine_is_dropped(service, monkeypatch):
+    monkeypatch.setattr(StagedEngine, "text_recognizer", lambda self, crops: ([("?", 0.2)] * len(crops), 0.0))
+    options = OcrOptions(use_angle_cls=False, refine_threshold=0.8, return_details=True)
+    result = service.recognize(page(), options)
+    assert result["success"], result["error"]
+    assert result["text"] == ""
+    assert result["refined_lines"] == 1
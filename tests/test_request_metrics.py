@@ -0,0 +1,54 @@
+"""Request timing: streamed responses are measured when their body ends, without Server-Timing"""
+import asyncio
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from app import main
+
+ROUTE = {"method": "POST", "route": "/api/ocr/recognize-batch", "status": "200"}
+
+
+def recorded_seconds() -> float:
+    return REGISTRY.get_sample_value("ocr_http_request_seconds_sum", ROUTE) or 0.0
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    async def slow_recognize(image, options):
+        await asyncio.sleep(0.2)
+        return {"success": True, "text": "ok", "details": None, "refined_lines": 0,
+                "processing_time": 0.2, "error": None}
+
+    monkeypatch.setattr(main, "_batch_parallelism", lambda count: 1)
+    monkeypatch.setattr(main.ocr_service, "check_capacity", lambda count: None)
+    monkeypatch.setattr(main.ocr_service, "recognize_async", slow_recognize)
+    with TestClient(main.app) as client:
+        yield client
+
+
+def post_batch(client, **data):
+    files = [("files", (f"{i}.png", b"image", "image/png")) for i in range(2)]
+    return client.post("/api/ocr/recognize-batch", files=files, data=data)
+
+
+def test_streamed_response_has_no_server_timing_and_counts_body_time(client):
+    before = recorded_seconds()
+    response = post_batch(client, stream="ndjson")
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert recorded_seconds() - before >= 0.4
+
+
+def test_buffered_response_reports_server_timing(client):
+    response = post_batch(client)
+    assert response.status_code == 200
+    assert "total;dur=" in response.headers["server-timing"]
@@ -0,0 +1,76 @@
+"""Tiled recognition of a memory-mapped TIFF frame converts only the tiles to BGR"""
+import io
+import sys
+
+import numpy as np
+import pytest
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from PIL import Image
+
+from app import ocr_service
+from app.config import settings
+from app.schemas import OcrOptions
+from app.utils import image_io
+
+
+class StagedEngine:
+    """Records the shape of every image the detector sees"""
+
+    detected = []
+
+    def __init__(self, use_angle_cls: bool = True, lang: str = "ch", **kwargs):
+        self.use_angle_cls = use_angle_cls
+        self.drop_score = 0.5
+
+    def text_detector(self, image):
+        StagedEngine.detected.append(image.shape)
+        return np.zeros((0, 4, 2), dtype=np.float32), 0.0
+
+    def text_recognizer(self, crops):
+        return [("line", 0.9) for _ in crops], 0.0
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(ocr_service, "PaddleOCR", StagedEngine)
+    monkeypatch.setattr(StagedEngine, "detected", [])
+    monkeypatch.setattr(settings, "OCR_BACKEND", "thread")
+    monkeypatch.setattr(settings, "OCR_MICRO_BATCH_ENABLED", False)
+    monkeypatch.setattr(settings, "OCR_RESULT_CACHE_SIZE", 0)
+    monkeypatch.setattr(settings, "OCR_RESULT_CACHE_DIR", "")
+    monkeypatch.setattr(settings, "OCR_REFINE_THRESHOLD", 0.0)
+    monkeypatch.setattr(settings, "OCR_MAX_SIDE_LEN", 0)
+    monkeypatch.setattr(settings, "OCR_TILE_SIZE", 256)
+    monkeypatch.setattr(settings, "OCR_TILE_OVERLAP", 32)
+    monkeypatch.setattr(ocr_service.OcrService, "_result_cache", None)
+    service = ocr_service.OcrService()
+    service._registry.clear()
+    yield service
+    service._registry.clear()
+
+
+def test_tiled_gray_tiff_is_not_expanded_to_full_page_bgr(service, monkeypatch, tmp_path):
+    path = tmp_path / "scan.tif"
+    Image.fromarray(np.full((600, 800), 255, dtype=np.uint8)).save(path, compression="raw")
+    converted = []
+    to_bgr = image_io.to_bgr
+    monkeypatch.setattr(image_io, "to_bgr", lambda image: converted.append(image.shape) or to_bgr(image))
+
+    result = service.recognize(str(path), OcrOptions(use_angle_cls=False, tiled=True))
+    assert result["success"], result["error"]
+    assert len(StagedEngine.detected) > 1
+    assert all(shape[0] <= 256 and shape[1] <= 256 and shape[2] == 3 for shape in StagedEngine.detected)
+    assert all(shape[0] * shape[1] <= 256 * 256 for shape in converted)
+
+
+def test_load_frame_keeps_mapped_gray_frame(tmp_path):
+    path = tmp_path / "scan.tif"
+    Image.fromarray(np.full((60, 80), 7, dtype=np.uint8)).save(path, compression="raw")
+    frame = image_io.load_frame(str(path))
+    assert frame.shape == (60, 80)
+    assert image_io._mapped_buffer(frame) is not None
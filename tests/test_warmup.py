@@ -0,0 +1,27 @@
+"""Preloading more engines than the registry holds would evict the ones warmed first"""
+import logging
+import sys
+
+if "app.ocr_service" not in sys.modules:
+    # Offline engine so the service imports without PaddleOCR installed
+    from benchmarks import fake_engine
+    fake_engine.install()
+
+from app.config import settings
+from app.ocr_service import OcrService
+
+
+def test_preload_list_is_truncated_to_max_engines(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "OCR_PRELOAD_ENGINES", "ch,en:false,japan,korean")
+    monkeypatch.setattr(settings, "OCR_USE_ANGLE_CLS", True)
+    monkeypatch.setattr(settings, "OCR_MAX_ENGINES", 2)
+    with caplog.at_level(logging.WARNING):
+        assert OcrService.preload_keys() == [("ch", True), ("en", False)]
+    assert "OCR_MAX_ENGINES" in caplog.text
+
+
+def test_preload_list_within_limit_is_kept(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_PRELOAD_ENGINES", "ch,en:false")
+    monkeypatch.setattr(settings, "OCR_USE_ANGLE_CLS", True)
+    monkeypatch.setattr(settings, "OCR_MAX_ENGINES", 3)
+    assert OcrService.preload_keys() == [("ch", True), ("en", False)]